@@ -21,7 +21,7 @@ else:
         binaries_extra.append((vcredist_dll, '.'))
 
 a = Analysis(
-    ['main.py', 'launcher.py', 'helpers.py'],
+    ['main.py', 'launcher.py', 'game_launch.py', 'helpers.py'],
     pathex=['.'],
     binaries=binaries_extra,
     datas=[('assets', 'assets'), ('lang', 'lang')],
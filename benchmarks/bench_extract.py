@@ -0,0 +1,79 @@
+"""Распаковка синтетических zip-архивов: однопоточный extractall против _extract_zip_parallel.
+
+Два набора по --mb МБ (по умолчанию 500): много мелких членов и несколько огромных. Данные — смесь
+случайных и повторяющихся блоков (сжатие примерно вдвое, как у ресурсов модов). С --with-7z те же
+наборы пакуются ещё и в 7z (py7zr, долго) и распаковываются через extract_archive.
+
+    python benchmarks/bench_extract.py [--mb 500] [--many 2000] [--few 4] [--dir /tmp] [--with-7z]
+"""
+import argparse, os, shutil, sys, tempfile, time, zipfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers import _extract_zip_parallel, extract_archive  # noqa: E402
+
+BLOCK = 64 * 1024
+
+
+def payload(size: int, seed: int) -> bytes:
+    text = (f"chapter{seed} sprite frame " * 4096).encode()[:BLOCK // 2]
+    out, i = bytearray(), 0
+    while len(out) < size:
+        out += os.urandom(BLOCK // 2) + text; i += 1
+    return bytes(out[:size])
+
+
+def build_zip(path: str, total: int, members: int):
+    each = total // members
+    chunk = payload(min(each, 8 * 1024 * 1024), members)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for n in range(members):
+            with zf.open(f"data/part_{n:05d}.bin", "w", force_zip64=True) as f:
+                left = each
+                while left > 0:
+                    f.write(chunk[:left]); left -= len(chunk[:left])
+
+
+def build_7z(zip_path: str, path: str, workdir: str):
+    import py7zr
+    src = os.path.join(workdir, "src7z")
+    with zipfile.ZipFile(zip_path) as zf: zf.extractall(src)
+    with py7zr.SevenZipFile(path, "w") as z: z.writeall(os.path.join(src, "data"), "data")
+    shutil.rmtree(src)
+
+
+def timed(fn, archive: str, workdir: str) -> float:
+    out = os.path.join(workdir, "out")
+    shutil.rmtree(out, ignore_errors=True)
+    started = time.perf_counter(); fn(archive, out); elapsed = time.perf_counter() - started
+    shutil.rmtree(out, ignore_errors=True)
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=int, default=500)
+    ap.add_argument("--many", type=int, default=2000)
+    ap.add_argument("--few", type=int, default=4)
+    ap.add_argument("--dir", default=None)
+    ap.add_argument("--with-7z", action="store_true")
+    args = ap.parse_args()
+    total = args.mb * 1024 * 1024
+    print(f"cpu_count={os.cpu_count()}")
+    with tempfile.TemporaryDirectory(prefix="bench-extract-", dir=args.dir) as workdir:
+        for label, members in (("many members", args.many), ("few huge", args.few)):
+            archive = os.path.join(workdir, f"{members}.zip")
+            build_zip(archive, total, members)
+            base = timed(lambda a, o: zipfile.ZipFile(a).extractall(o), archive, workdir)
+            par = timed(_extract_zip_parallel, archive, workdir)
+            print(f"zip {label:<13} ({members:>5} x {total // members / 1048576:7.2f} MB, archive {os.path.getsize(archive) / 1048576:.0f} MB): "
+                  f"extractall {base:6.2f}s  parallel {par:6.2f}s  speedup x{base / par:.2f}")
+            if args.with_7z:
+                seven = os.path.join(workdir, f"{members}.7z")
+                build_7z(archive, seven, workdir)
+                print(f"7z  {label:<13}: extract_archive {timed(extract_archive, seven, workdir):6.2f}s")
+            os.remove(archive)
+
+
+if __name__ == "__main__":
+    main()
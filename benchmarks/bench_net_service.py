@@ -0,0 +1,98 @@
+"""Потоки и задержка лёгких UI-запросов: поток на запрос (как старые _IconLoader/_ImgLoader) против NetService.
+
+Поднимает локальный HTTP-сервер с искусственной задержкой ответа и делает N одновременных запросов,
+как страница из N плашек. Печатает пик числа потоков процесса и задержки p50/p95/max.
+
+    python benchmarks/bench_net_service.py [--requests 20] [--delay 0.05] [--rounds 5]
+"""
+import argparse, multiprocessing, os, statistics, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers import NetService, http_client  # noqa: E402
+
+BODY = os.urandom(24 * 1024)  # размер типичной иконки
+
+
+def _server_main(delay: float, port_queue):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *args): pass
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200); self.send_header("Content-Length", str(len(BODY))); self.end_headers()
+            self.wfile.write(BODY)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler); server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def serve(delay: float) -> str:
+    # Сервер — в отдельном процессе, чтобы его потоки не попадали в счёт потоков клиента
+    queue = multiprocessing.Queue()
+    multiprocessing.Process(target=_server_main, args=(delay, queue), daemon=True).start()
+    return f"http://127.0.0.1:{queue.get(timeout=10)}/icon.png"
+
+
+class PeakThreads:
+    """Опрашивает threading.active_count() в фоне; потоки самого опросчика и сервера вычитаются базой."""
+    def __init__(self):
+        self.peak, self._stop = 0, threading.Event()
+        self._t = threading.Thread(target=self._run, daemon=True)
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count()); time.sleep(0.0005)
+    def __enter__(self):
+        self.base = threading.active_count() + 1; self._t.start(); return self
+    def __exit__(self, *exc):
+        self._stop.set(); self._t.join()
+    @property
+    def extra(self) -> int: return max(0, self.peak - self.base)
+
+
+def thread_per_request(url: str, n: int) -> list[float]:
+    latencies, lock = [], threading.Lock()
+    def worker(started):
+        http_client.get(url, timeout=10).content
+        with lock: latencies.append(time.perf_counter() - started)
+    threads = [threading.Thread(target=worker, args=(time.perf_counter(),)) for _ in range(n)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return latencies
+
+
+def net_service(url: str, n: int) -> list[float]:
+    net = NetService.instance()
+    async def one(started):
+        (await net.fetch("GET", url, timeout=10)).content
+        return time.perf_counter() - started
+    return [f.result() for f in [net.submit(one(time.perf_counter())) for _ in range(n)]]
+
+
+def report(name: str, runs: list[tuple[int, list[float]]]):
+    lat = sorted(x * 1000 for _, ls in runs for x in ls)
+    p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+    print(f"{name:<20} new threads peak={max(p for p, _ in runs):>3}  "
+          f"latency p50={statistics.median(lat):6.1f} ms  p95={p95:6.1f} ms  max={lat[-1]:6.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20)
+    ap.add_argument("--delay", type=float, default=0.05)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+    url = serve(args.delay)
+    # Прогрев: в приложении пул соединений, цикл и рабочие потоки NetService уже существуют
+    thread_per_request(url, args.requests); net_service(url, args.requests)
+    for name, fn in (("thread per request", thread_per_request), ("NetService", net_service)):
+        runs = []
+        for _ in range(args.rounds):
+            with PeakThreads() as peak: latencies = fn(url, args.requests)
+            runs.append((peak.extra, latencies))
+        report(name, runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Журнал сессии запуска на мод из --files файлов (по умолчанию 5000): старый session.lock против SessionJournal.
+
+Старый вариант воспроизводит прежний _update_session_manifest: на каждый файл прочитать весь JSON,
+собрать множество, дописать и переписать файл целиком. Новый — SessionJournal.append с теми же
+правилами durable, что у лаунчера (бэкапы — сразу fsync, остальное — пачками), и replay() при восстановлении.
+
+    python benchmarks/bench_session_journal.py [--files 5000] [--dir /tmp]
+"""
+import argparse, json, os, sys, tempfile, time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers import SessionJournal  # noqa: E402
+
+
+def old_update(path: str, backup_files=None, mod_files=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f: data = json.load(f) or {}
+    except Exception:
+        data = {}
+    if not data:
+        data = {"backup_files": {}, "mod_files_to_cleanup": [], "mod_dirs_to_cleanup": [], "backup_temp_dir": None, "direct_launch": None}
+    if backup_files: data.setdefault("backup_files", {}).update(backup_files)
+    if mod_files:
+        existing = set(data.get("mod_files_to_cleanup", []))
+        for p in mod_files:
+            if p not in existing: data.setdefault("mod_files_to_cleanup", []).append(p)
+    with open(path, "w", encoding="utf-8") as f: json.dump(data, f, ensure_ascii=False)
+
+
+def records(n: int):
+    # Как при применении мода: каждый файл — в список очистки, каждый второй заменяет оригинал игры
+    for i in range(n):
+        game_file = f"/games/DELTARUNE/chapter{i % 4 + 1}_windows/mus/track_{i:05d}.ogg"
+        yield ({game_file: f"/games/.deltahub-backups/deltahub_backup_x/{i:05d}.ogg"} if i % 2 else None), [game_file]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=5000)
+    ap.add_argument("--dir", default=None)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory(prefix="bench-journal-", dir=args.dir) as tmp:
+        old_path = os.path.join(tmp, "old.lock")
+        started = time.perf_counter()
+        for backup, mods in records(args.files): old_update(old_path, backup, mods)
+        old_write = time.perf_counter() - started
+        started = time.perf_counter()
+        with open(old_path, encoding="utf-8") as f: old_data = json.load(f)
+        old_read = time.perf_counter() - started
+
+        journal = SessionJournal(os.path.join(tmp, "session.lock"))
+        started = time.perf_counter()
+        for backup, mods in records(args.files):
+            record = {"mod_files": mods}
+            if backup: record["backup_files"] = backup
+            journal.append(record, durable=bool(backup))
+        journal.flush()
+        new_write = time.perf_counter() - started
+        started = time.perf_counter()
+        new_data = journal.replay()
+        new_read = time.perf_counter() - started
+        journal.close()
+
+    assert new_data["backup_files"] == old_data["backup_files"]
+    assert new_data["mod_files_to_cleanup"] == old_data["mod_files_to_cleanup"]
+    print(f"{args.files} files")
+    print(f"old session.lock rewrite  prepare {old_write:7.2f}s  recover {old_read * 1000:7.1f} ms")
+    print(f"SessionJournal append     prepare {new_write:7.2f}s  recover {new_read * 1000:7.1f} ms")
+    print(f"speedup prepare x{old_write / new_write:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Время от запуска ярлыка до старта игры: `main.py --shortcut-launch` с модом на главу 1 и --mods модами в папке.
+
+Игра — скрипт-заглушка, который записывает time.time() в файл и сразу выходит; замер идёт от Popen до этой отметки.
+HOME подменяется временной папкой, так что настоящие config.json и моды не затрагиваются.
+--repo позволяет сравнить с другим деревом (например, git worktree на коммите до изменения).
+
+    python benchmarks/bench_shortcut_launch.py [--mods 200] [--runs 5] [--repo /path/to/tree]
+"""
+import argparse, base64, json, os, statistics, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare(home: str, mods: int) -> str:
+    data_root = os.path.join(home, ".local", "share", "DELTAHUB")
+    mods_dir, game = os.path.join(data_root, "mods"), os.path.join(home, "DELTARUNE")
+    os.makedirs(os.path.join(data_root, "cache"), exist_ok=True)
+    os.makedirs(os.path.join(game, "chapter1_windows"))
+    with open(os.path.join(game, "chapter1_windows", "data.win"), "wb") as f: f.write(b"original" * 1024)
+    exe = os.path.join(game, "DELTARUNE")
+    with open(exe, "w") as f:
+        f.write(f"#!/bin/sh\n{sys.executable} -c 'import time; print(time.time())' > \"$STAMP\"\n")
+    os.chmod(exe, 0o755)
+    for i in range(mods):
+        folder = os.path.join(mods_dir, f"Mod {i:04d}")
+        os.makedirs(os.path.join(folder, "chapter_1"))
+        with open(os.path.join(folder, "chapter_1", "data.win"), "wb") as f: f.write(b"mod" * 1024)
+        with open(os.path.join(folder, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"mod_key": f"local_{i:04d}", "name": f"Mod {i:04d}", "version": "1.0.0", "modtype": "deltarune",
+                       "files": {"1": {"data_file_url": "data.win"}}}, f)
+    settings = {"game_path": game, "is_demo_mode": False, "is_chapter_mode": True, "is_undertale_mode": False,
+                "launch_via_steam": False, "use_custom_executable": False, "direct_launch_slot_id": -1,
+                "mods": {"1": "local_0000"}, "mods_dir": mods_dir, "mod_folders": {"local_0000": "Mod 0000"}}
+    with open(os.path.join(data_root, "cache", "config.json"), "w", encoding="utf-8") as f:
+        json.dump({"game_path": game}, f)
+    return base64.b64encode(json.dumps(settings).encode("utf-8")).decode("ascii")
+
+
+def run_once(repo: str, home: str, settings: str) -> float:
+    stamp = os.path.join(home, "stamp")
+    if os.path.exists(stamp): os.remove(stamp)
+    env = dict(os.environ, HOME=home, STAMP=stamp, QT_QPA_PLATFORM="offscreen")
+    started = time.time()
+    proc = subprocess.run([sys.executable, os.path.join(repo, "main.py"), "--shortcut-launch", settings],
+                          cwd=repo, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120)
+    if not os.path.exists(stamp):
+        raise SystemExit(f"game was not started (exit code {proc.returncode}), see {home}/.local/share/DELTAHUB/cache")
+    with open(stamp) as f: return float(f.read()) - started
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mods", type=int, default=200)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--repo", default=ROOT)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as home:
+        settings = prepare(home, args.mods)
+        run_once(args.repo, home, settings)  # прогрев кэша байткода и диска
+        times = [run_once(args.repo, home, settings) for _ in range(args.runs)]
+    print(f"{args.repo}: {args.mods} mods, time-to-spawn median {statistics.median(times):.3f}s, "
+          f"min {min(times):.3f}s, max {max(times):.3f}s over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
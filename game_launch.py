@@ -0,0 +1,1155 @@
+import base64, hashlib, importlib.util, json, os, platform, shutil, subprocess, tempfile, threading, time, uuid, webbrowser
+import logging
+from typing import Any, Dict, List, Optional
+from helpers import *
+from localization import tr
+
+setup_log_file()
+
+
+class GameLaunchMixin:
+    """Подготовка файлов игры, запуск и откат — общее для окна лаунчера и запуска из ярлыка.
+
+    Методы не трогают виджеты. Класс-носитель даёт: local_config, config_dir, mods_dir, game_mode, all_mods,
+    is_shortcut_launch, update_status_signal/error_signal (что-то с emit), _show_critical,
+    _handle_permission_error и _get_mod_config_by_key.
+    """
+    _session_lock = threading.Lock()
+
+    # ---------------- Session manifest (crash-safe restore) ----------------
+    def _session_manifest_path(self):
+        return os.path.join(self.config_dir, "session.lock")
+
+    def _session_journal(self) -> SessionJournal:
+        if getattr(self, '_session_journal_obj', None) is None:
+            self._session_journal_obj = SessionJournal(self._session_manifest_path())
+        return self._session_journal_obj
+
+    def _load_session_manifest(self) -> dict:
+        try:
+            return self._session_journal().replay()
+        except Exception:
+            return {}
+
+    def _ensure_session_manifest(self):
+        # Журнал создаётся первой записью; отдельная инициализация не нужна
+        self._session_journal()
+
+    def _update_session_manifest(self, backup_files: Optional[dict] = None, mod_files: Optional[list] = None, backup_temp_dir: Optional[str] = None, direct_launch: Optional[dict] = None, mod_dirs: Optional[list] = None, overlay_dir: Optional[str] = None):
+        record = {}
+        if backup_files: record["backup_files"] = backup_files
+        if mod_files: record["mod_files"] = list(mod_files)
+        if mod_dirs: record["mod_dirs"] = list(mod_dirs)
+        if backup_temp_dir is not None: record["backup_temp_dir"] = backup_temp_dir
+        if direct_launch is not None: record["direct_launch"] = direct_launch
+        if overlay_dir: record["overlay_dir"] = overlay_dir
+        if not record: return
+        try:
+            # Бэкапы оригиналов, прямой запуск и оверлей — сразу на диск, остальное — пачками
+            with self._trace().phase("journal"):
+                self._session_journal().append(record, durable=bool(backup_files or direct_launch or backup_temp_dir or overlay_dir))
+        except Exception:
+            pass
+
+    def _record_session_changes(self, backup_files: Optional[dict] = None, mod_files: Optional[list] = None, mod_dirs: Optional[list] = None):
+        """Добавляет изменения в общие списки сессии и журнал. Главы применяются из разных потоков — списки под замком."""
+        with self._session_lock:
+            if backup_files: self._backup_files.update(backup_files)
+            if mod_files: self._mod_files_to_cleanup.extend(mod_files)
+            mod_dirs = [d for d in (mod_dirs or []) if d not in self._mod_dirs_to_cleanup]
+            self._mod_dirs_to_cleanup.extend(mod_dirs)
+        self._update_session_manifest(backup_files=backup_files, mod_files=mod_files, mod_dirs=mod_dirs)
+
+    def _flush_session_manifest(self):
+        try: self._session_journal().flush()
+        except Exception: pass
+
+    def _clear_session_manifest(self):
+        try:
+            self._session_journal().clear()
+        except Exception:
+            pass
+
+    def _recover_previous_session(self):
+        try:
+            data = self._load_session_manifest()
+            if not data:
+                return
+            # Восстанавливаем внутренние структуры и запускаем очистку
+            self._backup_files = data.get("backup_files", {})
+            self._mod_files_to_cleanup = data.get("mod_files_to_cleanup", [])
+            self._backup_temp_dir = data.get("backup_temp_dir")
+            self._direct_launch_cleanup_info = data.get("direct_launch")
+            self.update_status_signal.emit(tr("status.recovering_previous_session"), UI_COLORS["status_warning"])
+            self._cleanup_direct_launch_files()
+            # Оверлеи изолированного запуска — только ссылки, их просто удаляем
+            for overlay_dir in data.get("overlay_dirs", []):
+                shutil.rmtree(overlay_dir, ignore_errors=True)
+            self._clear_session_manifest()
+        except Exception:
+            # Если что-то пошло не так — не блокируем запуск
+            pass
+
+    def _get_current_game_path(self) -> str:
+        return self.game_mode.get_game_path(self.local_config) or ""
+
+    def _prepare_game_files(self, selections: Dict[int, str]) -> bool:
+        """Копирует файлы модов (публичных или локальных) в игровые директории."""
+        try:
+            applied_chapters = set()
+            self._backup_files = getattr(self, '_backup_files', None) or {}
+            self._mod_files_to_cleanup = getattr(self, '_mod_files_to_cleanup', None) or []
+            self._mod_dirs_to_cleanup = getattr(self, '_mod_dirs_to_cleanup', None) or []
+
+            # Режим «не откатывать моды»: трогаем только главы, где выбор или файлы мода изменились
+            overlay = getattr(self, '_overlay_root', None)
+            keep_applied = self.local_config.get("keep_mods_applied", False) and not overlay
+            applied_store = AppliedStateStore.instance()
+            applied_changes = []
+            jobs = []
+            desired_targets = {self._get_target_dir(self.game_mode.get_chapter_id(i)) for i, k in selections.items() if k != "no_change"}
+            game_root = self._get_current_game_path() or ""
+            for target in list(applied_store.entries):
+                if not keep_applied or (target not in desired_targets and game_root and target.startswith(game_root)):
+                    self._restore_applied_chapter(target)
+            if keep_applied and not getattr(self, '_backup_temp_dir', None):
+                # Бэкапы оставленных модов живут дольше сессии — не во временной папке системы
+                self._make_backup_temp_dir(persistent=True)
+
+            for ui_index, mod_key in selections.items():
+                if mod_key == "no_change":
+                    continue
+
+                chapter_id = self.game_mode.get_chapter_id(ui_index)
+
+                # Ищем мод в общем списке
+                mod = next((m for m in self.all_mods if m.key == mod_key), None)
+                if not mod:
+                    continue
+
+                # Определяем, локальный ли это мод
+                is_local = mod_key.startswith("local_")
+
+                # Определяем источник файлов
+                mod_config = self._get_mod_config_by_key(mod.key)
+                folder_name = sanitize_filename(mod.name)
+                source_dir = os.path.join(self.mods_dir, folder_name)
+
+                if not os.path.isdir(source_dir):
+                    self.update_status_signal.emit(tr("errors.mod_folder_not_found", mod_name=mod.name, path=source_dir), UI_COLORS["status_warning"])
+                    continue
+
+                mod_type_str = tr("ui.mod_type_local") if is_local else tr("ui.mod_type_public")
+                self.update_status_signal.emit(tr("status.applying_mod", mod_name=mod.name, mod_type=mod_type_str), UI_COLORS["status_warning"]) 
+                print(f"[XDELTA-DEBUG] UI index={ui_index}, chapter_id={chapter_id}, mod_key={mod_key}, mod_name={mod.name}")
+                print(f"[XDELTA-DEBUG] source_dir={source_dir}")
+
+
+                # --- ИСПРАВЛЕНИЕ: Унифицированная логика для ВСЕХ модов ---
+                # Теперь и xdelta, и обычные моды обрабатываются одинаково,
+                # применяясь только к той главе, для которой они были выбраны в интерфейсе.
+
+                if chapter_id in applied_chapters:
+    
+                    continue
+
+                # Проверяем, является ли это xdelta модом (нужно для след. шага)
+                is_xdelta_mod = self._is_xdelta_mod(mod, source_dir, chapter_id)
+                print(f"[XDELTA-DEBUG] is_xdelta_mod={is_xdelta_mod}")
+
+                # Пропускаем главы без файлов (для обычных модов)
+                # Для xdelta модов эта проверка не нужна, т.к. наличие патча проверяется позже
+                if not is_xdelta_mod and not mod.get_chapter_data(chapter_id) and not is_local:
+
+                    continue
+                
+                target_dir = self._get_target_dir(chapter_id)
+                if not target_dir:
+                    print(f"[XDELTA-DEBUG] target_dir not found for chapter_id={chapter_id}")
+                    continue
+
+                print(f"[XDELTA-DEBUG] target_dir={target_dir}")
+                with self._trace().phase("ensure_writable"):
+                    writable = ensure_writable(target_dir)
+                if not writable:
+                    raise PermissionError(tr("errors.no_write_permission_for", path=target_dir))
+
+                if keep_applied:
+                    signature = self._applied_signature(mod, source_dir)
+                    if applied_store.is_intact(target_dir, signature):
+                        logging.info(f"Apply: chapter {chapter_id}: {mod.name} already applied, nothing to do")
+                        applied_chapters.add(chapter_id)
+                        continue
+                    self._restore_applied_chapter(target_dir)
+                    applied_changes.append((target_dir, mod.key, signature))
+
+                jobs.append((chapter_id, mod, source_dir, target_dir))
+                applied_chapters.add(chapter_id)
+                # --- КОНЕЦ ИСПРАВЛЕНИЯ ---
+
+            # Главы пишут в разные папки: бэкапы, копирование и xdelta разных глав идут параллельно
+            if jobs and not self._apply_chapter_jobs(jobs):
+                return False
+
+            if keep_applied:
+                self._promote_applied_changes(applied_changes)
+            elif overlay:
+                # Всё применено внутри оверлея — откатывать нечего, после игры он удаляется целиком
+                self._backup_files, self._mod_files_to_cleanup, self._mod_dirs_to_cleanup = {}, [], []
+                self._backup_temp_dir = None
+            # Хвост журнала сессии — на диск до старта игры
+            self._flush_session_manifest()
+            return True
+        except PermissionError as e:
+            path = e.filename or (e.args[0] if e.args else tr("errors.unknown_path"))
+            if not self.is_shortcut_launch: self._handle_permission_error(path)
+            return False
+        except Exception as e:
+            self.error_signal.emit(tr("errors.file_prep_error", error=str(e)))
+            return False
+
+    def _apply_chapter_jobs(self, jobs: list) -> bool:
+        """Применяет главы в пуле потоков. Если хоть одна не применилась — откатывает все главы сессии."""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        # Общие для всех глав списки, манифест и папку бэкапов создаём заранее, а не наперегонки из потоков
+        self._backup_files = getattr(self, '_backup_files', None) or {}
+        self._mod_files_to_cleanup = getattr(self, '_mod_files_to_cleanup', None) or []
+        self._mod_dirs_to_cleanup = getattr(self, '_mod_dirs_to_cleanup', None) or []
+        self._ensure_session_manifest()
+        if not getattr(self, '_backup_temp_dir', None):
+            self._make_backup_temp_dir()
+
+        failed, error = [], None
+        with ThreadPoolExecutor(max_workers=min(4, len(jobs)), thread_name_prefix="deltahub-apply") as pool:
+            futures = {pool.submit(self._create_backup_and_copy_mod_files, source_dir, target_dir, chapter_id, mod): chapter_id
+                       for chapter_id, mod, source_dir, target_dir in jobs}
+            for future in as_completed(futures):
+                try:
+                    ok = future.result()
+                except Exception as e:
+                    ok, error = False, error or e
+                if not ok:
+                    failed.append(futures[future])
+        if not failed:
+            return True
+
+        logging.warning(f"Apply: chapters {sorted(failed)} failed, rolling back all chapters of this launch")
+        self._rollback_applied_files()
+        if error:
+            raise error
+        return False
+
+    def _rollback_applied_files(self):
+        """Откатывает файлы, изменённые этой подготовкой. Запуск не завершается: трассу закрывает и статус пишет вызывающий,
+        прямой запуск и оверлей убирает обычная очистка."""
+        self._restore_files(self._backup_files, self._mod_files_to_cleanup, self._mod_dirs_to_cleanup)
+        self._backup_files, self._mod_files_to_cleanup, self._mod_dirs_to_cleanup = {}, [], []
+        if self._backup_temp_dir:
+            try: os.rmdir(self._backup_temp_dir)  # оригиналы вернулись — папка пуста
+            except OSError: pass
+            self._backup_temp_dir = None
+        # Журнал больше не описывает изменений в игре; оверлей в нём остаётся до его удаления
+        if not getattr(self, '_overlay_root', None): self._clear_session_manifest()
+
+    def _trace(self) -> LaunchTrace:
+        # Вне запуска (восстановление прошлой сессии и т.п.) замеры уходят в одноразовый объект
+        return getattr(self, '_launch_trace', None) or LaunchTrace()
+
+    def _move_to_backup(self, path: str, backup_path: str):
+        with self._trace().phase("backup") as rec:
+            rec["files"], rec["bytes"] = 1, os.path.getsize(path)
+            make_replaceable(path)
+            shutil.move(path, backup_path)
+
+    def _place_file(self, src: str, dst: str) -> str:
+        t = time.perf_counter()
+        if os.path.exists(dst): make_replaceable(dst)
+        # src — хранилище модов или кэш: в игру только reflink/копия, чтобы запись в игре их не портила
+        method = link_or_copy(src, dst, allow_hardlink=False)
+        self._trace().add(f"place.{method}", time.perf_counter() - t, 1, os.path.getsize(dst))
+        return method
+
+    def _make_backup_temp_dir(self, persistent: bool = False) -> str:
+        """Создаёт папку бэкапов сессии на томе игры, чтобы перенос оригиналов туда и обратно был rename."""
+        area = backup_area_for(self._get_current_game_path(), self.local_config.get("backup_dir", ""))
+        if persistent:
+            area = os.path.join(area, "applied"); os.makedirs(area, exist_ok=True)
+        self._backup_temp_dir = tempfile.mkdtemp(prefix="deltahub_backup_", dir=area)
+        self._update_session_manifest(backup_temp_dir=self._backup_temp_dir)
+        return self._backup_temp_dir
+
+    def _applied_signature(self, mod, source_dir: str) -> str:
+        # Переустановка/обновление мода меняет его config.json — этого достаточно, чтобы главу переприменить
+        return f"{mod.key}|{mod.version}|{AppliedStateStore.file_stamp(os.path.join(source_dir, 'config.json'))}|{platform.system()}"
+
+    def _restore_applied_chapter(self, target_dir: str):
+        """Откатывает оставленный между запусками мод в одной папке главы. Повторный вызов безопасен."""
+        store = AppliedStateStore.instance()
+        entry = store.get(target_dir)
+        if not entry:
+            return
+        backups, files = entry.get("backup_files") or {}, entry.get("files") or {}
+        # Файл, изменённый после применения (обновление игры, проверка файлов в Steam), уже новее бэкапа:
+        # его оставляем, а устаревший бэкап удаляем, чтобы не смешать версии игры
+        stale = {p for p, stamp in files.items() if AppliedStateStore.file_stamp(p) != stamp}
+        for path in stale & set(backups):
+            try: os.remove(backups[path])
+            except OSError: pass
+        if stale: logging.info(f"Apply: {len(stale)} files in {target_dir} changed since the mod was applied, keeping them")
+        self._restore_files({k: v for k, v in backups.items() if k not in stale}, [p for p in files if p not in stale], entry.get("dirs") or [])
+        # Опустевшие папки бэкапов этой записи
+        for d in {os.path.dirname(p) for p in backups.values()}:
+            try: os.rmdir(d)
+            except OSError: pass
+        store.pop(target_dir)
+        logging.info(f"Apply: restored originals in {target_dir}")
+
+    def _promote_applied_changes(self, changes: list):
+        """Переносит записи сессии о применённых главах в AppliedStateStore: после выхода из игры их не откатываем."""
+        store = AppliedStateStore.instance()
+        # Главы применялись параллельно, поэтому записи сессии раскладываем по самой глубокой папке главы
+        targets = sorted((c[0] for c in changes), key=len, reverse=True)
+        def owner(path):
+            return next((t for t in targets if path == t or path.startswith(t.rstrip(os.sep) + os.sep)), None)
+        for target_dir, mod_key, signature in changes:
+            backups = {k: v for k, v in self._backup_files.items() if owner(k) == target_dir}
+            store.put(target_dir, mod_key, signature, backups,
+                      [f for f in self._mod_files_to_cleanup if owner(f) == target_dir],
+                      [d for d in self._mod_dirs_to_cleanup if owner(d) == target_dir])
+        if self._backup_temp_dir:
+            try: os.rmdir(self._backup_temp_dir)  # только если ничего не бэкапилось
+            except OSError: pass
+        self._backup_files, self._mod_files_to_cleanup, self._mod_dirs_to_cleanup = {}, [], []
+        self._backup_temp_dir = None
+        self._clear_session_manifest()
+
+    def _is_xdelta_mod(self, mod_info, source_dir: str, chapter_id: Optional[int] = None) -> bool:
+        """Определяет, является ли мод xdelta-модом (для локальных и публичных модов)."""
+        # Для публичных модов проверяем флаг is_piracy_protected
+        if mod_info and getattr(mod_info, 'is_xdelta', getattr(mod_info, 'is_piracy_protected', False)):
+            return True
+
+        # Для локальных модов ищем .xdelta файлы в папке конкретной главы
+        # ВАЖНО: не используем корневую папку как fallback для глав > 0, иначе патч меню попадет в главы
+        if chapter_id is not None:
+            search_dir = None
+            if chapter_id == -1:  # Демо
+                demo_dir = os.path.join(source_dir, "demo")
+                if os.path.isdir(demo_dir):
+                    search_dir = demo_dir
+                else:
+                    # Для демо допускаем патч из корня мода
+                    search_dir = source_dir
+            elif chapter_id == 0:  # Меню
+                chapter0_dir = os.path.join(source_dir, "chapter_0")
+                menu_dir_alt = os.path.join(source_dir, "menu")
+                if os.path.isdir(chapter0_dir):
+                    search_dir = chapter0_dir
+                elif os.path.isdir(menu_dir_alt):
+                    search_dir = menu_dir_alt
+                else:
+                    # Для меню разрешаем искать патч в корне мода
+                    search_dir = source_dir
+            else:  # Главы 1-4
+                chapter_dir = os.path.join(source_dir, f"chapter_{chapter_id}")
+                if os.path.isdir(chapter_dir):
+                    search_dir = chapter_dir
+            # Если специальной папки нет (и это не меню) — считаем, что для этой главы xdelta нет
+            if not search_dir:
+                return False
+        else:
+            search_dir = source_dir
+
+        # Ищем .xdelta файлы в выбранной папке
+        print(f"[XDELTA-DEBUG] _is_xdelta_mod: chapter_id={chapter_id}, search_dir={search_dir}")
+        if os.path.exists(search_dir):
+            for root, _, files in os.walk(search_dir):
+                for file in files:
+                    if file.lower().endswith('.xdelta'):
+                        return True  # Наличие .xdelta файла означает xdelta мод только для этой главы
+
+        return False
+
+    def _create_backup_and_copy_mod_files(self, source_dir: str, target_dir: str, chapter_id: Optional[int] = None, mod_info=None):
+        """Создает резервную копию оригинальных файлов и копирует файлы мода с поддержкой xdelta патчинга."""
+
+        if not os.path.isdir(source_dir):
+            self.update_status_signal.emit(tr("errors.mod_folder_not_found_simple", path=source_dir), UI_COLORS["status_error"])
+            return False
+
+        # Списки очистки и манифест сессии готовит _apply_chapter_jobs до запуска потоков
+
+        # Определяем, является ли мод xdelta-модом
+        is_xdelta_mod = self._is_xdelta_mod(mod_info, source_dir, chapter_id)
+
+        # В рамках одной главы применяем не более ОДНОГО xdelta патча
+        applied_xdelta_for_this_chapter = False
+
+        files_copied = 0
+        apply_methods: Dict[str, int] = {}
+
+        # Определяем, откуда брать файлы для данной главы
+        if chapter_id is not None:
+            # Определяем точную папку для главы
+            chapter_folder_name = { -1: "demo", 0: "chapter_0" }.get(chapter_id, f"chapter_{chapter_id}")
+            mod_source_dir = os.path.join(source_dir, chapter_folder_name)
+
+            if not os.path.isdir(mod_source_dir):
+                if chapter_id == 0:
+                    # Совместимость со старыми установками, где использовалась папка 'menu'
+                    alt_menu_dir = os.path.join(source_dir, "menu")
+                    if os.path.isdir(alt_menu_dir):
+                        mod_source_dir = alt_menu_dir
+                    else:
+                        mod_source_dir = source_dir  # разрешаем корень как fallback для меню
+                elif chapter_id == -1:
+                    mod_source_dir = source_dir
+                else:
+                    # ВАЖНО: не используем корень как fallback для глав > 0, чтобы не тянуть корневой патч в главы
+                    mod_source_dir = None
+        else:
+            mod_source_dir = source_dir
+
+        if not mod_source_dir or not os.path.isdir(mod_source_dir):
+            self.update_status_signal.emit(tr("status.no_files_to_copy"), UI_COLORS["status_warning"])
+            return True
+
+        # Создаем временную папку для резервных копий
+        if not hasattr(self, '_backup_temp_dir') or not self._backup_temp_dir:
+            self._make_backup_temp_dir()
+
+        print(f"[XDELTA-DEBUG] _create_backup_and_copy_mod_files: chapter_id={chapter_id}, mod_source_dir={mod_source_dir}, target_dir={target_dir}, is_xdelta_mod={is_xdelta_mod}")
+        for root, _, files in os.walk(mod_source_dir):
+            for file in files:
+                # Пропускаем служебные файлы и иконки
+                if file.lower() == 'config.json' or file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico')):
+                    continue
+
+                cache_file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(cache_file_path, mod_source_dir)
+                file_lower = file.lower()
+
+                # Переименование файлов в зависимости от платформы
+                target_rel_path = rel_path
+
+                # Определяем, является ли это ядровым DATA файлом (включая .xdelta файлы)
+                is_core_data_file = (
+                    file_lower in ('data.win', 'data.ios', 'game.ios') or
+                    file_lower.endswith('.win') and 'data' in file_lower or
+                    file_lower.endswith('.ios') and 'game' in file_lower or
+                    (is_xdelta_mod and file_lower.endswith('.xdelta'))  # Для xdelta модов любой .xdelta файл - это core data
+                )
+
+
+
+                if platform.system() == "Darwin":
+                    # На macOS
+                    if is_core_data_file:
+                        # Ядровые файлы переименовываем полностью в game.ios
+                        target_rel_path = os.path.join(os.path.dirname(rel_path), "game.ios")
+                    elif file_lower.endswith('.win'):
+                        # Для остальных файлов только меняем расширение .win → .ios
+                        name_without_ext = os.path.splitext(file)[0]
+                        target_rel_path = os.path.join(os.path.dirname(rel_path), name_without_ext + ".ios")
+                else:
+                    # На других платформах
+                    if is_core_data_file:
+                        # Ядровые файлы переименовываем полностью в data.win
+                        target_rel_path = os.path.join(os.path.dirname(rel_path), "data.win")
+                    elif file_lower.endswith('.ios'):
+                        # Для остальных файлов только меняем расширение .ios → .win
+                        name_without_ext = os.path.splitext(file)[0]
+                        target_rel_path = os.path.join(os.path.dirname(rel_path), name_without_ext + ".win")
+
+                game_file_path = os.path.join(target_dir, target_rel_path)
+
+                try:
+                    target_dirname = os.path.dirname(game_file_path)
+                    os.makedirs(target_dirname, exist_ok=True)
+                    # Запоминаем созданные папки для последующей очистки (если останутся пустыми)
+                    self._record_session_changes(mod_dirs=[target_dirname])
+
+                    # Для xdelta модов обрабатываем .xdelta файлы отдельно
+                    if is_xdelta_mod and file_lower.endswith('.xdelta') and is_core_data_file:
+                        # Применяем только один патч на главу и только к целевому data файлу
+                        if applied_xdelta_for_this_chapter:
+                            continue
+
+                        print(f"[XDELTA-DEBUG] Chapter {chapter_id}: applying xdelta '{cache_file_path}' -> original in '{target_dir}' (computed game_file_path={game_file_path})")
+                        if not self._apply_xdelta_patch(cache_file_path, game_file_path, target_dir):
+                            self.update_status_signal.emit(tr("errors.xdelta_apply_error", file=file), UI_COLORS["status_error"])
+                            return False
+                        files_copied += 1
+                        applied_xdelta_for_this_chapter = True
+                        continue
+
+                    # Пропускаем .xdelta файлы для обычных модов
+                    if file_lower.endswith('.xdelta'):
+                        continue
+
+                    # Резервное копирование оригинального файла, если он существует
+                    if os.path.exists(game_file_path) and game_file_path not in self._backup_files:
+                        # --- ИСПРАВЛЕНИЕ: Создаем уникальное имя для бэкапа, чтобы избежать коллизий ---
+                        unique_hash = hashlib.md5(game_file_path.encode('utf-8')).hexdigest()
+                        backup_filename = f"{unique_hash}_{os.path.basename(game_file_path)}"
+                        backup_file_path = os.path.join(self._backup_temp_dir, backup_filename)
+                        # --- КОНЕЦ ИСПРАВЛЕНИЯ ---
+                        os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
+
+                        # Перемещаем оригинал в резервную папку
+                        self._move_to_backup(game_file_path, backup_file_path)
+                        self._record_session_changes(backup_files={game_file_path: backup_file_path})
+
+                    # Проверяем, является ли файл архивом
+                    if file_lower.endswith(('.zip', '.rar', '.7z')) and not is_core_data_file:
+                        # Для архивов - распаковываем содержимое и добавляем все извлеченные файлы в список очистки
+                        extracted_files = self._extract_archive_to_target(cache_file_path, target_dir)
+                        if extracted_files:
+                            self._record_session_changes(mod_files=extracted_files)
+                        files_copied += 1
+                    else:
+                        # Для обычных файлов - reflink на том же томе, иначе копия (hardlink делил бы inode с хранилищем)
+                        method = self._place_file(cache_file_path, game_file_path)
+                        apply_methods[method] = apply_methods.get(method, 0) + 1
+                        files_copied += 1
+                        # Добавляем файл в список для последующей очистки
+                        self._record_session_changes(mod_files=[game_file_path])
+
+                except Exception as e:
+                    self.update_status_signal.emit(tr("errors.file_copy_error", file=file, error=str(e)), UI_COLORS["status_error"])
+
+        if apply_methods:
+            logging.debug(f"Apply: chapter {chapter_id}: " + ", ".join(f"{m}={n}" for m, n in sorted(apply_methods.items())))
+        if files_copied > 0:
+            self.update_status_signal.emit(tr("status.files_copied_count", count=files_copied), UI_COLORS["status_info"])
+        else:
+            self.update_status_signal.emit(tr("status.no_files_to_copy"), UI_COLORS["status_warning"])
+
+        return True
+
+    def _apply_xdelta_patch(self, xdelta_file_path: str, target_game_file_path: str, target_dir: str) -> bool:
+        """Применяет xdelta патч к оригинальному data файлу с поддержкой альтернативных форматов."""
+
+        if importlib.util.find_spec("pyxdelta") is None:
+            self._show_critical(tr("errors.xdelta_error"), tr("errors.xdelta_unavailable"))
+            return False
+
+        # Определяем возможные имена data файлов
+        data_win = os.path.join(target_dir, "data.win")
+        game_ios = os.path.join(target_dir, "game.ios")
+
+        # Определяем приоритетный файл на основе ОС
+        if platform.system() == "Darwin":
+            primary_file = game_ios
+            secondary_file = data_win
+        else:
+            primary_file = data_win
+            secondary_file = game_ios
+
+        # Ищем существующий data файл
+        print(f"[XDELTA-DEBUG] _apply_xdelta_patch: xdelta_file={xdelta_file_path}, target_dir={target_dir}")
+        original_data_file = None
+        if os.path.exists(primary_file):
+            original_data_file = primary_file
+        elif os.path.exists(secondary_file):
+            original_data_file = secondary_file
+
+        print(f"[XDELTA-DEBUG] original_data_file={original_data_file}")
+        if not original_data_file:
+            self._show_critical(tr("errors.xdelta_error"), tr("errors.original_data_file_not_found", target_dir=target_dir))
+            return False
+
+        # Результат зависит только от оригинала и патча — при совпадении хэшей декодирование не нужно
+        patch_cache, cache_key = PatchedOutputCache.instance(), None
+        try:
+            with self._trace().phase("xdelta.hash"):
+                cache_key = patch_cache.key_for(original_data_file, xdelta_file_path)
+        except Exception as e:
+            logging.warning(f"xdelta: patch cache unavailable: {e}")
+        cached_output = patch_cache.get(cache_key) if cache_key else None
+
+        def backup_original():
+            # Оригинал уходит в бэкап только после удачного декодирования — при ошибке трогать нечего
+            if original_data_file not in self._backup_files:
+                os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
+                self._move_to_backup(original_data_file, backup_file_path)
+                self._record_session_changes(backup_files={original_data_file: backup_file_path})
+
+        def place_output(output_file):
+            # Удачный результат уходит в кэш, в игру — ссылкой на него (или переносом/копией)
+            if cache_key:
+                try: output_file = patch_cache.put(cache_key, output_file)
+                except Exception as e: logging.warning(f"xdelta: patch cache store failed: {e}")
+            backup_original()
+            if output_file.startswith(patch_cache.root): self._place_file(output_file, original_data_file)
+            else: shutil.move(output_file, original_data_file)
+            self._record_session_changes(mod_files=[original_data_file])
+
+        alt_source = None
+        try:
+            # Используем общую временную папку для резервных копий
+            if not hasattr(self, '_backup_temp_dir') or not self._backup_temp_dir:
+                self._make_backup_temp_dir()
+
+            unique_hash = hashlib.md5(original_data_file.encode('utf-8')).hexdigest()
+            backup_filename = f"xdelta_{unique_hash}_{os.path.basename(original_data_file)}"
+            backup_file_path = os.path.join(self._backup_temp_dir, backup_filename)
+
+            # FIX: Only back up the file if it hasn't been backed up already in this session
+            if not hasattr(self, '_backup_files'):
+                self._backup_files = {}
+
+            if cached_output:
+                logging.debug(f"xdelta: patch cache hit: {cache_key}")
+                backup_original()
+                self._place_file(cached_output, original_data_file)
+                self._record_session_changes(mod_files=[original_data_file])
+                self.update_status_signal.emit(tr("status.xdelta_patch_applied", patch_name=os.path.basename(xdelta_file_path)), UI_COLORS["status_success"])
+                return True
+
+            # Оригинал и патч читаются на месте; результат пишется сразу в кэш (или рядом с data-файлом)
+            output_file = os.path.join(patch_cache.root, f"{cache_key}.part") if cache_key else f"{original_data_file}.patched"
+
+            def try_patch_with_format(original_file, format_name):
+                """Попытка применить патч с определенным форматом файла."""
+                stats = run_xdelta("decode", original_file, xdelta_file_path, output_file)
+                self._trace().add("xdelta.decode", stats['seconds'], 1, stats['bytes_written'])
+                logging.info(f"xdelta decode ({format_name}): ok={stats['ok']}, {stats['seconds']:.2f}s, "
+                             f"written={stats['bytes_written'] / (1024 * 1024):.1f} MB, copied={stats['copied_bytes'] / (1024 * 1024):.1f} MB")
+                return stats['ok']
+
+            # Пытаемся применить патч с оригинальным форматом
+            print(f"[XDELTA-DEBUG] Attempt 1: decode with format={os.path.basename(original_data_file)}")
+            if try_patch_with_format(original_data_file, os.path.basename(original_data_file)):
+                # Успешно - кладём результат в кэш и в игру
+                place_output(output_file)
+                self.update_status_signal.emit(tr("status.xdelta_patch_applied", patch_name=os.path.basename(xdelta_file_path)), UI_COLORS["status_success"])
+                return True
+
+            # Если первая попытка не удалась, пробуем с альтернативным форматом:
+            # тот же файл под другим расширением — ссылкой рядом с оригиналом, без копии
+            if original_data_file.endswith('data.win'):
+                alt_source = os.path.join(target_dir, "deltahub_alt_source.ios")
+                alt_format_name = "game.ios"
+            else:  # game.ios
+                alt_source = os.path.join(target_dir, "deltahub_alt_source.win")
+                alt_format_name = "data.win"
+            # Временный вход только для чтения, его удаляет finally — hardlink здесь безопасен
+            link_or_copy(original_data_file, alt_source, allow_hardlink=True)
+
+            print(f"[XDELTA-DEBUG] Attempt 2: decode with alt_format={alt_format_name}")
+            if try_patch_with_format(alt_source, alt_format_name):
+                # Успешно - кладём результат в кэш и в игру
+                place_output(output_file)
+                self.update_status_signal.emit(tr("status.xdelta_patch_applied_alt", patch_name=os.path.basename(xdelta_file_path)), UI_COLORS["status_success"])
+                return True
+
+            # Обе попытки не удались; оригинал ещё на месте
+            self._show_critical(tr("errors.xdelta_patch_failed"),
+            tr("errors.patch_incompatible", patch_name=os.path.basename(xdelta_file_path)))
+            return False
+
+        except Exception as e:
+            self._show_critical(tr("errors.xdelta_critical_error"), tr("errors.xdelta_patch_critical_error", error=str(e)))
+            return False
+        finally:
+            # Убираем временную ссылку для альтернативной попытки
+            if alt_source and os.path.exists(alt_source):
+                try:
+                    os.remove(alt_source)
+                except Exception as e:
+                    logging.warning(f"xdelta: failed to remove {alt_source}: {e}")
+
+    def _extract_archive_to_target(self, archive_path: str, target_dir: str):
+        """Раскладывает содержимое архива в целевую директорию и возвращает список размещённых файлов.
+
+        Архив распаковывается один раз в ExtractedArchiveCache; на запуске файлы берутся из готового дерева.
+        """
+        extracted_files = []
+
+        try:
+            with self._trace().phase("archive.unpack") as rec:
+                tree_dir = ExtractedArchiveCache.instance().ensure(archive_path)
+                rec["files"] = 1
+            apply_methods: Dict[str, int] = {}
+
+            for root, dirs, files in os.walk(tree_dir):
+                for file in files:
+                    source_file = os.path.join(root, file)
+                    rel_path = os.path.relpath(source_file, tree_dir)
+                    target_file = os.path.join(target_dir, rel_path)
+                    file_lower = file.lower()
+                    if platform.system() == "Darwin":
+                        if file_lower.endswith('.win'):
+                            name_without_ext = os.path.splitext(file)[0]
+                            target_file = os.path.join(os.path.dirname(target_file), name_without_ext + ".ios")
+                    else:
+                        if file_lower.endswith('.ios'):
+                            name_without_ext = os.path.splitext(file)[0]
+                            target_file = os.path.join(os.path.dirname(target_file), name_without_ext + ".win")
+
+                    target_dirname = os.path.dirname(target_file)
+                    os.makedirs(target_dirname, exist_ok=True)
+                    self._record_session_changes(mod_dirs=[target_dirname])
+
+                    # Создаем резервную копию, если файл уже существует
+                    if os.path.exists(target_file):
+                        backup_rel_path = os.path.relpath(target_file, target_dir)
+                        if hasattr(self, '_backup_temp_dir') and self._backup_temp_dir:
+                            backup_file_path = os.path.join(self._backup_temp_dir, backup_rel_path)
+                            os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
+                            self._move_to_backup(target_file, backup_file_path)
+                            self._record_session_changes(backup_files={target_file: backup_file_path})
+
+                    # Дерево в кэше остаётся для следующих запусков — ссылка/клон, иначе копия
+                    method = self._place_file(source_file, target_file)
+                    apply_methods[method] = apply_methods.get(method, 0) + 1
+                    extracted_files.append(target_file)
+            logging.debug(f"Apply: archive {os.path.basename(archive_path)}: " + ", ".join(f"{m}={n}" for m, n in sorted(apply_methods.items())))
+
+        except Exception as e:
+            self.update_status_signal.emit(tr("errors.archive_unpack_error", archive_name=os.path.basename(archive_path), error=str(e)), UI_COLORS["status_error"])
+
+        return extracted_files
+
+    def _determine_launch_config(self, selections: Dict[int, str]) -> Optional[Dict[str, Any]]:
+        use_steam = self.local_config.get('launch_via_steam', False)
+        direct_launch_slot_id = self.local_config.get('direct_launch_slot_id', -1)
+
+        # Прямой запуск работает если выбран слот > 0
+        direct_launch = (direct_launch_slot_id > 0 and
+                        self.game_mode.direct_launch_allowed and
+                        platform.system() != "Darwin")
+
+        if use_steam:
+            return {'target': f"steam://rungameid/{self.game_mode.steam_id}", 'cwd': None, 'type': 'webbrowser'}
+
+        if direct_launch:
+            # Запускаем прямой запуск для выбранного слота
+            return self._handle_direct_launch(direct_launch_slot_id)
+
+        # Обычный запуск (не Steam, не прямой запуск)
+        launch_target = self._get_executable_path()
+        if not launch_target:
+            self.update_status_signal.emit(tr("errors.executable_not_found"), UI_COLORS["status_error"])
+            return None
+        if getattr(self, '_overlay_root', None):
+            return {'target': self._overlay_path(launch_target), 'cwd': self._overlay_root, 'type': 'subprocess'}
+        return {'target': launch_target, 'cwd': self._get_current_game_path(), 'type': 'subprocess'}
+
+    def _handle_direct_launch(self, selected_tab_index: int) -> Optional[Dict[str, Any]]:
+        chapter_folder = self._get_target_dir(self.game_mode.get_chapter_id(selected_tab_index))
+        source_exe = self._get_source_executable_path()
+        use_custom_exe = self.local_config.get("use_custom_executable", False)
+
+        if not chapter_folder or not source_exe:
+            self.update_status_signal.emit(tr("errors.direct_launch_error"), UI_COLORS["status_error"])
+            return None
+
+        try:
+            if not ensure_writable(chapter_folder):
+                raise PermissionError(tr("errors.no_write_permission_for", path=chapter_folder))
+
+            if use_custom_exe:
+                target_exe = os.path.join(chapter_folder, os.path.basename(source_exe))
+            else:
+                # Use appropriate executable name based on game mode
+                exe_name = "UNDERTALE.exe" if isinstance(self.game_mode, UndertaleGameMode) else "DELTARUNE.exe"
+                target_exe = os.path.join(chapter_folder, exe_name)
+
+            if os.path.exists(target_exe): make_replaceable(target_exe)
+            link_or_copy(source_exe, target_exe)
+            self._direct_launch_cleanup_info = {
+                'target_exe': target_exe,
+                'source_exe': source_exe,
+                'chapter_folder': chapter_folder,
+                'use_custom_exe': use_custom_exe
+            }
+            # Записываем в манифест для восстановления после сбоев
+            self._update_session_manifest(direct_launch=self._direct_launch_cleanup_info)
+
+            return {'target': target_exe, 'cwd': chapter_folder, 'type': 'subprocess'}
+
+        except PermissionError as e:
+            if not self.is_shortcut_launch:
+                self._handle_permission_error(e.filename or chapter_folder)
+            return None
+
+    def _restore_files(self, backup_files: dict, mod_files: list, mod_dirs: list):
+        """Возвращает оригиналы из бэкапов, удаляет файлы модов и опустевшие созданные папки."""
+        # Сначала восстанавливаем оригинальные файлы из резервной копии
+        for original_path, backup_path in backup_files.items():
+            try:
+                if os.path.exists(backup_path):
+                    # Удаляем модифицированный файл если он есть
+                    if os.path.exists(original_path):
+                        os.remove(original_path)
+
+                    # Восстанавливаем оригинальный файл
+                    os.makedirs(os.path.dirname(original_path), exist_ok=True)
+                    shutil.move(backup_path, original_path)
+            except Exception as e:
+                continue  # Продолжаем с другими файлами
+
+        # Удаляем остальные файлы модов (которые не были резервными)
+        for file_path in mod_files:
+            # Не удаляем файлы, для которых мы только что восстановили оригиналы
+            if file_path in backup_files:
+                continue
+            try:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            except Exception as e:
+                continue
+
+        # Пытаемся удалить созданные пустые директории (в обратном порядке вложенности)
+        for d in sorted(set(mod_dirs), key=lambda p: len(p.split(os.sep)), reverse=True):
+            try:
+                if os.path.isdir(d) and not os.listdir(d):
+                    os.rmdir(d)
+            except Exception:
+                pass
+
+    def _cleanup_direct_launch_files(self):
+        """Очищает файлы модов и восстанавливает оригинальные файлы."""
+        trace, started = getattr(self, '_launch_trace', None), time.perf_counter()
+        try:
+            dirs = getattr(self, '_mod_dirs_to_cleanup', None) or (self._load_session_manifest() or {}).get('mod_dirs_to_cleanup', [])
+            backups, mod_files = getattr(self, '_backup_files', None) or {}, getattr(self, '_mod_files_to_cleanup', None) or []
+            self._restore_files(backups, mod_files, dirs)
+            restored = len(set(backups) | set(mod_files))
+            self._backup_files, self._mod_files_to_cleanup, self._mod_dirs_to_cleanup = {}, [], []
+
+            # Удаляем временную папку резервных копий
+            if hasattr(self, '_backup_temp_dir') and self._backup_temp_dir and os.path.exists(self._backup_temp_dir):
+                try:
+                    shutil.rmtree(self._backup_temp_dir)
+                    # Опустевшую .deltahub-backups создали мы; заданную пользователем backup_dir не трогаем
+                    area = os.path.dirname(self._backup_temp_dir)
+                    if os.path.basename(area) == BACKUP_AREA_NAME and os.path.normpath(area) != os.path.normpath(self.local_config.get("backup_dir") or ""):
+                        try: os.rmdir(area)
+                        except OSError: pass
+                    self._backup_temp_dir = None
+                except Exception as e:
+                    pass
+
+            # Существующая логика для прямого запуска
+            cleanup_info = getattr(self, '_direct_launch_cleanup_info', None)
+            if cleanup_info:
+                if 'target_exe' in cleanup_info and os.path.exists(cleanup_info['target_exe']):
+                    os.remove(cleanup_info['target_exe'])
+                self._direct_launch_cleanup_info = None
+
+            # Изолированный запуск: реальная папка игры не менялась, оверлей — одни ссылки
+            if getattr(self, '_overlay_root', None):
+                shutil.rmtree(self._overlay_root, ignore_errors=True)
+                self._overlay_root = None
+
+            self.update_status_signal.emit(tr("status.files_restored"), UI_COLORS["status_success"])
+            # Удаляем файл-манифест после успешного восстановления
+            self._clear_session_manifest()
+            if trace:
+                trace.add("cleanup", time.perf_counter() - started, restored)
+                trace.finish("cleanup"); self._launch_trace = None
+
+        except Exception as e:
+            self.update_status_signal.emit(tr("errors.files_restore_error", error=str(e)), UI_COLORS["status_error"])
+
+    def _use_overlay_launch(self) -> bool:
+        # Steam запускает игру из своей папки — оверлей там не поможет
+        return (platform.system() == "Linux" and self.local_config.get("isolated_launch", False)
+                and not self.local_config.get("launch_via_steam", False))
+
+    def _overlay_path(self, path: str) -> str:
+        game_root = os.path.normpath(self._get_current_game_path() or "")
+        if self._overlay_root and path and os.path.normpath(path).startswith(game_root + os.sep):
+            return os.path.join(self._overlay_root, os.path.relpath(path, game_root))
+        return path
+
+    def _build_launch_overlay(self) -> bool:
+        """Собирает оверлей запуска: симлинки на все файлы игры, сами исполняемые файлы — ссылкой/копией.
+
+        Кладётся рядом с папкой игры (тот же том — hardlink для exe), иначе в данные пользователя.
+        """
+        game_root = os.path.normpath(self._get_current_game_path() or "")
+        if not os.path.isdir(game_root):
+            return False
+        parent, name = os.path.dirname(game_root), f".deltahub-overlay-{uuid.uuid4().hex[:8]}"
+        overlay = os.path.join(parent, name) if os.access(parent, os.W_OK) else os.path.join(get_user_data_root(), "overlay", name)
+        base = "UNDERTALE" if isinstance(self.game_mode, UndertaleGameMode) else "DELTARUNE"
+        if getattr(self, '_overlay_root', None):
+            shutil.rmtree(self._overlay_root, ignore_errors=True)  # остался от неудачной подготовки
+        started = time.monotonic()
+        try:
+            self._update_session_manifest(overlay_dir=overlay)
+            count = build_symlink_farm(game_root, overlay, materialize={base, f"{base}.exe"})
+        except Exception as e:
+            shutil.rmtree(overlay, ignore_errors=True)
+            self.update_status_signal.emit(tr("errors.file_prep_error", error=str(e)), UI_COLORS["status_error"])
+            return False
+        self._overlay_root = overlay
+        # Бэкапы внутри оверлея — это перемещения симлинков, восстанавливать их не нужно
+        self._backup_temp_dir = os.path.join(overlay, ".deltahub-backup")
+        os.makedirs(self._backup_temp_dir, exist_ok=True)
+        logging.info(f"Launch overlay: {count} entries linked into {overlay} in {time.monotonic() - started:.2f}s")
+        return True
+
+    def _get_source_executable_path(self):
+        if self.local_config.get("use_custom_executable", False):
+            cfg_key = self.game_mode.get_custom_exec_config_key()
+            return self.local_config.get(cfg_key, "")
+        return self._get_executable_path()
+
+    def _write_json(self, path: str, data):
+        try:
+            dir_path = os.path.dirname(path)
+            os.makedirs(dir_path, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
+        except (PermissionError, OSError) as e:
+            self._handle_permission_error(os.path.dirname(path))
+        except Exception as e:
+            self.update_status_signal.emit(tr("errors.file_write_error", error=str(e)), UI_COLORS["status_error"])
+
+    def _read_json(self, path: str):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                
+            # Migration logic for chapters -> files
+            if isinstance(data, dict) and path.endswith("config.json"):
+                needs_migration = False
+                
+                # Migrate chapters to files
+                if "chapters" in data and "files" not in data:
+                    data["files"] = data["chapters"]
+                    del data["chapters"]
+                    needs_migration = True
+                
+                # Migrate is_demo_mod to modtype
+                if "is_demo_mod" in data and "modtype" not in data:
+                    if data.get("is_demo_mod", False):
+                        data["modtype"] = "deltarunedemo"
+                    else:
+                        data["modtype"] = "deltarune"  # Default
+                    del data["is_demo_mod"]
+                    needs_migration = True
+                
+                # Save migrated config back to file
+                if needs_migration:
+                    self._write_json(path, data)
+                    
+            return data
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            backup_path = f"{path}.invalid.bak"
+            try:
+                os.replace(path, backup_path)
+            except OSError:
+                 pass
+            self.update_status_signal.emit(
+                tr("dialogs.corrupted_files_found"),
+                UI_COLORS["status_warning"]
+            )
+            return {}
+
+    def _get_executable_path(self):
+        use_custom_exe = self.local_config.get("use_custom_executable", False)
+        if use_custom_exe:
+            custom_path = self.local_config.get(self.game_mode.get_custom_exec_config_key(), "")
+            if custom_path and os.path.isfile(custom_path):
+                return custom_path
+
+        current_game_path = self._get_current_game_path()
+        if not current_game_path or not os.path.isdir(current_game_path):
+            return None
+
+        system = platform.system()
+        
+        # Determine base executable name based on game mode
+        is_undertale = isinstance(self.game_mode, UndertaleGameMode)
+        base_exe_name = "UNDERTALE" if is_undertale else "DELTARUNE"
+        exe_extension = ".exe" if system in ["Windows", "Linux"] else ""
+
+        if system == "Windows":
+            exe_path = os.path.join(current_game_path, f"{base_exe_name}.exe")
+            if os.path.isfile(exe_path):
+                return exe_path
+        elif system == "Linux":
+            exe_path = os.path.join(current_game_path, f"{base_exe_name}.exe")
+            if os.path.isfile(exe_path):
+                return exe_path
+
+            native_path = os.path.join(current_game_path, base_exe_name)
+            if os.path.isfile(native_path):
+                return native_path
+        elif system == "Darwin":
+            if current_game_path.endswith(".app") and os.path.isdir(current_game_path):
+                app_path = current_game_path
+            else:
+                app_path = None
+                if is_undertale:
+                    app_names = ["UNDERTALE.app"]
+                else:
+                    app_names = ["DELTARUNE.app", "DELTARUNEdemo.app"]
+                    
+                for name in app_names:
+                    candidate = os.path.join(current_game_path, name)
+                    if os.path.isdir(candidate):
+                        app_path = candidate
+                        break
+            if app_path:
+                return app_path
+
+        if not self.is_shortcut_launch:
+            self.update_status_signal.emit(tr("errors.executable_not_found_deltarune"), UI_COLORS["status_error"])
+        return None
+
+    def _get_target_dir(self, chapter_id):
+        # При изолированном запуске моды применяются к оверлею, а не к папке игры
+        target_base = getattr(self, '_overlay_root', None) or self._get_current_game_path()
+        if not target_base: return None
+        if platform.system() == "Darwin":
+            if not target_base.endswith(".app"):
+                for app_name in ("DELTARUNE.app", "DELTARUNEdemo.app"):
+                    candidate = os.path.join(target_base, app_name)
+                    if os.path.isdir(candidate):
+                        target_base = candidate
+                        break
+            target_base = os.path.join(target_base, "Contents", "Resources")
+            if not os.path.isdir(target_base):
+                return None
+        if chapter_id == -1:
+            return target_base
+        if chapter_id == 0:
+            return target_base
+        chapter_prefix = f"chapter{chapter_id}_"
+        try:
+            for entry in os.listdir(target_base):
+                if os.path.isdir(os.path.join(target_base, entry)) and entry.startswith(chapter_prefix):
+                    return os.path.join(target_base, entry)
+            return None
+        except Exception as e:
+            self.update_status_signal.emit(tr("errors.chapter_folder_search_error", error=str(e)), UI_COLORS["status_error"])
+            return None
+
+class _ConsoleSignal:
+    """Заглушка pyqtSignal для запуска без GUI: сообщения просто печатаются."""
+    def emit(self, message, *_): print(message)
+
+class ShortcutLaunch(GameLaunchMixin):
+    """Запуск игры из ярлыка без GUI: без QApplication, виджетов, каталога и обхода всех модов.
+
+    Читает config.json лаунчера и только папки модов, записанные в ярлыке. Файлы применяются тем же
+    GameLaunchMixin, что и при обычном запуске; модуль не импортирует launcher.py с его виджетами.
+    Затем процесс ждёт выхода игры на её PID и откатывает файлы.
+    """
+    is_shortcut_launch = True
+
+    def __init__(self, settings_b64: str):
+        self.update_status_signal = self.error_signal = _ConsoleSignal()
+        self.config_dir = get_app_support_path()
+        self.config_path = os.path.join(self.config_dir, "config.json")
+        self.local_config = self._read_json(self.config_path) or {}
+        self.settings = json.loads(base64.b64decode(settings_b64).decode('utf-8'))
+        self.mods_dir = self.settings.get("mods_dir") or get_user_mods_dir()
+        if not os.path.isdir(self.mods_dir): self.mods_dir = get_user_mods_dir()
+        self.all_mods: List[ModInfo] = []
+        self._mod_configs: Dict[str, dict] = {}
+        self._direct_launch_cleanup_info, self._overlay_root, self._launch_trace, self._backup_temp_dir = None, None, None, None
+
+        if self.settings.get("is_undertale_mode", False): self.game_mode: GameMode = UndertaleGameMode()
+        else: self.game_mode = DemoGameMode() if self.settings.get("is_demo_mode", False) else FullGameMode()
+        # Настройки ярлыка перекрывают текущие настройки лаунчера только в памяти
+        game_path = self.settings.get("demo_game_path" if isinstance(self.game_mode, DemoGameMode) else "game_path")
+        if game_path: self.game_mode.set_game_path(self.local_config, game_path)
+        for key in ("launch_via_steam", "use_custom_executable", "direct_launch_slot_id", "custom_executable_path", "demo_custom_executable_path"):
+            if key in self.settings: self.local_config[key] = self.settings[key]
+
+    def _show_critical(self, title: str, text: str): print(f"{title}: {text}")
+    def _handle_permission_error(self, path: str): print(tr("errors.no_write_permission_for", path=path))
+    def _get_mod_config_by_key(self, mod_key: str) -> dict: return self._mod_configs.get(mod_key, {})
+
+    def _find_unrecorded_mods(self, keys: set) -> Dict[str, dict]:
+        """Ярлыки без mod_folders (созданные до записи папок) или переименованная папка: один проход по mods,
+        который прекращается, как только найдены все недостающие ключи."""
+        found: Dict[str, dict] = {}
+        try: entries = list(os.scandir(self.mods_dir))
+        except OSError: return found
+        for entry in entries:
+            if len(found) == len(keys): break
+            data = self._read_json(os.path.join(entry.path, "config.json")) if entry.is_dir() else None
+            if data and data.get("mod_key") in keys: found.setdefault(data["mod_key"], data)
+        logging.info(f"Shortcut mods located by scanning {self.mods_dir}: {sorted(found)}; re-create the shortcut to skip the scan")
+        return found
+
+    def _load_shortcut_mods(self, keys):
+        """Строит ModInfo только для модов ярлыка по config.json из записанных в ярлыке папок."""
+        folders = self.settings.get("mod_folders") or {}
+        configs: Dict[str, dict] = {}
+        for key in keys:
+            data = self._read_json(os.path.join(self.mods_dir, folders[key], "config.json")) if folders.get(key) else None
+            if data and data.get("mod_key") == key: configs[key] = data
+        if (missing := set(keys) - set(configs)):
+            configs.update(self._find_unrecorded_mods(missing))
+        for key in keys:
+            if not (data := configs.get(key)):
+                print(tr("errors.mod_not_found_by_key", mod_key=key)); continue
+            self._mod_configs[key] = data
+            self.all_mods.append(ModInfo(
+                key=key, name=data.get("name", key), version=data.get("version", "1.0.0"), author=data.get("author", ""),
+                tagline=data.get("tagline", ""), game_version=data.get("game_version", ""), description_url="", downloads=0,
+                modtype=data.get("modtype", "deltarune"), is_verified=False, is_xdelta=data.get("is_xdelta", False),
+                # Установщик пишет главу UNDERTALE под ключом '0', а ModInfo ищет её под 'undertale'
+                files={("undertale" if data.get("modtype") == "undertale" and k == "0" else k): ModChapterData(description=data.get("tagline", ""))
+                       for k in (data.get("files") or {})}))
+
+    def _selections(self) -> Dict[int, str]:
+        # Та же раскладка, что и у _get_slot_selections в окне лаунчера
+        mods = self.settings.get("mods") or self.settings.get("selections") or {}
+        if isinstance(self.game_mode, (DemoGameMode, UndertaleGameMode)):
+            return {-1: mods.get("demo" if isinstance(self.game_mode, DemoGameMode) else "undertale") or "no_change"}
+        if mods.get("universal"):
+            mod = next((m for m in self.all_mods if m.key == mods["universal"]), None)
+            return {i: mods["universal"] if mod and mod.get_chapter_data(i) else "no_change" for i in range(5)}
+        return {int(k): v or "no_change" for k, v in mods.items() if k.isdigit()}
+
+    def run(self) -> int:
+        started = time.perf_counter()
+        self._recover_previous_session()
+        current_game_path = self._get_current_game_path()
+        if not current_game_path or not os.path.exists(current_game_path):
+            print(tr("errors.game_files_launch_not_found")); return 1
+
+        self._load_shortcut_mods({k for k in (self.settings.get("mods") or self.settings.get("selections") or {}).values() if k and k != "no_change"})
+        selections = self._selections()
+        trace = self._launch_trace = LaunchTrace(mode="shortcut", overlay=self._use_overlay_launch(),
+                                                 chapters=sum(1 for k in selections.values() if k != "no_change"))
+        if self._use_overlay_launch():
+            with trace.phase("overlay"): ok = self._build_launch_overlay()
+            if not ok: trace.finish("aborted"); return 1
+        with trace.phase("prepare"): ok = self._prepare_game_files(selections)
+        if not ok: trace.finish("aborted"); return 1
+        with trace.phase("launch_config"): launch_config = self._determine_launch_config(selections)
+        if not launch_config:
+            self._cleanup_direct_launch_files(); return 1
+
+        target, process = launch_config['target'], None
+        try:
+            with trace.phase("spawn"):
+                if launch_config['type'] == 'webbrowser': webbrowser.open(target)
+                elif platform.system() == "Darwin" and target.endswith(".app"): process = subprocess.Popen(['open', '-W', target])
+                else: process = subprocess.Popen([target], cwd=launch_config['cwd'])
+        except Exception as e:
+            print(tr("errors.game_launch_failed", error=str(e)))
+            self._cleanup_direct_launch_files(); return 1
+        trace.finish()
+        logging.info(f"Shortcut: game spawned {time.perf_counter() - started:.2f}s after shortcut start")
+
+        increment_launch_counter()
+        wait_for_game_exit(process)
+        self._cleanup_direct_launch_files()
+        return 0
@@ -1,5 +1,6 @@
-import os, platform, re, shutil, stat, sys, tempfile, time, zipfile, psutil, requests
+import atexit, importlib.util, json, logging, os, platform, re, shutil, stat, sys, tempfile, threading, time, zipfile, psutil, requests
 from pathlib import Path
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from PyQt6.QtCore import QThread, QObject, pyqtSignal
@@ -55,6 +56,7 @@ def _fb_url(base: str, path: str, with_auth: bool = True) -> str:
     return url
 STEAM_APP_ID_FULL, STEAM_APP_ID_DEMO, STEAM_APP_ID_UNDERTALE = "1671210", "1690940", "391540"
 GAME_PROCESS_NAMES = ["DELTARUNE.exe", "DELTARUNE", "UNDERTALE.exe", "UNDERTALE", "runner"]
+STEAM_PROCESS_NAMES = ["steam", "steam.exe", "steam_osx"]
 SAVE_SLOT_FINISH_MAP = {0: 3, 1: 4, 2: 5}
 ARCH = platform.machine()
 DEFAULT_FONT_FALLBACK_CHAIN = ["Determination Sans Rus", "DejaVu Sans", "Noto Sans", "Liberation Sans", "Arial", "Noto Color Emoji", "Segoe UI Emoji", "Apple Color Emoji"]
@@ -63,6 +65,363 @@ UI_COLORS = {"status_error": "red", "status_warning": "orange", "status_success"
 THEMES = {"default": {"name": "Deltarune", "background": "assets/bg_fountain.gif", "font_family": "Determination Sans Rus", "font_size_main": 16, "font_size_small": 12, "colors": {"main_fg": "#000000", "top_level_fg": "#000000", "button": "#000000", "button_hover": "#333333", "button_text": "#FFFFFF", "border": "#FFFFFF", "text": "#FFFFFF"}}}
 BROWSER_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
 
+class HttpClient:
+    """Общий HTTP-клиент лаунчера.
+
+    Один Session на процесс: keep-alive пулы по хостам (повторные запросы к Cloud Functions идут
+    по тёплому соединению), единые ретраи с backoff, таймаут по умолчанию и gzip.
+    metrics() показывает, сколько запросов обслужено уже открытыми соединениями.
+    """
+    DEFAULT_TIMEOUT = 10
+
+    def __init__(self, pool_connections: int = 16, pool_maxsize: int = 16):
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        retry_strategy = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self._adapters = []
+        self.session = self._make_session(HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_connections, pool_maxsize=pool_maxsize))
+        # Без ретраев — для проверок связи, где повтор только растягивает ожидание
+        self._probe_session = self._make_session(HTTPAdapter(max_retries=0, pool_connections=4, pool_maxsize=4))
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+
+    def _make_session(self, adapter) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(BROWSER_HEADERS); session.headers["Accept-Encoding"] = "gzip, deflate"
+        session.mount("http://", adapter); session.mount("https://", adapter)
+        self._adapters.append(adapter)
+        return session
+
+    def request(self, method: str, url: str, retries: bool = True, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.DEFAULT_TIMEOUT)
+        with self._lock: self.requests_sent += 1
+        return (self.session if retries else self._probe_session).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response: return self.request("GET", url, **kwargs)
+    def post(self, url: str, **kwargs) -> requests.Response: return self.request("POST", url, **kwargs)
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)  # как у requests.head
+        return self.request("HEAD", url, **kwargs)
+
+    def metrics(self) -> dict:
+        hosts: dict[str, dict] = {}
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None: continue
+                h = hosts.setdefault(f"{pool.scheme}://{pool.host}:{pool.port}", {"connections": 0, "requests": 0})
+                h["connections"] += pool.num_connections; h["requests"] += pool.num_requests
+        connections = sum(h["connections"] for h in hosts.values())
+        served = sum(h["requests"] for h in hosts.values())
+        return {"requests": self.requests_sent, "connections": connections, "reused": max(0, served - connections), "hosts": hosts}
+
+http_client = HttpClient()
+
+class _NetResultBridge(QObject):
+    # Переносит результат из сетевого цикла в GUI-поток (queued-соединение по принадлежности объекта)
+    delivered = pyqtSignal(object, object, object)  # callback, result, error
+    def __init__(self):
+        super().__init__(); self.delivered.connect(self._deliver)
+    def _deliver(self, callback, result, error):
+        try: callback(result, error)
+        except Exception: logging.exception("Net callback error")
+
+class NetService:
+    """Один долгоживущий asyncio-цикл в фоновом потоке для лёгких запросов UI.
+
+    Иконки, скриншоты, превью и проверки URL выполняются как корутины. Блокирующий HTTP идёт через
+    http_client в небольшом фиксированном пуле, так что отдельный поток на запрос больше не создаётся.
+    call() возвращает concurrent.futures.Future и при необходимости вызывает callback(result, error)
+    в GUI-потоке. stats хранит число запросов, ошибок и суммарную задержку.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'NetService':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_workers: int = 16):
+        # По размеру пула соединений http_client: страница плашек не ждёт в очереди к шести потокам
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        from PyQt6.QtCore import QCoreApplication
+        self._bridge = _NetResultBridge()
+        if (app := QCoreApplication.instance()) is not None: self._bridge.moveToThread(app.thread())
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deltahub-net")
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._executor)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="deltahub-net-loop", daemon=True)
+        self._thread.start()
+        self.stats = {"requests": 0, "failures": 0, "latency_total": 0.0}
+
+    def submit(self, coro):
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def call(self, coro, callback=None):
+        """Запускает корутину в сетевом цикле; callback(result, error) вызывается в GUI-потоке."""
+        future = self.submit(coro)
+        if callback is not None:
+            def _done(f):
+                try: result, error = f.result(), None
+                except Exception as e: result, error = None, e
+                self._bridge.delivered.emit(callback, result, error)
+            future.add_done_callback(_done)
+        return future
+
+    async def run_blocking(self, func, *args):
+        return await self._loop.run_in_executor(None, func, *args)
+
+    async def fetch(self, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        self.stats["requests"] += 1
+        try:
+            return await self.run_blocking(lambda: http_client.request(method, url, **kwargs))
+        except Exception:
+            self.stats["failures"] += 1; raise
+        finally:
+            self.stats["latency_total"] += time.perf_counter() - started
+
+    async def fetch_image(self, url: str, timeout: float = 10) -> QImage:
+        resp = await self.fetch("GET", url, timeout=timeout)
+        resp.raise_for_status()
+        # Декодирование — тоже в пуле, QImage можно создавать вне GUI-потока
+        img = await self.run_blocking(lambda: QImage.fromData(resp.content))
+        if img.isNull(): raise ValueError("decode")
+        return img
+
+    async def fetch_thumbnail(self, url: str, kind: str = "screenshot", timeout: float = 10) -> QImage:
+        """Картинка через ImageDiskCache: свежая берётся с диска, устаревшая перепроверяется условным GET."""
+        cache = ImageDiskCache.instance()
+        entry = cache.lookup(url)
+        if entry and not cache.is_stale(entry):
+            if (img := await self.run_blocking(cache.load, url)) is not None: return img
+        try:
+            resp = await self.fetch("GET", url, timeout=timeout, headers=cache.validators(entry))
+            if resp.status_code == 304 and entry:
+                cache.touch(url, revalidated=True)
+                if (img := await self.run_blocking(cache.load, url)) is not None: return img
+                resp = await self.fetch("GET", url, timeout=timeout)  # файл из кэша пропал — качаем целиком
+            resp.raise_for_status()
+        except Exception:
+            # Нет сети — лучше устаревшая картинка, чем заглушка
+            if entry and (img := await self.run_blocking(cache.load, url)) is not None: return img
+            raise
+        return await self.run_blocking(cache.store, url, resp.content, resp.headers, kind)
+
+    async def fetch_icon(self, url: str, size: int, timeout: float = 8) -> QImage:
+        """Квадратная иконка size×size, готовая к setPixmap: обрезка и уменьшение — в пуле, не в GUI-потоке."""
+        cache = ImageDiskCache.instance()
+        if (entry := cache.lookup(url)) and not cache.is_stale(entry):
+            img = await self.run_blocking(read_square_icon, cache.path_of(entry), size)
+            if not img.isNull(): cache.touch(url); return img
+        img = await self.fetch_thumbnail(url, "icon", timeout=timeout)
+        return await self.run_blocking(square_icon_image, img, size)
+
+def _square_rect(w: int, h: int):
+    from PyQt6.QtCore import QRect
+    side = min(w, h)
+    return QRect((w - side) // 2, (h - side) // 2, side, side)
+
+def square_icon_image(img: QImage, size: int) -> QImage:
+    """Центральный квадрат картинки, уменьшенный до size×size."""
+    from PyQt6.QtCore import Qt
+    if img.isNull() or min(img.width(), img.height()) <= 0: return img
+    return img.copy(_square_rect(img.width(), img.height())).scaled(
+        size, size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+def read_square_icon(source, size: int) -> QImage:
+    """Декодирует файл или bytes сразу в квадрат size×size через QImageReader (обрезка и масштаб — при чтении).
+
+    Полноразмерная картинка в памяти не появляется; для форматов без масштабирования в декодере Qt
+    сам уменьшит результат. Можно вызывать вне GUI-потока.
+    """
+    from PyQt6.QtCore import QBuffer, QByteArray, QSize
+    from PyQt6.QtGui import QImageReader
+    if isinstance(source, (bytes, bytearray)):
+        buf = QBuffer(); buf.setData(QByteArray(bytes(source))); buf.open(QBuffer.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buf)
+    else:
+        reader = QImageReader(source)
+    reader.setAutoTransform(True)
+    src = reader.size()
+    if src.isValid() and min(src.width(), src.height()) > 0:
+        reader.setClipRect(_square_rect(src.width(), src.height()))
+        reader.setScaledSize(QSize(size, size))
+        img = reader.read()
+        if not img.isNull() and (img.width(), img.height()) != (size, size): img = square_icon_image(img, size)
+        return img
+    # Размер заранее неизвестен (некоторые .ico) — декодируем целиком и режем после
+    return square_icon_image(reader.read(), size)
+
+class ImageDiskCache:
+    """Дисковый кэш иконок и скриншотов (cache/images/index.json: URL -> уменьшенная копия + ETag/Last-Modified).
+
+    Хранятся уже уменьшенные до THUMB_SIZES картинки, так что повторный запуск не качает и не декодирует
+    полноразмерные оригиналы. Записи моложе MAX_AGE отдаются без сети, более старые перепроверяются
+    условным GET (304 — без тела). Объём ограничен budget байт, вытеснение — LRU.
+    """
+    BUDGET_BYTES = 200 * 1024 ** 2
+    MAX_AGE = 24 * 3600
+    SAVE_DELAY = 5.0
+    THUMB_SIZES = {"icon": (256, 256), "screenshot": (1280, 720)}
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'ImageDiskCache':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, budget: Optional[int] = None):
+        self.root = os.path.join(get_app_support_path(), "images"); os.makedirs(self.root, exist_ok=True)
+        self.budget = budget or self.BUDGET_BYTES
+        self._index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = (_read_json_file(self._index_path) or {}).get("entries", {})
+        self._save_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def _save_locked(self):
+        if self._save_timer: self._save_timer.cancel(); self._save_timer = None
+        try: _write_json_atomic(self._index_path, {"entries": self._entries})
+        except Exception: pass
+
+    def _save_later_locked(self):
+        """Попадания меняют только last_used/fetched — индекс пишется одним разом через SAVE_DELAY, а не на каждое."""
+        if self._save_timer: return
+        self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush); self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self):
+        """Записывает отложенные изменения индекса (по таймеру и при выходе)."""
+        with self._lock:
+            if self._save_timer: self._save_locked()
+
+    def lookup(self, url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and not os.path.isfile(os.path.join(self.root, entry["file"])):
+                self._entries.pop(url, None); self._save_later_locked(); entry = None
+            return dict(entry) if entry else None
+
+    def path_of(self, entry: dict) -> str:
+        return os.path.join(self.root, entry["file"])
+
+    def is_stale(self, entry: dict) -> bool:
+        return time.time() - entry.get("fetched", 0) > self.MAX_AGE
+
+    @staticmethod
+    def validators(entry: Optional[dict]) -> dict:
+        headers = {}
+        if entry and entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, url: str, revalidated: bool = False):
+        with self._lock:
+            if (entry := self._entries.get(url)) is None: return
+            entry["last_used"] = time.time()
+            if revalidated: entry["fetched"] = entry["last_used"]
+            self._save_later_locked()
+
+    def load(self, url: str) -> Optional[QImage]:
+        with self._lock: entry = self._entries.get(url)
+        if not entry: return None
+        img = QImage(os.path.join(self.root, entry["file"]))
+        if img.isNull():
+            with self._lock: self._entries.pop(url, None); self._save_later_locked()
+            return None
+        self.touch(url)
+        return img
+
+    def store(self, url: str, data: bytes, headers, kind: str = "screenshot") -> QImage:
+        """Декодирует ответ, уменьшает до размера kind и кладёт в кэш; возвращает уменьшенную картинку."""
+        import hashlib
+        from PyQt6.QtCore import Qt
+        img = QImage.fromData(data)
+        if img.isNull(): raise ValueError("decode")
+        w, h = self.THUMB_SIZES.get(kind, self.THUMB_SIZES["screenshot"])
+        if img.width() > w or img.height() > h:
+            img = img.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        # PNG сохраняет прозрачность иконок, непрозрачные скриншоты заметно компактнее в JPEG
+        fmt = "png" if img.hasAlphaChannel() else "jpg"
+        name = f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.{fmt}"
+        path = os.path.join(self.root, name); tmp = path + ".part"
+        try:
+            if not img.save(tmp, fmt.upper(), -1 if fmt == "png" else 90): raise OSError("save")
+            os.replace(tmp, path)
+        except Exception:
+            try: os.remove(tmp)
+            except OSError: pass
+            return img
+        now = time.time()
+        with self._lock:
+            old = self._entries.get(url)
+            if old and old["file"] != name:
+                try: os.remove(os.path.join(self.root, old["file"]))
+                except OSError: pass
+            self._entries[url] = {"file": name, "size": os.path.getsize(path), "kind": kind, "etag": headers.get("ETag"),
+                                  "last_modified": headers.get("Last-Modified"), "fetched": now, "last_used": now}
+            self._evict_locked(keep=url); self._save_locked()
+        return img
+
+    def _evict_locked(self, keep: Optional[str] = None):
+        total = sum(e.get("size", 0) for e in self._entries.values())
+        for url in sorted(self._entries, key=lambda k: self._entries[k].get("last_used", 0)):
+            if total <= self.budget: break
+            if url == keep: continue
+            entry = self._entries.pop(url)
+            try: os.remove(os.path.join(self.root, entry["file"]))
+            except OSError: pass
+            total -= entry.get("size", 0)
+
+class ImageMemoryCache:
+    """LRU для декодированных QImage/QPixmap, ограниченный объёмом пикселей (ширина × высота × глубина).
+
+    Число записей не важно: один полноразмерный скриншот весит как сотня иконок, поэтому бюджет считается
+    в байтах. stats() отдаёт попадания, промахи, вытеснения и текущий объём. Потокобезопасен.
+    """
+    def __init__(self, name: str, budget: int):
+        from collections import OrderedDict
+        self.name, self.budget = name, budget
+        self._items: 'OrderedDict[str, tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def cost(img) -> int:
+        try: return max(1, img.width() * img.height() * max(img.depth(), 8) // 8)
+        except Exception: return 1
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None: self.misses += 1; return None
+            self._items.move_to_end(key); self.hits += 1
+            return item[0]
+
+    def put(self, key: str, img) -> None:
+        if img is None: return
+        size = self.cost(img)
+        if size > self.budget: return  # такой не поместится — не выталкиваем ради него весь кэш
+        with self._lock:
+            if (old := self._items.pop(key, None)) is not None: self.bytes -= old[1]
+            self._items[key] = (img, size); self.bytes += size
+            while self.bytes > self.budget and len(self._items) > 1:
+                _, (_, freed) = self._items.popitem(last=False)
+                self.bytes -= freed; self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock: self._items.clear(); self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._items), "bytes": self.bytes, "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
 def resource_path(relative_path: str) -> str:
     """ Get absolute path to resource, works for dev and for PyInstaller """
     if getattr(sys, 'frozen', False):
@@ -108,6 +467,8 @@ class ModExtraFile:
     key: str
     version: str
     url: str
+    deltas: Dict[str, dict] = field(default_factory=dict)  # версия-источник -> {"url", "sha256"} xdelta до version
+    mirrors: List[str] = field(default_factory=list)  # запасные URL того же файла
 
 @dataclass
 class ModChapterData:
@@ -115,6 +476,8 @@ class ModChapterData:
     data_file_url: Optional[str] = None
     data_file_version: Optional[str] = None
     extra_files: List[ModExtraFile] = field(default_factory=list)
+    data_file_deltas: Dict[str, dict] = field(default_factory=dict)
+    data_file_mirrors: List[str] = field(default_factory=list)
 
     def is_valid(self) -> bool:
         return bool(self.data_file_url or self.extra_files)
@@ -161,20 +524,81 @@ class ModInfo:
             return bool(self.files and self.files.get("demo"))
         return bool(self.demo_url and self.demo_version)
 
-def download_and_extract_archive(url: str, target_dir: str, progress_signal, total_size: int, downloaded_ref: list[int], session=None, is_game_installation=False):
+class TransferProgress:
+    """Сводит сырые байты загрузок в редкие обновления прогресса для UI.
+
+    Сигнал уходит только при смене целого процента и не чаще min_interval секунд (100% — всегда),
+    поэтому на любой объём приходится не больше ~101 межпоточного сигнала. Попутно считает
+    скорость по скользящему окну, ETA и прогресс по каждому файлу.
+    """
+    def __init__(self, signal=None, total_bytes: int = 0, downloaded_ref: Optional[list[int]] = None, min_interval: float = 0.1):
+        from collections import deque
+        self.signal, self.total_bytes, self.min_interval = signal, total_bytes, min_interval
+        self.downloaded_ref = downloaded_ref if downloaded_ref is not None else [0]
+        self.files: dict[str, list[int]] = {}  # файл -> [скачано, ожидается]
+        self.emitted = 0
+        self._lock = threading.Lock()
+        self._last_percent, self._last_emit = -1, 0.0
+        self._window = deque()  # (время, всего байт) за последние несколько секунд
+
+    @classmethod
+    def wrap(cls, progress, total_size: int, downloaded_ref: list[int]) -> 'TransferProgress':
+        # Старые вызовы передают сам pyqtSignal — оборачиваем, чтобы троттлинг работал везде
+        return progress if isinstance(progress, cls) else cls(progress, total_size, downloaded_ref)
+
+    @property
+    def downloaded(self) -> int: return self.downloaded_ref[0]
+
+    def start_file(self, key: str, expected: int = 0):
+        with self._lock: self.files.setdefault(key, [0, 0])[1] = expected
+
+    def add(self, nbytes: int, key: Optional[str] = None):
+        now = time.monotonic()
+        with self._lock:
+            self.downloaded_ref[0] += nbytes
+            if key is not None: self.files.setdefault(key, [0, 0])[0] += nbytes
+            self._window.append((now, self.downloaded_ref[0]))
+            while len(self._window) > 2 and now - self._window[0][0] > 3.0: self._window.popleft()
+        self._maybe_emit(now)
+
+    def flush(self):
+        self._maybe_emit(time.monotonic(), force=True)
+
+    def _maybe_emit(self, now: float, force: bool = False):
+        if self.signal is None or self.total_bytes <= 0: return
+        percent = int(min(100, max(0, self.downloaded_ref[0] / self.total_bytes * 100)))
+        with self._lock:
+            if percent == self._last_percent: return
+            if not force and percent < 100 and now - self._last_emit < self.min_interval: return
+            self._last_percent, self._last_emit = percent, now
+        try: self.signal.emit(percent); self.emitted += 1
+        except Exception: pass
+
+    def throughput(self) -> float:
+        with self._lock:
+            if len(self._window) < 2: return 0.0
+            (t0, b0), (t1, b1) = self._window[0], self._window[-1]
+        return (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        speed = self.throughput()
+        if speed <= 0 or self.total_bytes <= 0: return None
+        return max(0.0, (self.total_bytes - self.downloaded_ref[0]) / speed)
+
+    def snapshot(self) -> dict:
+        with self._lock: files = {k: tuple(v) for k, v in self.files.items()}
+        return {"downloaded": self.downloaded, "total": self.total_bytes, "percent": max(0, self._last_percent),
+                "bytes_per_sec": self.throughput(), "eta": self.eta(), "files": files}
+
+def download_and_extract_archive(url: str, target_dir: str, progress_signal, total_size: int, downloaded_ref: list[int], session=None, is_game_installation=False, mirrors: Optional[list[str]] = None):
     import rarfile
     from urllib.parse import urlparse, unquote
-    from requests.adapters import HTTPAdapter
-    from urllib3.util.retry import Retry
     os.makedirs(target_dir, exist_ok=True)
     if session is None:
-        session = requests.Session(); session.headers.update(BROWSER_HEADERS)
-        retry_strategy = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=1, pool_maxsize=10)
-        session.mount("http://", adapter); session.mount("https://", adapter)
+        session = http_client.session
     fname = _get_filename_from_url(session, url)
     with tempfile.TemporaryDirectory(prefix="deltahub-dl-") as tmp:
-        tmp_path = os.path.join(tmp, fname); _download_file(session, url, tmp_path, progress_signal, total_size, downloaded_ref); _extract_archive(tmp_path, target_dir, fname, is_game_installation)
+        tmp_path = os.path.join(tmp, fname); _download_file(session, url, tmp_path, progress_signal, total_size, downloaded_ref, mirrors=mirrors); _extract_archive(tmp_path, target_dir, fname, is_game_installation)
 
 def _get_filename_from_url(session, url):
     try:
@@ -188,23 +612,52 @@ def _get_filename_from_url(session, url):
     except: pass
     return Path(url.split("?", 1)[0]).name or "file.tmp"
 
-def _download_file(session, url, tmp_path, progress_signal, total_size, downloaded_ref, max_retries: int = 5):
+def _download_file(session, url, tmp_path, progress_signal, total_size, downloaded_ref, max_retries: int = 5, mirrors: Optional[list[str]] = None):
     import os, time
-    expected_size = 0
-    try:
-        h = session.head(url, allow_redirects=True, timeout=15)
-        expected_size = int(h.headers.get("content-length", 0))
-    except Exception:
-        expected_size = 0
+    reporter = TransferProgress.wrap(progress_signal, total_size, downloaded_ref)
+    file_key = os.path.basename(tmp_path)
+    # С зеркалами источники упорядочены пробой; обрыв или зависание — докачка с Range со следующего
+    sources = [url, *[m for m in (mirrors or []) if m and m != url]]
+    health = MirrorHealth.instance() if len(sources) > 1 else None
+    if health: sources = health.rank(sources)
+    source_idx = 0
+    identities: dict[str, tuple[int, str]] = {}
+
+    def identity(src: str) -> tuple[int, str]:
+        # (размер, сильный ETag) источника — докачивать с другого зеркала можно, только если файл тот же
+        if src not in identities:
+            try:
+                h = session.head(src, allow_redirects=True, timeout=15)
+                etag = h.headers.get("ETag") or ""
+                identities[src] = (int(h.headers.get("content-length", 0) or 0), "" if etag.startswith("W/") else etag)
+            except Exception:
+                identities[src] = (0, "")
+        return identities[src]
+
+    expected_size = identity(sources[0])[0]
+    partial_source = None  # источник, с которого скачана уже лежащая на диске часть
+    reporter.start_file(file_key, expected_size)
     attempt = 0
-    while attempt < max_retries:
+    max_attempts = max_retries + len(sources) - 1
+    while attempt < max_attempts:
         attempt += 1
+        source = sources[source_idx % len(sources)]
         try:
             current_size = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
             headers = {}
-            if expected_size and 0 < current_size < expected_size:
+            resumable = bool(expected_size) and 0 < current_size < expected_size
+            if resumable and partial_source not in (None, source):
+                (size, etag), (_, partial_etag) = identity(source), identity(partial_source)
+                # Другое зеркало: размер должен совпасть, ETag — если оба его отдают; иначе качаем с нуля
+                resumable = size == expected_size and (not etag or not partial_etag or etag == partial_etag)
+            if resumable:
                 headers["Range"] = f"bytes={current_size}-"
-            r = session.get(url, stream=True, timeout=60, allow_redirects=True, headers=headers)
+                if partial_source in (None, source) and (etag := identity(source)[1]):
+                    headers["If-Range"] = etag  # файл на сервере сменился — придёт целиком (200)
+            # Есть куда переключиться — ждём данные недолго, иначе как раньше
+            timeout = (10, MirrorHealth.STALL_TIMEOUT) if health else 60
+            started = time.monotonic()
+            r = session.get(source, stream=True, timeout=timeout, allow_redirects=True, headers=headers)
             r.raise_for_status()
             status_code = getattr(r, "status_code", 200)
             # If server ignored Range (200) but we have partial data, avoid double-counting progress
@@ -222,6 +675,7 @@ def _download_file(session, url, tmp_path, progress_signal, total_size, download
             except Exception:
                 this_request_expected = 0
             written_this_request = 0
+            partial_source = source
             with open(tmp_path, mode) as f:
                 for chunk in r.iter_content(chunk_size=262144):
                     if not chunk:
@@ -233,16 +687,13 @@ def _download_file(session, url, tmp_path, progress_signal, total_size, download
                         if sz <= duplicate_remaining:
                             duplicate_remaining -= sz
                         else:
-                            add = sz - duplicate_remaining
-                            downloaded_ref[0] += add
+                            reporter.add(sz - duplicate_remaining, file_key)
                             duplicate_remaining = 0
                     else:
-                        downloaded_ref[0] += sz
-                    if total_size > 0:
-                        try:
-                            progress_signal.emit(int(min(100, max(0, downloaded_ref[0] / total_size * 100))))
-                        except Exception:
-                            pass
+                        reporter.add(sz, file_key)
+                    if health and health.is_crawling(written_this_request, time.monotonic() - started):
+                        raise IOError(f"mirror too slow: {source}")
+            reporter.flush()
             final_size = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
             # Validate per-request and overall sizes when known
             if this_request_expected and written_this_request < this_request_expected:
@@ -250,33 +701,176 @@ def _download_file(session, url, tmp_path, progress_signal, total_size, download
             if expected_size and final_size < expected_size:
                 # try to resume more
                 continue
+            if health: health.record(source, True, time.monotonic() - started, written_this_request)
             return
         except Exception:
-            if attempt >= max_retries:
+            if health:
+                health.record(source, False); source_idx += 1
+            if attempt >= max_attempts:
                 raise
             try:
                 time.sleep(min(2.0, 0.2 * attempt))
             except Exception:
                 pass
 
-def _extract_archive(tmp_path, target_dir, fname, is_game_installation=False):
-    import rarfile
-    low = fname.lower()
-    extractors = {
-        "zip": lambda: zipfile.ZipFile(tmp_path, "r").extractall(target_dir),
-        "rar": lambda: rarfile.RarFile(tmp_path, "r").extractall(target_dir)
-    }
-    # Try py7zr if available
+class MirrorHealth:
+    """Здоровье хостов зеркал между сессиями (mirror_health.json: host -> задержка, скорость, сбои).
+
+    rank() параллельно пробует источники и ставит первыми быстрые и недавно не падавшие;
+    скачивание переключается на следующий источник при обрыве, зависании или слишком низкой скорости.
+    """
+    FILE_NAME = "mirror_health.json"
+    STALL_TIMEOUT = 20          # секунд без данных — источник завис
+    SLOW_BPS = 32 * 1024        # ниже этой средней скорости после SLOW_GRACE секунд — переключаемся
+    SLOW_GRACE = 15
+    FAILURE_COOLDOWN = 30 * 60  # столько помним сбой хоста при ранжировании
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'MirrorHealth':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.path = os.path.join(get_app_support_path(), self.FILE_NAME)
+        self._lock = threading.Lock()
+        self.hosts: dict[str, dict] = _read_json_file(self.path) or {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        from urllib.parse import urlparse
+        return urlparse(url).netloc.lower()
+
+    def _save_locked(self):
+        try: _write_json_atomic(self.path, self.hosts)
+        except Exception: pass
+
+    def record(self, url: str, ok: bool, latency: Optional[float] = None, nbytes: int = 0):
+        with self._lock:
+            h = self.hosts.setdefault(self.host_of(url), {"latency": None, "bps": None, "failures": 0, "last_failure": 0})
+            if ok:
+                # Сбой прощается только успешной загрузкой — ответ на пробу ещё не значит, что хост отдаёт файл
+                if nbytes: h["failures"] = max(0, h.get("failures", 0) - 1)
+                # Для полноценных загрузок запоминаем скорость, для проб — задержку (скользящее среднее)
+                key, value = ("bps", nbytes / latency) if nbytes and latency else ("latency", latency)
+                if value is not None: h[key] = value if h.get(key) is None else 0.7 * h[key] + 0.3 * value
+            else:
+                h["failures"] = min(10, h.get("failures", 0) + 1); h["last_failure"] = time.time()
+            self._save_locked()
+
+    def score(self, url: str, probed: Optional[float]) -> float:
+        with self._lock: h = dict(self.hosts.get(self.host_of(url)) or {})
+        if probed is None: return float("inf")
+        penalty = h.get("failures", 0) * 2.0 if time.time() - h.get("last_failure", 0) < self.FAILURE_COOLDOWN else 0.0
+        return probed + penalty + (0.5 * h["latency"] if h.get("latency") else 0.0)
+
+    def probe(self, url: str, timeout: float = 5.0) -> Optional[float]:
+        started = time.monotonic()
+        try:
+            r = http_client.head(url, retries=False, allow_redirects=True, timeout=timeout)
+            ok = r.status_code < 400
+        except Exception:
+            ok = False
+        latency = time.monotonic() - started
+        self.record(url, ok, latency if ok else None)
+        return latency if ok else None
+
+    def rank(self, urls: list[str], timeout: float = 5.0) -> list[str]:
+        """Пробует все источники одновременно; недоступные остаются в конце как последний шанс."""
+        from concurrent.futures import ThreadPoolExecutor
+        urls = list(dict.fromkeys(urls))
+        if len(urls) < 2: return urls
+        with ThreadPoolExecutor(max_workers=min(8, len(urls))) as pool:
+            probed = dict(zip(urls, pool.map(lambda u: self.probe(u, timeout), urls)))
+        return sorted(urls, key=lambda u: (self.score(u, probed[u]), urls.index(u)))
+
+    def is_crawling(self, nbytes: int, elapsed: float) -> bool:
+        return elapsed > self.SLOW_GRACE and nbytes / elapsed < self.SLOW_BPS
+
+ARCHIVE_EXTENSIONS = ('.zip', '.rar', '.7z')
+
+def _safe_member_path(target_dir: str, name: str) -> Optional[str]:
+    # Та же санитизация, что у ZipFile.extract: без абсолютных путей, дисков и '..'
+    name = os.path.splitdrive(name.replace('\\', '/'))[1]
+    parts = [p for p in name.split('/') if p not in ('', '.', '..')]
+    if not parts: return None
+    if platform.system() == "Windows": parts = [re.sub(r'[:<>|"?*]', '_', p).rstrip('. ') or '_' for p in parts]
+    path = os.path.join(target_dir, *parts)
+    root = os.path.abspath(target_dir)
+    return path if os.path.abspath(path).startswith(root + os.sep) else None
+
+def _preallocate(f, size: int):
+    if size <= 0: return
     try:
-        import py7zr
-        extractors["7z"] = lambda: py7zr.SevenZipFile(tmp_path, mode='r').extractall(path=target_dir)
-    except Exception:
-        pass
-    for ext, extractor in extractors.items():
-        if low.endswith(f".{ext}"):
-            extractor()
-            _cleanup_extracted_archive(target_dir, is_game_installation)
+        if hasattr(os, "posix_fallocate"): os.posix_fallocate(f.fileno(), 0, size)
+        else: f.truncate(size)
+    except OSError: pass
+
+def _extract_zip_parallel(archive_path: str, target_dir: str, progress=None, workers: Optional[int] = None):
+    """Распаковывает zip, раскидывая члены по пулу потоков (zlib/bz2/lzma отпускают GIL).
+
+    Мелкие архивы распаковываются как раньше — одним extractall. Каждый поток держит свой ZipFile,
+    файлы заранее выделяются на диске, progress(member, done_bytes, total_bytes) вызывается по каждому члену.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    with zipfile.ZipFile(archive_path, "r") as zf:
+        members = zf.infolist()
+        total = sum(m.file_size for m in members)
+        files = [m for m in members if not m.is_dir()]
+        if len(files) < 2 or total < 8 * 1024 * 1024:
+            zf.extractall(target_dir)
+            if progress: progress(None, total, total)
             return
+        for m in members:
+            if (path := _safe_member_path(target_dir, m.filename)) is not None:
+                os.makedirs(path if m.is_dir() else os.path.dirname(path), exist_ok=True)
+    local = threading.local()
+    lock, done, handles = threading.Lock(), [0], []
+    def _extract_one(m: zipfile.ZipInfo):
+        path = _safe_member_path(target_dir, m.filename)
+        if path is None: return
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(archive_path, "r")
+            with lock: handles.append(local.zf)
+        with local.zf.open(m) as src, open(path, "wb") as dst:
+            _preallocate(dst, m.file_size)
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+            dst.truncate()
+        if progress:
+            with lock: done[0] += m.file_size; d = done[0]
+            progress(m.filename, d, total)
+    # Крупные члены первыми, чтобы хвост из одного большого файла не оставался на одном ядре в конце
+    files.sort(key=lambda m: m.file_size, reverse=True)
+    workers = workers or min(8, os.cpu_count() or 2, len(files))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deltahub-unzip") as pool:
+            for fut in [pool.submit(_extract_one, m) for m in files]: fut.result()
+    finally:
+        for h in handles:
+            try: h.close()
+            except Exception: pass
+
+def extract_archive(archive_path: str, target_dir: str, progress=None, name: Optional[str] = None):
+    """Распаковывает zip/rar/7z в target_dir (формат — по name или пути); неизвестный формат пробуется как zip."""
+    import rarfile
+    low = (name or archive_path).lower()
+    os.makedirs(target_dir, exist_ok=True)
+    if low.endswith(".rar"):
+        with rarfile.RarFile(archive_path, "r") as rf: rf.extractall(target_dir)
+    elif low.endswith(".7z"):
+        # py7zr сам распаковывает независимые блоки несолидных архивов в нескольких потоках
+        import py7zr
+        with py7zr.SevenZipFile(archive_path, mode='r') as zf: zf.extractall(path=target_dir)
+    else:
+        _extract_zip_parallel(archive_path, target_dir, progress)
+
+def _extract_archive(tmp_path, target_dir, fname, is_game_installation=False, progress=None):
+    low = fname.lower()
+    supported = ('.zip', '.rar') + (('.7z',) if importlib.util.find_spec("py7zr") else ())
+    if low.endswith(supported):
+        extract_archive(tmp_path, target_dir, progress, name=fname)
+        _cleanup_extracted_archive(target_dir, is_game_installation)
+        return
     shutil.copy2(tmp_path, os.path.join(target_dir, fname))
 
 def _cleanup_extracted_archive(target_dir: str, is_game_installation: bool = False):
@@ -296,21 +890,49 @@ def _cleanup_extracted_archive(target_dir: str, is_game_installation: bool = Fal
         return
 
 class GameMonitorThread(QThread):
+    """Ждёт выхода игры: PID находится один раз (Popen или поиск по имени при старте через Steam),
+    дальше поток спит на этом PID до события выхода, не опрашивая таблицу процессов."""
     finished = pyqtSignal(bool)
-    def __init__(self, process, vanilla_mode, parent=None): super().__init__(parent); self.process, self.vanilla_mode = process, vanilla_mode
+    def __init__(self, process, vanilla_mode, parent=None, count_launch: bool = True):
+        super().__init__(parent); self.process, self.vanilla_mode, self.count_launch = process, vanilla_mode, count_launch
     def run(self):
-        increment_launch_counter()
-        if self.process:
-            try: self.process.wait()
-            except Exception: pass
-            finally: self.finished.emit(self.vanilla_mode); return
-        game_appeared = False
+        if self.count_launch: increment_launch_counter()
+        wait_for_game_exit(self.process)
+        self.finished.emit(self.vanilla_mode)
+
+def wait_for_game_exit(process=None):
+    """Блокируется до выхода игры: ждёт запущенный Popen, иначе до 30 с ищет процесс игры по имени и спит на его PID.
+
+    Таблица процессов обходится один раз; дальше раз в секунду смотрим только потомков Steam
+    и процессы, появившиеся с прошлой проверки.
+    """
+    procs = []
+    try:
+        if process:
+            _WATCHED_GAME_PROCS.append(psutil.Process(process.pid))
+            process.wait(); return
+        steam, seen = None, set()
+        for proc in psutil.process_iter(['name']):
+            seen.add(proc.pid)
+            if proc.info['name'] in GAME_PROCESS_NAMES: procs.append(proc)
+            elif proc.info['name'] in STEAM_PROCESS_NAMES and steam is None: steam = proc
         for _ in range(30):
-            if is_game_running(): game_appeared = True; break
+            if procs: break
             time.sleep(1)
-        if not game_appeared: self.finished.emit(self.vanilla_mode); return
-        while is_game_running(): time.sleep(0.5)
-        self.finished.emit(self.vanilla_mode)
+            # Игру обычно порождает Steam; если запрос ушёл другому его экземпляру — она всё равно среди новых PID
+            if steam and (procs := find_game_processes(steam)): break
+            pids, young = set(psutil.pids()), set()
+            for pid in pids - seen:
+                try:
+                    if (proc := psutil.Process(pid)).name() in GAME_PROCESS_NAMES: procs.append(proc)
+                    # Только что порождённый процесс мог ещё не сделать exec — проверим его и в следующий раз
+                    elif time.time() - proc.create_time() < 5: young.add(pid)
+                except psutil.Error: pass
+            seen = pids - young
+        _WATCHED_GAME_PROCS.extend(procs)
+        for proc in procs: wait_process_exit(proc)
+    except Exception: pass
+    finally: _WATCHED_GAME_PROCS.clear()
 
 class PresenceWorker(QObject):
     finished, update_online_count = pyqtSignal(), pyqtSignal(int)
@@ -322,7 +944,7 @@ class PresenceWorker(QObject):
     def run(self):
         try:
             # Use Cloud Function to update presence and compute current online count
-            resp = requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/presenceHeartbeat", json={"sessionId": self.session_id}, timeout=8)
+            resp = http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/presenceHeartbeat", json={"sessionId": self.session_id}, timeout=8)
             if resp.status_code == 200:
                 try:
                     data = resp.json() or {}
@@ -340,7 +962,7 @@ class FetchModsThread(QThread):
     def __init__(self, main_window, force_update=False): super().__init__(main_window); self.main_window, self.force_update = main_window, force_update
     def run(self):
         try:
-            response = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getMods", timeout=15); response.raise_for_status()
+            response = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getMods", timeout=15); response.raise_for_status()
             all_mods = []
 
 
@@ -499,9 +1121,9 @@ class FetchModsThread(QThread):
             if not has_df_version or (extra_files_data and not all(v.get("version") for _, v in extra_files_data)):
                 return False
 
-            mod_chapter_data = ModChapterData(data_file_url=chapter_data.get("data_file_url"), data_file_version=chapter_data.get("data_file_version", "1.0.0"), extra_files=[ModExtraFile(key=k, **v) for k, v in extra_files_data])
+            mod_chapter_data = ModChapterData(data_file_url=chapter_data.get("data_file_url"), data_file_version=chapter_data.get("data_file_version", "1.0.0"), extra_files=[ModExtraFile(key=k, version=v.get("version"), url=v.get("url"), deltas=v.get("deltas") or {}, mirrors=v.get("mirrors") or []) for k, v in extra_files_data], data_file_deltas=chapter_data.get("data_file_deltas") or {}, data_file_mirrors=chapter_data.get("data_file_mirrors") or [])
             if description_url := chapter_data.get("description_url"):
-                try: desc_resp = requests.get(description_url, timeout=10); desc_resp.raise_for_status(); mod_chapter_data.description = desc_resp.text
+                try: desc_resp = http_client.get(description_url, timeout=10); desc_resp.raise_for_status(); mod_chapter_data.description = desc_resp.text
                 except requests.RequestException: mod_chapter_data.description = tr("errors.description_load_failed")
 
             if mod_chapter_data.is_valid():
@@ -532,6 +1154,641 @@ class FetchModsThread(QThread):
                     except:
                         continue
 
+def _read_json_file(path: str, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f: return json.load(f)
+    except Exception: return default
+
+def _file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""): h.update(chunk)
+    return h.hexdigest()
+
+def _write_json_atomic(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+LINK_MIN_SIZE = 1024 * 1024  # мелкие файлы дешевле копировать — и игра может их перезаписать
+
+def _reflink(src: str, dst: str) -> bool:
+    """Копия-клон (CoW): FICLONE на Linux (btrfs/xfs), clonefile на macOS (APFS)."""
+    try:
+        if sys.platform.startswith("linux"):
+            import fcntl
+            FICLONE = 0x40049409
+            with open(src, "rb") as fs, open(dst, "wb") as fd:
+                try: fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+                except OSError: fd.close(); os.remove(dst); return False
+            shutil.copystat(src, dst); return True
+        if sys.platform == "darwin":
+            import ctypes
+            libc = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    except Exception:
+        try:
+            if os.path.exists(dst): os.remove(dst)
+        except Exception: pass
+    return False
+
+def same_volume(path_a: str, path_b: str) -> bool:
+    try:
+        probe_b = path_b if os.path.exists(path_b) else os.path.dirname(path_b)
+        return os.stat(path_a).st_dev == os.stat(probe_b).st_dev
+    except OSError: return False
+
+def link_or_copy(src: str, dst: str, allow_hardlink: bool = False) -> str:
+    """Кладёт src в dst самым дешёвым способом: reflink → hardlink (если разрешён, тот же том) → copy2.
+
+    Возвращает использованный способ. dst заменяется атомарно через временное имя рядом с ним.
+    Hardlink делит inode с источником: любая запись в dst (проверка файлов Steam, сама игра) испортит
+    и хранилище модов/кэш. Поэтому в папку игры кладём только reflink или копию, а hardlink разрешаем
+    лишь внутри собственных областей лаунчера (оверлей, staging).
+    """
+    tmp = f"{dst}.{os.getpid()}.dhtmp"
+    try:
+        if os.path.exists(tmp): os.remove(tmp)
+    except OSError: pass
+    method = "copy"
+    if os.path.getsize(src) >= LINK_MIN_SIZE and same_volume(src, os.path.dirname(dst) or "."):
+        if _reflink(src, tmp): method = "reflink"
+        elif allow_hardlink:
+            try: os.link(src, tmp); method = "hardlink"
+            except OSError: pass
+    if method == "copy": shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    # rename поверх ссылки на тот же inode ничего не делает — временное имя остаётся
+    if os.path.lexists(tmp):
+        try: os.remove(tmp)
+        except OSError: pass
+    return method
+
+BACKUP_AREA_NAME = ".deltahub-backups"
+
+def backup_area_for(game_dir: str, configured: str = "") -> str:
+    """Папка для бэкапов оригиналов игры на том же томе, что и игра: бэкап и откат тогда — rename, а не копия.
+
+    Заданная в настройках папка (backup_dir) берётся как есть; иначе .deltahub-backups рядом с папкой игры,
+    затем папка данных пользователя. Если том не совпал, shutil.move будет копировать — об этом пишем в лог.
+    """
+    game_dir = os.path.normpath(game_dir) if game_dir else ""
+    candidates = [configured] if configured else [
+        os.path.join(os.path.dirname(game_dir), BACKUP_AREA_NAME) if game_dir else "",
+        os.path.join(get_user_data_root(), "backups")]
+    fallback = None
+    for path in filter(None, candidates):
+        try: os.makedirs(path, exist_ok=True)
+        except OSError: continue
+        if not _probe_dir_writable(path): continue
+        if game_dir and same_volume(path, game_dir): return path
+        fallback = fallback or path
+    fallback = fallback or tempfile.gettempdir()
+    logging.info(f"Backup area {fallback} is on another volume than {game_dir or '?'}: backups and restores will copy")
+    return fallback
+
+def _is_ascii_path(path: str) -> bool:
+    try: path.encode("ascii"); return True
+    except UnicodeEncodeError: return False
+
+def run_xdelta(mode: str, infile: str, second: str, outfile: str) -> dict:
+    """Запускает pyxdelta без промежуточных копий: входы читаются на месте, выход пишется во временный
+    файл рядом с outfile и фиксируется атомарным rename.
+
+    mode='decode': second — патч; mode='encode': second — изменённый файл, outfile — создаваемый патч.
+    Во временную папку файлы копируются, только если прямой вызов не удался на не-ASCII путях.
+    Возвращает {"ok", "seconds", "bytes_written", "copied_bytes"}.
+    """
+    import pyxdelta
+    started = time.monotonic()
+    tmp_out = f"{outfile}.{os.getpid()}.dhtmp"
+
+    def call(a: str, b: str, out: str) -> bool:
+        try:
+            if mode == "decode": ok = pyxdelta.decode(infile=a, patchfile=b, outfile=out)
+            else: ok = pyxdelta.run(infile=a, outfile=b, patchfile=out)
+            return bool(ok) and os.path.exists(out)
+        except Exception: return False
+
+    copied = 0
+    ok = call(infile, second, tmp_out)
+    if not ok and not all(_is_ascii_path(p) for p in (infile, second, tmp_out)):
+        with tempfile.TemporaryDirectory(prefix="xdelta_") as tmp:
+            a, b, out = (os.path.join(tmp, n) for n in ("source.bin", "second.bin", "output.bin"))
+            shutil.copy2(infile, a); shutil.copy2(second, b); copied = os.path.getsize(a) + os.path.getsize(b)
+            if (ok := call(a, b, out)): shutil.move(out, tmp_out)
+    written = os.path.getsize(tmp_out) if ok else 0
+    if ok: os.replace(tmp_out, outfile)
+    elif os.path.exists(tmp_out):
+        try: os.remove(tmp_out)
+        except OSError: pass
+    return {"ok": ok, "seconds": time.monotonic() - started, "bytes_written": written + copied, "copied_bytes": copied}
+
+def build_symlink_farm(src_root: str, dst_root: str, materialize: Optional[set] = None) -> int:
+    """Зеркалит дерево src_root в dst_root: настоящие папки, симлинки только на файлы.
+
+    Папки-симлинки тоже становятся настоящими папками: иначе мод, применённый внутри оверлея,
+    писал бы прямо в установленную игру. Файлы с именами из materialize кладутся через link_or_copy —
+    нужно для исполняемых файлов, которые ищут ресурсы рядом с /proc/self/exe. Возвращает число созданных записей.
+    """
+    materialize = {n.lower() for n in (materialize or ())}
+    created = 0
+    os.makedirs(dst_root, exist_ok=True)
+    for root, dirs, files in os.walk(src_root, followlinks=True):
+        rel = os.path.relpath(root, src_root)
+        dst_dir = dst_root if rel == "." else os.path.join(dst_root, rel)
+        real_root = os.path.realpath(root)
+        for d in list(dirs):
+            src, dst = os.path.join(root, d), os.path.join(dst_dir, d)
+            if os.path.islink(src) and (real_root + os.sep).startswith(os.path.realpath(src) + os.sep):
+                dirs.remove(d); continue  # ссылка на собственного предка — петля, не обходим
+            os.makedirs(dst, exist_ok=True)
+            created += 1
+        for name in files:
+            src, dst = os.path.join(root, name), os.path.join(dst_dir, name)
+            if rel == "." and name.lower() in materialize: link_or_copy(src, dst, allow_hardlink=True)
+            else: os.symlink(os.path.abspath(src), dst)
+            created += 1
+    return created
+
+def get_install_staging_dir() -> str:
+    # Рядом с mods, чтобы перенос/бэкап был переименованием в пределах одного тома
+    path = os.path.join(get_user_data_root(), "staging"); os.makedirs(path, exist_ok=True); return path
+
+class InstallJournal:
+    """Журнал переноса скачанных файлов модов из staging в mods_dir.
+
+    Для каждой папки мода хранится план: какие файлы переносятся из staging (config.json последним),
+    какие устаревшие удаляются и какие уже существовали. Перезаписываемые/удаляемые оригиналы сначала
+    уходят в бэкап, и их список (backed_up) пишется в журнал до переноса — откат восстанавливает только их,
+    а не угадывает по файловой системе. Незавершённый перенос можно докатить или откатить.
+    """
+    FILE_NAME = "install_journal.json"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_app_support_path(), self.FILE_NAME)
+        self.data = _read_json_file(self.path) or {"mods": {}}
+        self.data.setdefault("mods", {})
+
+    def save(self):
+        if self.data["mods"]: _write_json_atomic(self.path, self.data)
+        else: self.clear()
+
+    def clear(self):
+        self.data = {"mods": {}}
+        try: os.remove(self.path)
+        except FileNotFoundError: pass
+
+    def plan(self, folder: str, mod_key: str, staged: str, target: str, backup: str, deletes: list[str]):
+        files = []
+        for root, _, names in os.walk(staged):
+            files += [os.path.relpath(os.path.join(root, n), staged) for n in names]
+        # config.json фиксирует установку, поэтому он копируется последним
+        files.sort(key=lambda rel: (rel == "config.json", rel))
+        existing = [rel for rel in files if os.path.isfile(os.path.join(target, rel))]
+        self.data["mods"][folder] = {"mod_key": mod_key, "staged": staged, "target": target, "backup": backup,
+                                     "files": files, "existing": existing, "deletes": list(deletes), "state": "staged"}
+
+    def commit(self, folder: str):
+        e = self.data["mods"][folder]
+        if e["state"] != "copying":
+            # Пока state не "copying", в target лежат только оригиналы: новые файлы ещё не переносились
+            if "backed_up" not in e:
+                originals = dict.fromkeys(e["deletes"] + e["files"])
+                e["backed_up"] = [rel for rel in originals if os.path.isfile(os.path.join(e["target"], rel))]
+            e["state"] = "committing"; self.save()
+            for rel in e["backed_up"]:
+                dst, bak = os.path.join(e["target"], rel), os.path.join(e["backup"], rel)
+                if os.path.isfile(dst) and not os.path.exists(bak):
+                    os.makedirs(os.path.dirname(bak), exist_ok=True); shutil.move(dst, bak)
+            e["state"] = "copying"; self.save()
+        for rel in e["files"]:
+            src, dst = os.path.join(e["staged"], rel), os.path.join(e["target"], rel)
+            if not os.path.isfile(src) and os.path.isfile(dst): continue  # уже перенесён до сбоя
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            # staging лежит рядом с mods — обычно это rename; на другом томе — копия
+            try: os.replace(src, dst)
+            except OSError: shutil.copy2(src, dst); os.remove(src)
+        self.data["mods"].pop(folder); self.save()
+        shutil.rmtree(e["backup"], ignore_errors=True)
+
+    def rollback(self, folder: str):
+        e = self.data["mods"][folder]
+        existing, backed_up = set(e.get("existing", [])), set(e.get("backed_up", []))
+        for rel in e["files"] + e["deletes"]:
+            dst, bak = os.path.join(e["target"], rel), os.path.join(e["backup"], rel)
+            if rel in backed_up and os.path.isfile(bak):
+                os.makedirs(os.path.dirname(dst), exist_ok=True); os.replace(bak, dst)
+            elif rel in e["files"] and rel not in existing and os.path.isfile(dst):
+                os.remove(dst)
+        self.data["mods"].pop(folder); self.save()
+        shutil.rmtree(e["backup"], ignore_errors=True)
+
+    def recover(self) -> list[tuple[str, str]]:
+        """Докатывает или откатывает незавершённые записи. Возвращает [(папка, 'forward'|'back'|'failed')]."""
+        results, temp_root = [], self.data.get("temp_root")
+        for folder, e in list(self.data["mods"].items()):
+            # Файл, уже перенесённый до сбоя, есть в target, а в staging его больше нет
+            moved = e.get("state") == "copying"
+            staged_ok = all(os.path.isfile(os.path.join(e["staged"], rel)) or (moved and os.path.isfile(os.path.join(e["target"], rel)))
+                            for rel in e.get("files", []))
+            try:
+                if staged_ok:
+                    self.commit(folder); results.append((folder, "forward"))
+                    # Обычная установка ставит счётчик скачиваний в очередь — докатанная тоже
+                    try: DownloadCounterQueue.instance().enqueue(e.get("mod_key", ""), e["target"])
+                    except Exception: pass
+                    continue
+            except Exception as ex: logging.warning(f"Install journal: roll-forward failed for {folder}: {ex}")
+            try: self.rollback(folder); results.append((folder, "back"))
+            except Exception as ex: logging.warning(f"Install journal: rollback failed for {folder}: {ex}"); results.append((folder, "failed"))
+        if not self.data["mods"]:
+            if temp_root: shutil.rmtree(temp_root, ignore_errors=True)
+            self.clear()
+        return results
+
+class SessionJournal:
+    """Журнал изменений игровых папок за сессию запуска (session.lock), только дозапись.
+
+    Каждая запись — строка JSON, дописывается и сбрасывается в ОС сразу (переживает падение процесса);
+    fsync выполняется пачками и сразу для записей о бэкапах. replay() сворачивает строки в тот же
+    словарь, что раньше лежал в манифесте целиком; оборванная последняя строка пропускается.
+    """
+    SYNC_EVERY, SYNC_INTERVAL = 256, 0.5
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = None
+        self._lock = threading.Lock()
+        self._unsynced, self._last_sync = 0, time.monotonic()
+
+    def append(self, record: dict, durable: bool = False):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._f is None: self._f = open(self.path, "a", encoding="utf-8")
+            self._f.write(line); self._f.flush(); self._unsynced += 1
+            if durable or self._unsynced >= self.SYNC_EVERY or time.monotonic() - self._last_sync >= self.SYNC_INTERVAL:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        if self._f is None or not self._unsynced: return
+        try: os.fsync(self._f.fileno())
+        except OSError: pass
+        self._unsynced, self._last_sync = 0, time.monotonic()
+
+    def flush(self):
+        with self._lock: self._sync_locked()
+
+    def replay(self) -> dict:
+        data = {"backup_files": {}, "mod_files_to_cleanup": [], "mod_dirs_to_cleanup": [], "backup_temp_dir": None, "direct_launch": None, "overlay_dirs": []}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: text = f.read()
+        except Exception: return {}
+        if not text.strip(): return {}
+        records = []
+        for line in text.splitlines():
+            if not line.strip(): continue
+            try: records.append(json.loads(line))
+            except ValueError: continue  # запись, оборванная падением
+        mod_files, mod_dirs = {}, {}
+        for rec in records:
+            if not isinstance(rec, dict): continue
+            # Старый формат — весь манифест одним объектом — сворачивается так же
+            data["backup_files"].update(rec.get("backup_files") or {})
+            mod_files.update(dict.fromkeys(rec.get("mod_files") or rec.get("mod_files_to_cleanup") or []))
+            mod_dirs.update(dict.fromkeys(rec.get("mod_dirs") or rec.get("mod_dirs_to_cleanup") or []))
+            if rec.get("backup_temp_dir") is not None: data["backup_temp_dir"] = rec["backup_temp_dir"]
+            if rec.get("direct_launch") is not None: data["direct_launch"] = rec["direct_launch"]
+            if rec.get("overlay_dir"): data["overlay_dirs"].append(rec["overlay_dir"])
+        data["mod_files_to_cleanup"], data["mod_dirs_to_cleanup"] = list(mod_files), list(mod_dirs)
+        return data
+
+    def close(self):
+        with self._lock:
+            self._sync_locked()
+            if self._f is not None:
+                try: self._f.close()
+                except Exception: pass
+                self._f = None
+
+    def clear(self):
+        self.close()
+        try: os.remove(self.path)
+        except FileNotFoundError: pass
+
+class LaunchTrace:
+    """Замеры фаз запуска: время, число файлов и байты по каждой фазе.
+
+    Итог печатается одной строкой и пишется в launch_traces/launch-*.json (последние KEEP штук),
+    чтобы сравнивать запуски между версиями. Фазы из пула глав суммируются по потокам,
+    поэтому их сумма может быть больше общего времени запуска.
+    """
+    KEEP = 30
+
+    def __init__(self, **meta):
+        self.meta = {"launcher_version": LAUNCHER_VERSION, "platform": platform.system(), **meta}
+        self.started, self._t0 = time.time(), time.perf_counter()
+        self.launch_seconds: Optional[float] = None
+        self.phases: dict[str, dict] = {}
+        self.path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """with trace.phase("backup") as rec: rec["files"] += 1; rec["bytes"] += size"""
+        rec, t = {"files": 0, "bytes": 0}, time.perf_counter()
+        try: yield rec
+        finally: self.add(name, time.perf_counter() - t, rec["files"], rec["bytes"])
+
+    def add(self, name: str, seconds: float = 0.0, files: int = 0, nbytes: int = 0):
+        with self._lock:
+            p = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0, "files": 0, "bytes": 0})
+            p["seconds"] += seconds; p["calls"] += 1; p["files"] += files; p["bytes"] += nbytes
+
+    def summary(self) -> str:
+        def fmt(name, p):
+            extra = (f" {p['files']} files" if p["files"] else "") + (f" {p['bytes'] / 1024 ** 2:.1f} MB" if p["bytes"] else "")
+            return f"{name} {p['seconds']:.2f}s{extra}"
+        with self._lock: parts = [fmt(n, p) for n, p in self.phases.items()]
+        total = self.launch_seconds if self.launch_seconds is not None else time.perf_counter() - self._t0
+        return f"total {total:.2f}s | " + " | ".join(parts)
+
+    def finish(self, stage: str = "launch") -> Optional[str]:
+        """Пишет итог в лог и (пере)записывает JSON. Первый вызов не для 'cleanup' фиксирует время до старта игры."""
+        if stage != "cleanup" and self.launch_seconds is None: self.launch_seconds = time.perf_counter() - self._t0
+        logging.info(f"Launch trace: {stage}: {self.summary()}")
+        try:
+            folder = os.path.join(get_app_support_path(), "launch_traces")
+            if not self.path:
+                self.path = os.path.join(folder, time.strftime("launch-%Y%m%d-%H%M%S.json", time.localtime(self.started)))
+            with self._lock:
+                data = {**self.meta, "stage": stage, "started": self.started, "launch_seconds": self.launch_seconds,
+                        "phases": {n: {**p, "seconds": round(p["seconds"], 4)} for n, p in self.phases.items()}}
+            _write_json_atomic(self.path, data)
+            for old in sorted(f for f in os.listdir(folder) if f.startswith("launch-"))[:-self.KEEP]:
+                os.remove(os.path.join(folder, old))
+        except Exception as e:
+            logging.warning(f"Launch trace: write failed: {e}")
+        return self.path
+
+class AppliedStateStore:
+    """Что из модов оставлено в игровых папках между запусками (applied_state.json: папка главы -> запись).
+
+    Запись: mod_key, signature (мод + версия + его config.json), backup_files (оригинал -> бэкап),
+    files (путь -> [size, mtime_ns]) и созданные папки. По ней запуск решает, трогать ли главу.
+    """
+    FILE_NAME = "applied_state.json"
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'AppliedStateStore':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.path = os.path.join(get_app_support_path(), self.FILE_NAME)
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = _read_json_file(self.path) or {}
+
+    def _save_locked(self):
+        try:
+            if self.entries: _write_json_atomic(self.path, self.entries)
+            elif os.path.exists(self.path): os.remove(self.path)
+        except Exception: pass
+
+    @staticmethod
+    def file_stamp(path: str) -> Optional[list]:
+        try: st = os.stat(path); return [st.st_size, st.st_mtime_ns]
+        except OSError: return None
+
+    def get(self, target_dir: str) -> Optional[dict]:
+        with self._lock: return self.entries.get(target_dir)
+
+    def put(self, target_dir: str, mod_key: str, signature: str, backup_files: dict, files: list, dirs: list):
+        with self._lock:
+            self.entries[target_dir] = {"mod_key": mod_key, "signature": signature, "backup_files": dict(backup_files),
+                                        "files": {p: self.file_stamp(p) for p in dict.fromkeys(files)}, "dirs": list(dict.fromkeys(dirs))}
+            self._save_locked()
+
+    def pop(self, target_dir: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.entries.pop(target_dir, None); self._save_locked(); return entry
+
+    def is_intact(self, target_dir: str, signature: str) -> bool:
+        """Глава уже в нужном состоянии: тот же мод и версия, файлы мода никто не менял."""
+        entry = self.get(target_dir)
+        if not entry or entry.get("signature") != signature: return False
+        return all(self.file_stamp(p) == stamp for p, stamp in entry.get("files", {}).items())
+
+class PrefetchStore:
+    """Хранилище заранее скачанных обновлений (staging/prefetch/index.json: url -> файл, версия, размер).
+
+    Файлы лежат рядом с mods, поэтому забрать их при установке — переименование, а не загрузка.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'PrefetchStore':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.root = os.path.join(get_install_staging_dir(), "prefetch"); os.makedirs(self.root, exist_ok=True)
+        self._index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] = _read_json_file(self._index_path) or {}
+
+    def _save_locked(self):
+        try: _write_json_atomic(self._index_path, self._index)
+        except Exception: pass
+
+    def partial_path(self, url: str) -> str:
+        import hashlib
+        return os.path.join(self.root, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+    def get(self, url: str, version: Optional[str] = None) -> Optional[dict]:
+        with self._lock:
+            entry = self._index.get(url)
+            if not entry or (version and entry.get("version") != version): return None
+            if not os.path.isfile(os.path.join(self.root, entry["file"])): return None
+            return dict(entry, path=os.path.join(self.root, entry["file"]))
+
+    def put(self, url: str, version: Optional[str], tmp_path: str, fname: str, mod_key: str):
+        final = tmp_path[:-len(".part")] if tmp_path.endswith(".part") else tmp_path + ".bin"
+        os.replace(tmp_path, final)
+        with self._lock:
+            self._index[url] = {"file": os.path.basename(final), "name": fname, "version": version,
+                                "size": os.path.getsize(final), "mod_key": mod_key}
+            self._save_locked()
+
+    def claim(self, url: str, version: Optional[str], dest_path: str) -> bool:
+        """Переносит предзагруженный файл в dest_path и убирает его из индекса."""
+        entry = self.get(url, version)
+        if not entry: return False
+        try:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True); shutil.move(entry["path"], dest_path)
+        except Exception: return False
+        with self._lock: self._index.pop(url, None); self._save_locked()
+        return True
+
+    def prune(self, keep_urls: set[str]):
+        with self._lock:
+            for url in [u for u in self._index if u not in keep_urls]:
+                try: os.remove(os.path.join(self.root, self._index.pop(url)["file"]))
+                except Exception: pass
+            self._save_locked()
+            referenced = {e["file"] for e in self._index.values()} | {"index.json"}
+        for name in os.listdir(self.root):
+            if name not in referenced and not name.endswith(".part"):
+                try: os.remove(os.path.join(self.root, name))
+                except Exception: pass
+
+class PatchedOutputCache:
+    """Кэш результатов xdelta (cache/patched/index.json: sha256 оригинала + sha256 патча -> файл).
+
+    Один и тот же патч на той же сборке игры даёт тот же data.win, поэтому декодирование нужно
+    только при смене игры или мода. Хэши файлов запоминаются по (размер, mtime), старые
+    результаты вытесняются по LRU при превышении budget байт.
+    """
+    BUDGET_BYTES = 3 * 1024 ** 3
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'PatchedOutputCache':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, budget: Optional[int] = None):
+        self.root = os.path.join(get_user_data_root(), "cache", "patched"); os.makedirs(self.root, exist_ok=True)
+        self.budget = budget or self.BUDGET_BYTES
+        self._index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        data = _read_json_file(self._index_path) or {}
+        self._entries: dict[str, dict] = data.get("entries", {})
+        self._digests: dict[str, list] = data.get("digests", {})  # путь -> [size, mtime_ns, sha256]
+
+    def _save_locked(self):
+        try: _write_json_atomic(self._index_path, {"entries": self._entries, "digests": self._digests})
+        except Exception: pass
+
+    def digest(self, path: str) -> str:
+        path = os.path.realpath(path)  # оверлей запуска даёт новый путь-симлинк каждый раз
+        st = os.stat(path)
+        with self._lock:
+            memo = self._digests.get(path)
+            if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns: return memo[2]
+        sha = _file_sha256(path)
+        with self._lock: self._digests[path] = [st.st_size, st.st_mtime_ns, sha]; self._save_locked()
+        return sha
+
+    def key_for(self, original_path: str, patch_path: str) -> str:
+        return f"{self.digest(original_path)}_{self.digest(patch_path)}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            path = os.path.join(self.root, entry["file"]) if entry else None
+            try: st = os.stat(path) if path else None
+            except OSError: st = None
+            # Размер и mtime сверяем с записанными при put: файл, изменённый на месте, повторно не выдаём
+            if not st or st.st_size != entry.get("size") or st.st_mtime_ns != entry.get("mtime_ns"):
+                if entry:
+                    self._entries.pop(key, None); self._save_locked()
+                    if st:
+                        try: os.remove(path)
+                        except OSError: pass
+                return None
+            entry["last_used"] = time.time(); self._save_locked()
+            return path
+
+    def put(self, key: str, produced_path: str) -> str:
+        """Забирает готовый файл в кэш (переносом) и возвращает его путь в кэше."""
+        final = os.path.join(self.root, key + ".bin")
+        shutil.move(produced_path, final)
+        st = os.stat(final)
+        with self._lock:
+            self._entries[key] = {"file": os.path.basename(final), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "last_used": time.time()}
+            self._evict_locked(keep=key); self._save_locked()
+        return final
+
+    def _evict_locked(self, keep: Optional[str] = None):
+        total = sum(e.get("size", 0) for e in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k].get("last_used", 0)):
+            if total <= self.budget: break
+            if key == keep: continue
+            entry = self._entries.pop(key)
+            try: os.remove(os.path.join(self.root, entry["file"]))
+            except OSError: pass
+            total -= entry.get("size", 0)
+        for path in [p for p in self._digests if not os.path.exists(p)]: self._digests.pop(path, None)
+
+class ExtractedArchiveCache:
+    """Кэш распакованных архивов-дополнений из папок глав модов (cache/extracted/<sha256 архива>/).
+
+    Архив распаковывается один раз — при установке мода или на первом запуске; дальше запуск только
+    раскладывает файлы готового дерева ссылками/копиями. Старые деревья вытесняются по LRU при превышении budget байт.
+    """
+    BUDGET_BYTES = 2 * 1024 ** 3
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'ExtractedArchiveCache':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, budget: Optional[int] = None):
+        self.root = os.path.join(get_user_data_root(), "cache", "extracted"); os.makedirs(self.root, exist_ok=True)
+        self.budget = budget or self.BUDGET_BYTES
+        self._index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = _read_json_file(self._index_path) or {}
+
+    def _save_locked(self):
+        try: _write_json_atomic(self._index_path, self._entries)
+        except Exception: pass
+
+    def get(self, archive_path: str) -> Optional[str]:
+        key = PatchedOutputCache.instance().digest(archive_path)  # тот же memo хэшей по (размер, mtime)
+        with self._lock:
+            entry, tree = self._entries.get(key), os.path.join(self.root, key)
+            if not entry or not os.path.isdir(tree):
+                if entry: self._entries.pop(key, None); self._save_locked()
+                return None
+            entry["last_used"] = time.time(); self._save_locked()
+            return tree
+
+    def ensure(self, archive_path: str) -> str:
+        """Возвращает папку с распакованным архивом, распаковывая его при промахе."""
+        tree = self.get(archive_path)
+        if tree: return tree
+        key = PatchedOutputCache.instance().digest(archive_path)
+        tree = os.path.join(self.root, key)
+        part = tempfile.mkdtemp(prefix=f"{key}.", suffix=".part", dir=self.root)
+        try:
+            extract_archive(archive_path, part)
+            _cleanup_extracted_archive(part)
+            size = sum(os.path.getsize(os.path.join(r, f)) for r, _, files in os.walk(part) for f in files)
+            try: os.rename(part, tree)
+            except OSError:
+                if not os.path.isdir(tree): raise  # иначе тот же архив уже распаковал соседний поток
+        finally:
+            shutil.rmtree(part, ignore_errors=True)
+        with self._lock:
+            self._entries[key] = {"size": size, "last_used": time.time()}
+            self._evict_locked(keep=key); self._save_locked()
+        return tree
+
+    def _evict_locked(self, keep: Optional[str] = None):
+        total = sum(e.get("size", 0) for e in self._entries.values())
+        for key in sorted(self._entries, key=lambda k: self._entries[k].get("last_used", 0)):
+            if total <= self.budget: break
+            if key == keep: continue
+            total -= self._entries.pop(key).get("size", 0)
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+
 class InstallTranslationsThread(QThread):
     progress, status, finished = pyqtSignal(int), pyqtSignal(str, str), pyqtSignal(bool)
     def __init__(self, main_window, install_tasks, was_installed_before: bool):
@@ -542,6 +1799,8 @@ class InstallTranslationsThread(QThread):
         self._cancelled = False
         self._installed_dirs = []
         self.temp_root = None  # Временная папка для безопасной установки
+        self._staged_archives: list[str] = []  # архивы-дополнения в staging; распаковываются в кэш после переноса
+        self.transfer: Optional[TransferProgress] = None  # скорость/ETA/разбивка по файлам текущей установки
     def cancel(self):
         # Только устанавливаем флаг отмены и уведомляем UI. Очистку выполняет основной поток после завершения.
         self._cancelled = True
@@ -601,8 +1860,9 @@ class InstallTranslationsThread(QThread):
         try:
             config_data = self.main_window._read_json(config_path)
             # Читаем локальные версии из структурированного словаря
-            local_versions = (config_data.get("chapters", {})
-                              .get(str(chapter_id), {})
+            file_key = 'demo' if chapter_id == -1 else str(chapter_id)
+            local_versions = ((config_data.get("files") or config_data.get("chapters") or {})
+                              .get(file_key, {})
                               .get("versions", {})) or {}
 
             # Собираем удалённые версии
@@ -635,7 +1895,8 @@ class InstallTranslationsThread(QThread):
                         'local_version': local_data_v,
                         'remote_version': remote_data_v,
                         'is_xdelta': is_xdelta_mod,
-                        'type_changed': type_changed
+                        'type_changed': type_changed,
+                        'deltas': chapter_data.data_file_deltas
                     }
 
             # Обработка extra-файлов (обновления)
@@ -647,7 +1908,8 @@ class InstallTranslationsThread(QThread):
                         components_to_update[extra_file.key] = {
                             'url': extra_file.url,
                             'local_version': lv,
-                            'remote_version': rv
+                            'remote_version': rv,
+                            'deltas': extra_file.deltas
                         }
 
                 # Удалённые на сервере extra-файлы — помечаем на удаление
@@ -679,7 +1941,7 @@ class InstallTranslationsThread(QThread):
         import os, shutil, tempfile
         try:
             # Готовим временную директорию для безопасной установки
-            self.temp_root = tempfile.mkdtemp(prefix="deltahub-install-")
+            self.temp_root = tempfile.mkdtemp(prefix="deltahub-install-", dir=get_install_staging_dir())
             tasks = []
             total_bytes = 0
             mod_folders = {}
@@ -702,17 +1964,18 @@ class InstallTranslationsThread(QThread):
                     if not components_to_update:
                         if chapter_data.data_file_url:
                             is_xdelta_mod = getattr(mod, 'is_xdelta', getattr(mod, 'is_piracy_protected', False))
-                            tasks.append({'mod': mod, 'url': chapter_data.data_file_url, 'chapter_id': chapter_id, 'component': 'data', 'is_xdelta': is_xdelta_mod})
+                            tasks.append({'mod': mod, 'url': chapter_data.data_file_url, 'chapter_id': chapter_id, 'component': 'data', 'is_xdelta': is_xdelta_mod, 'version': chapter_data.data_file_version})
                         for extra_file in chapter_data.extra_files:
                             is_xdelta_mod = getattr(mod, 'is_xdelta', getattr(mod, 'is_piracy_protected', False))
-                            tasks.append({'mod': mod, 'url': extra_file.url, 'chapter_id': chapter_id, 'component': extra_file.key, 'is_xdelta': is_xdelta_mod})
+                            tasks.append({'mod': mod, 'url': extra_file.url, 'chapter_id': chapter_id, 'component': extra_file.key, 'is_xdelta': is_xdelta_mod, 'version': extra_file.version})
                     else:
                         for component, info in components_to_update.items():
                             if info.get('delete'):
                                 tasks.append({'mod': mod, 'chapter_id': chapter_id, 'component': component, 'delete': True})
                                 continue
                             is_xdelta = info.get('is_xdelta', False) if component == 'data' else False
-                            t = {'mod': mod, 'url': info['url'], 'chapter_id': chapter_id, 'component': component, 'is_xdelta': is_xdelta}
+                            t = {'mod': mod, 'url': info['url'], 'chapter_id': chapter_id, 'component': component, 'is_xdelta': is_xdelta, 'version': info.get('remote_version'),
+                                 'local_version': info.get('local_version'), 'deltas': info.get('deltas') or {}}
                             if component == 'data' and info.get('type_changed'):
                                 t['type_changed'] = True
                             tasks.append(t)
@@ -732,25 +1995,26 @@ class InstallTranslationsThread(QThread):
                 return
 
 
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
-
-            session = requests.Session()
-            session.headers.update(BROWSER_HEADERS)
-            retry_strategy = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
-            adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=1, pool_maxsize=10)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
+            session = http_client.session
 
 
             # Составляем список реальных задач загрузки (с URL)
             download_tasks = [t for t in tasks if t.get('url')]
 
+            # Предзагруженные в фоне обновления забираются из PrefetchStore без сети
+            prefetch_store = PrefetchStore.instance()
             file_sizes_cache = {}
             for task in download_tasks:
                 u = task.get('url')
+                if (prefetched := prefetch_store.get(u, task.get('version'))):
+                    file_sizes_cache[u] = prefetched['size']
+                    total_bytes += prefetched['size']
+                    continue
+                # Если каталог публикует xdelta от установленной версии — качаем только патч
+                if (delta := self._find_delta_base(task, mod_folders[task['mod'].key])):
+                    task['delta'] = delta
                 try:
-                    h = session.head(u, allow_redirects=True, timeout=15)
+                    h = session.head(delta['url'] if delta else u, allow_redirects=True, timeout=15)
                     content_length = int(h.headers.get("content-length", 0))
                     file_sizes_cache[u] = content_length
                     total_bytes += content_length
@@ -774,8 +2038,12 @@ class InstallTranslationsThread(QThread):
                 return
 
             downloaded_ref = [0]
+            # Все загрузки установки отчитываются в один агрегатор — UI получает не больше ~100 обновлений
+            self.transfer = TransferProgress(self.progress, total_bytes, downloaded_ref)
             done_files = 0
             installed_mods = {}
+            # Устаревшие файлы в mods_dir (пути относительно папки мода) — удаляются при переносе по журналу
+            pending_deletes: dict[str, set[str]] = {}
 
             total_items = len(download_tasks)
             current_index = 0
@@ -790,39 +2058,29 @@ class InstallTranslationsThread(QThread):
                 # Пишем во временную папку; позже перенесем в финальную mods_dir
                 mod_dir = os.path.join(self.temp_root, mod_folder_name)
                 # Определяем папку для файлов на основе chapter_id
-                if chapter_id == -1:
-                    cache_dir = os.path.join(mod_dir, "demo")
-                elif chapter_id == 0:
-                    cache_dir = os.path.join(mod_dir, "chapter_0")  # Меню/глава 0 храним в 'chapter_0' для согласованности с лаунчером
-                else:
-                    cache_dir = os.path.join(mod_dir, f"chapter_{chapter_id}")
+                # Меню/глава 0 храним в 'chapter_0' для согласованности с лаунчером
+                chapter_sub = "demo" if chapter_id == -1 else f"chapter_{chapter_id}"
+                cache_dir = os.path.join(mod_dir, chapter_sub)
+                # Текущая (уже установленная) папка главы — из неё удаляем устаревшее при переносе
+                installed_chapter_dir = os.path.join(self.main_window.mods_dir, mod_folder_name, chapter_sub)
+                deletes = pending_deletes.setdefault(mod_folder_name, set())
 
                 # Очистка устаревших архивов (удаленные extra)
                 if task.get('cleanup_archives'):
                     try:
                         allowed = set((task.get('allowed') or []))
-                        if os.path.exists(cache_dir):
-                            for fname in os.listdir(cache_dir):
+                        if os.path.isdir(installed_chapter_dir):
+                            for fname in os.listdir(installed_chapter_dir):
                                 fl = fname.lower()
                                 if fl.endswith(('.zip', '.rar', '.7z')) and fl not in allowed:
-                                    try:
-                                        os.remove(os.path.join(cache_dir, fname))
-                                    except Exception:
-                                        pass
+                                    deletes.add(os.path.join(chapter_sub, fname))
                     except Exception: pass
                     continue
 
-                # Удаление компонента (extra, отсутствующий на сервере)
+                # Удаление компонента (extra, отсутствующий на сервере): сами архивы отбирает cleanup_archives,
+                # здесь только отмечаем главу, чтобы её config.json был переписан без удалённого компонента
                 if task.get('delete'):
-                    try:
-                        if os.path.exists(cache_dir):
-                            for fname in os.listdir(cache_dir):
-                                fl = fname.lower()
-                                if fl.endswith(('.zip', '.rar', '.7z')):
-                                    # Удаление конкретных лишних архивов уже обработано в cleanup_archives
-                                    pass
-                    except Exception:
-                        pass
+                    installed_mods.setdefault(mod.key, {'mod': mod, 'chapters': set()})['chapters'].add(chapter_id)
                     continue
 
                 url = task.get('url')
@@ -846,41 +2104,36 @@ class InstallTranslationsThread(QThread):
                 is_data_file = chapter_data and url and (chapter_data.data_file_url == url)
                 is_xdelta = task.get('is_xdelta', False)
 
-                # Если меняется тип data↔xdelta — удаляем противоположный тип перед скачиванием
+                # Если меняется тип data↔xdelta — противоположный тип удаляется при переносе
                 if is_data_file and task.get('type_changed'):
                     try:
-                        if is_xdelta:
-                            # Переход на xdelta — удалить data.win/game.ios
-                            if os.path.exists(cache_dir):
-                                for fname in os.listdir(cache_dir):
-                                    fl = fname.lower()
-                                    if fl in ('data.win','game.ios') or fl.endswith('.win') or fl.endswith('.ios'):
-                                        try:
-                                            os.remove(os.path.join(cache_dir, fname))
-                                        except Exception:
-                                            pass
-                        else:
-                            # Переход на data — удалить .xdelta
-                            if os.path.exists(cache_dir):
-                                for fname in os.listdir(cache_dir):
-                                    if fname.lower().endswith('.xdelta'):
-                                        try:
-                                            os.remove(os.path.join(cache_dir, fname))
-                                        except Exception:
-                                            pass
+                        if os.path.isdir(installed_chapter_dir):
+                            for fname in os.listdir(installed_chapter_dir):
+                                fl = fname.lower()
+                                # Переход на xdelta — удалить data.win/game.ios, переход на data — удалить .xdelta
+                                if (fl.endswith(('.win', '.ios')) if is_xdelta else fl.endswith('.xdelta')):
+                                    deletes.add(os.path.join(chapter_sub, fname))
                     except Exception: pass
 
                 try:
-                    if is_data_file:
+                    mirrors = self._component_mirrors(chapter_data, url)
+                    prefetched = prefetch_store.get(url, task.get('version')) if url else None
+                    if prefetched:
+                        self._install_prefetched(prefetch_store, prefetched, url, task.get('version'), cache_dir,
+                                                 is_data_file, is_xdelta, self.transfer)
+                    elif task.get('delta') and self._apply_delta_update(task['delta'], url, cache_dir, is_data_file, is_xdelta,
+                                                                        total_bytes, downloaded_ref, session):
+                        pass
+                    elif is_data_file:
                         if is_xdelta:
                             self._download_xdelta_file(
-                                url, cache_dir, self.progress, total_bytes, downloaded_ref, session)
+                                url, cache_dir, self.transfer, total_bytes, downloaded_ref, session, mirrors=mirrors)
                         else:
                             download_and_extract_archive(
-                                url, cache_dir, self.progress, total_bytes, downloaded_ref, session)
+                                url, cache_dir, self.transfer, total_bytes, downloaded_ref, session, mirrors=mirrors)
                     else:
                         self._download_archive_file(
-                            url, cache_dir, self.progress, total_bytes, downloaded_ref, session)
+                            url, cache_dir, self.transfer, total_bytes, downloaded_ref, session, mirrors=mirrors)
                 except Exception:
                     raise
 
@@ -894,10 +2147,14 @@ class InstallTranslationsThread(QThread):
                     self.progress.emit(int(done_files / max(1, len(download_tasks)) * 100))
 
 
+            # Конфиги пишем в staging, затем переносим каждую папку мода по журналу:
+            # при падении посреди переноса восстановление на старте докатит или откатит мод целиком
+            journal = InstallJournal()
+            journal.data["temp_root"] = self.temp_root
             for mod_key, mod_data in installed_mods.items():
                 mod = mod_data['mod']
                 mod_folder_name = mod_folders[mod.key]
-                mod_dir = os.path.join(self.main_window.mods_dir, mod_folder_name)
+                mod_dir = os.path.join(self.temp_root, mod_folder_name)
 
                 files_data = {}
                 for chapter_id in mod_data['chapters']:
@@ -957,42 +2214,28 @@ class InstallTranslationsThread(QThread):
 
                 config_path = os.path.join(mod_dir, "config.json")
                 self.main_window._write_json(config_path, config_data)
-
-
-                self._increment_downloads_for_installed_mods(installed_mods)
-
-                # Переносим из временной папки в финальную директорию модов
+                journal.plan(mod_folder_name, mod.key, mod_dir,
+                             os.path.join(self.main_window.mods_dir, mod_folder_name),
+                             os.path.join(self.temp_root, ".rollback", mod_folder_name),
+                             sorted(pending_deletes.get(mod_folder_name, ())))
+
+            journal.save()
+            os.makedirs(self.main_window.mods_dir, exist_ok=True)
+            for mod_folder_name in list(journal.data["mods"]):
                 try:
-                    os.makedirs(self.main_window.mods_dir, exist_ok=True)
-                    for entry in os.listdir(self.temp_root or ""):
-                        src = os.path.join(self.temp_root, entry)
-                        dst = os.path.join(self.main_window.mods_dir, entry)
-                        if os.path.isdir(src):
-                            try:
-                                shutil.copytree(src, dst, dirs_exist_ok=True)
-                            except TypeError:
-                                # Python <3.8 fallback: merge manually
-                                if not os.path.exists(dst):
-                                    shutil.move(src, dst)
-                                else:
-                                    for root, dirs, files in os.walk(src):
-                                        rel = os.path.relpath(root, src)
-                                        target_root = os.path.join(dst, rel)
-                                        os.makedirs(target_root, exist_ok=True)
-                                        for d in dirs:
-                                            os.makedirs(os.path.join(target_root, d), exist_ok=True)
-                                        for f in files:
-                                            shutil.copy2(os.path.join(root, f), os.path.join(target_root, f))
-                        else:
-                            shutil.copy2(src, dst)
+                    journal.commit(mod_folder_name)
                 except Exception:
-                    pass
-                finally:
                     try:
-                        if self.temp_root and os.path.isdir(self.temp_root):
-                            shutil.rmtree(self.temp_root, ignore_errors=True)
+                        # Мод откатан; ещё не начатые записи просто отбрасываем вместе со staging
+                        journal.rollback(mod_folder_name); journal.clear()
                     except Exception:
-                        pass
+                        # Запись остаётся в журнале — staging не трогаем, его разберёт восстановление при старте
+                        self.temp_root = None
+                    raise
+            journal.clear()
+            self._pre_extract_installed_archives()
+
+            self._increment_downloads_for_installed_mods(installed_mods, mod_folders)
 
             self.status.emit(tr("status.installation_complete"), UI_COLORS["status_success"])
             self.finished.emit(True)
@@ -1016,105 +2259,101 @@ class InstallTranslationsThread(QThread):
                 except Exception:
                     pass
 
-    def _increment_downloads_for_installed_mods(self, installed_mods):
-        try:
-            for mod_key in installed_mods:
-                if not mod_key.startswith("local_") and self._can_increment_download_by_config(mod_key):
-                    if self._increment_mod_downloads_on_server(mod_key):
-                        self._update_install_date_in_config(mod_key)
-        except Exception: pass
-
-    def _get_user_ip(self):
-        try: return requests.get('https://api.ipify.org', timeout=5).text.strip()
-        except Exception: return "127.0.0.1"
-
-    def _get_global_rate_limit_data(self):
-        """Получает данные rate limiting из глобального конфига приложения."""
-        try:
-            config_path = os.path.join(get_app_support_path(), "rate_limit_data.json")
-            if os.path.exists(config_path):
-                return self.main_window._read_json(config_path)
-            return {}
-        except:
-            return {}
-
-    def _update_global_rate_limit_data(self, mod_key):
-        """Обновляет данные rate limiting в глобальном конфиге."""
+    def _install_prefetched(self, store: 'PrefetchStore', entry: dict, url: str, version: Optional[str], target_dir: str,
+                            is_data_file: bool, is_xdelta: bool, transfer: 'TransferProgress'):
+        """Кладёт предзагруженный файл туда же, куда его положила бы обычная загрузка."""
+        os.makedirs(target_dir, exist_ok=True)
+        if is_data_file and not is_xdelta:
+            with tempfile.TemporaryDirectory(prefix="deltahub-dl-", dir=get_install_staging_dir()) as tmp:
+                tmp_path = os.path.join(tmp, entry['name'])
+                if not store.claim(url, version, tmp_path): raise IOError(f"prefetched file is missing: {url}")
+                _extract_archive(tmp_path, target_dir, entry['name'])
+        else:
+            filename = self._staged_filename(url, is_data_file, is_xdelta)
+            if not store.claim(url, version, os.path.join(target_dir, filename)): raise IOError(f"prefetched file is missing: {url}")
+            if not is_data_file: self._stage_archive(os.path.join(target_dir, filename))
+        transfer.add(entry['size'], entry['file'])
+
+    @staticmethod
+    def _component_mirrors(chapter_data: Optional[ModChapterData], url: Optional[str]) -> list[str]:
+        if not chapter_data or not url: return []
+        if chapter_data.data_file_url == url: return list(chapter_data.data_file_mirrors)
+        return next((list(ef.mirrors) for ef in chapter_data.extra_files if ef.url == url), [])
+
+    @staticmethod
+    def _staged_filename(url: str, is_data_file: bool, is_xdelta: bool) -> str:
+        # То же имя, что дают _download_xdelta_file/_download_archive_file
+        from urllib.parse import urlparse, unquote
+        filename = unquote(os.path.basename(urlparse(url).path))
+        if is_xdelta and is_data_file and not filename.endswith('.xdelta'):
+            return "game.ios.xdelta" if platform.system() == "Darwin" else "data.win.xdelta"
+        if not filename or '.' not in filename:
+            return f"extra_file_{hash(url) % 10000}.zip"
+        return filename
+
+    def _find_delta_base(self, task: dict, mod_folder_name: str) -> Optional[dict]:
+        """Возвращает {url, sha256, base}, если для установленной версии компонента есть xdelta-патч и сам файл на месте."""
+        entry = (task.get('deltas') or {}).get(task.get('local_version') or "")
+        if task.get('type_changed') or not isinstance(entry, dict) or not entry.get('url') or not entry.get('sha256'): return None
+        if importlib.util.find_spec("pyxdelta") is None: return None
+        chapter_id, component = task.get('chapter_id'), task.get('component')
+        mod_root = os.path.join(self.main_window.mods_dir, mod_folder_name)
+        chapter_dir = os.path.join(mod_root, "demo" if chapter_id == -1 else f"chapter_{chapter_id}")
         try:
-            current_ip = self._get_user_ip()
-            config_path = os.path.join(get_app_support_path(), "rate_limit_data.json")
-
-            # Читаем существующие данные
-            rate_limit_data = self._get_global_rate_limit_data()
-
-            # Добавляем/обновляем запись для текущего IP+мода
-            ip_mod_key = f"{current_ip}:{mod_key}"
-            now_str = time.strftime('%Y-%m-%d %H:%M:%S')
-            rate_limit_data[ip_mod_key] = now_str
+            if component == 'data':
+                exts = ('.xdelta',) if task.get('is_xdelta') else ('.win', '.ios')
+                names = sorted(f for f in os.listdir(chapter_dir) if f.lower().endswith(exts))
+            else:
+                files = (self.main_window._read_json(os.path.join(mod_root, "config.json")) or {}).get("files") or {}
+                names = (files.get('demo' if chapter_id == -1 else str(chapter_id), {}).get("extra_files") or {}).get(component) or []
+            base = next((os.path.join(chapter_dir, n) for n in names if os.path.isfile(os.path.join(chapter_dir, n))), None)
+        except Exception:
+            return None
+        return {'url': entry['url'], 'sha256': str(entry['sha256']).lower(), 'base': base} if base else None
 
-            # Сохраняем обновленные данные
-            self.main_window._write_json(config_path, rate_limit_data)
-        except:
-            pass
+    def _apply_delta_update(self, delta: dict, url: str, target_dir: str, is_data_file: bool, is_xdelta: bool,
+                            total_bytes: int, downloaded_ref: list[int], session) -> bool:
+        """Собирает новую версию компонента из установленной и xdelta-патча.
 
-    def _can_increment_download_by_config(self, mod_key):
+        Результат сверяется с sha256 из каталога; при любой ошибке возвращает False — вызывающий качает файл целиком.
+        """
         try:
-            import datetime
-            current_ip = self._get_user_ip()
-
-            # Читаем глобальные данные rate limiting из конфига приложения
-            rate_limit_data = self._get_global_rate_limit_data()
-
-            # Проверяем последний инкремент для текущего IP и мода
-            ip_mod_key = f"{current_ip}:{mod_key}"
-            last_increment_time = rate_limit_data.get(ip_mod_key, "")
-
-            # Если нет записи для этого IP+мода, разрешаем инкремент
-            if not last_increment_time:
-                return True
-
-            # Проверяем прошло ли 12 часов с последнего инкремента
-            last_increment_dt = datetime.datetime.strptime(last_increment_time, '%Y-%m-%d %H:%M:%S')
-            time_diff = datetime.datetime.now() - last_increment_dt
-            return time_diff.total_seconds() >= 43200  # 12 часов = 43200 секунд
-        except:
+            import pyxdelta
+            # Распакованный data.win сохраняет имя, остальное называется как при обычной загрузке
+            filename = os.path.basename(delta['base']) if is_data_file and not is_xdelta else self._staged_filename(url, is_data_file, is_xdelta)
+            with tempfile.TemporaryDirectory(prefix="deltahub-delta-", dir=get_install_staging_dir()) as tmp:
+                patch_path, out_path = os.path.join(tmp, "update.xdelta"), os.path.join(tmp, filename)
+                _download_file(session, delta['url'], patch_path, self.transfer, total_bytes, downloaded_ref)
+                if not pyxdelta.decode(infile=delta['base'], patchfile=patch_path, outfile=out_path):
+                    raise IOError("xdelta decode failed")
+                if _file_sha256(out_path) != delta['sha256']:
+                    raise IOError("patched file hash mismatch")
+                os.makedirs(target_dir, exist_ok=True)
+                shutil.move(out_path, os.path.join(target_dir, filename))
+            if not is_data_file: self._stage_archive(os.path.join(target_dir, filename))
+            return True
+        except Exception as e:
+            logging.warning(f"Delta update failed for {url}, falling back to full download: {e}")
+            # Полный файл не входил в общий объём — досчитываем, чтобы прогресс не упёрся в 100% раньше времени
+            if self.transfer.total_bytes > 0:
+                try: self.transfer.total_bytes += int(session.head(url, allow_redirects=True, timeout=15).headers.get("content-length", 0))
+                except Exception: pass
             return False
 
-    def _update_install_date_in_config(self, mod_key):
+    def _increment_downloads_for_installed_mods(self, installed_mods, mod_folders):
+        # Счётчик скачиваний уходит в фоновую очередь, установка его не ждёт
         try:
-            for folder_name in os.listdir(self.main_window.mods_dir):
-                config_path = os.path.join(self.main_window.mods_dir, folder_name, "config.json")
-                if os.path.isfile(config_path):
-                    try:
-                        config_data = self.main_window._read_json(config_path)
-                        if config_data.get("mod_key") == mod_key:
-                            now_str = time.strftime('%Y-%m-%d %H:%M:%S')
-                            config_data["installed_date"] = now_str
-                            config_data["last_download_increment"] = now_str
-                            self.main_window._write_json(config_path, config_data)
-
-                            # Обновляем глобальные данные rate limiting
-                            self._update_global_rate_limit_data(mod_key)
-                            return
-                    except:
-                        continue
-        except:
-            pass
-
-    def _increment_mod_downloads_on_server(self, mod_key):
-        try:
-            response = requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/incrementDownloads", json={"modId": mod_key}, timeout=10)
-            return response.status_code == 200
-        except Exception:
-            return False
+            queue = DownloadCounterQueue.instance()
+            for mod_key in installed_mods:
+                queue.enqueue(mod_key, os.path.join(self.main_window.mods_dir, mod_folders.get(mod_key, "")))
+        except Exception: pass
 
-    def _download_archive_file(self, url: str, target_dir: str, progress_signal, total_size: int, downloaded_ref: list[int], session=None):
+    def _download_archive_file(self, url: str, target_dir: str, progress_signal, total_size: int, downloaded_ref: list[int], session=None, mirrors: Optional[list[str]] = None):
         import os
         from urllib.parse import urlparse, unquote
 
         if session is None:
-            session = requests.Session()
-            session.headers.update(BROWSER_HEADERS)
+            session = http_client.session
 
         parsed_url = urlparse(url)
         filename = unquote(os.path.basename(parsed_url.path))
@@ -1126,7 +2365,7 @@ class InstallTranslationsThread(QThread):
         target_path = os.path.join(target_dir, filename)
 
         try:
-            _download_file(session, url, target_path, progress_signal, total_size, downloaded_ref)
+            _download_file(session, url, target_path, progress_signal, total_size, downloaded_ref, mirrors=mirrors)
         except Exception as e:
             if os.path.exists(target_path):
                 try:
@@ -1135,13 +2374,27 @@ class InstallTranslationsThread(QThread):
                     pass
             raise e
 
-    def _download_xdelta_file(self, url: str, target_dir: str, progress_signal, total_size: int, downloaded_ref: list[int], session=None):
+        self._stage_archive(target_path)
+
+    def _stage_archive(self, path: str):
+        """Запоминает архив-дополнение в staging — откуда бы он ни взялся (загрузка, предзагрузка, дельта)."""
+        if path.lower().endswith(('.zip', '.rar', '.7z')): self._staged_archives.append(path)
+
+    def _pre_extract_installed_archives(self):
+        """Архивы-дополнения раскладываются в игру на каждом запуске — распаковываем их в кэш сразу после установки.
+        Путь берётся уже в папке модов: memo хэшей ExtractedArchiveCache ключуется путём, а staging удаляется."""
+        for staged in self._staged_archives:
+            path = os.path.join(self.main_window.mods_dir, os.path.relpath(staged, self.temp_root))
+            try: ExtractedArchiveCache.instance().ensure(path)
+            except Exception as e: logging.warning(f"Extract cache: pre-extract of {os.path.basename(path)} failed: {e}")
+        self._staged_archives = []
+
+    def _download_xdelta_file(self, url: str, target_dir: str, progress_signal, total_size: int, downloaded_ref: list[int], session=None, mirrors: Optional[list[str]] = None):
         import os
         from urllib.parse import urlparse, unquote
 
         if session is None:
-            session = requests.Session()
-            session.headers.update(BROWSER_HEADERS)
+            session = http_client.session
 
         parsed_url = urlparse(url)
         filename = unquote(os.path.basename(parsed_url.path))
@@ -1157,7 +2410,7 @@ class InstallTranslationsThread(QThread):
         target_path = os.path.join(target_dir, filename)
 
         try:
-            _download_file(session, url, target_path, progress_signal, total_size, downloaded_ref)
+            _download_file(session, url, target_path, progress_signal, total_size, downloaded_ref, mirrors=mirrors)
         except Exception as e:
             if os.path.exists(target_path):
                 try:
@@ -1166,6 +2419,46 @@ class InstallTranslationsThread(QThread):
                     pass
             raise e
 
+class UpdatePrefetchThread(InstallTranslationsThread):
+    """Фоновая предзагрузка устаревших компонентов установленных модов в PrefetchStore.
+
+    Ничего не меняет в mods_dir: установка/обновление затем забирает готовые файлы из хранилища.
+    """
+    def __init__(self, main_window, install_tasks):
+        super().__init__(main_window, install_tasks, True)
+
+    def cancel(self):
+        # Тихая отмена: текущий файл докачивается, следующие пропускаются
+        self._cancelled = True
+
+    def run(self):
+        store, wanted, fetched = PrefetchStore.instance(), set(), 0
+        try:
+            session = http_client.session
+            for mod, chapter_id in self.install_tasks:
+                folder = self._find_existing_mod_folder(mod.key)
+                if not folder: continue
+                for component, info in self._should_update_component(mod, chapter_id, folder).items():
+                    url, version = info.get('url'), info.get('remote_version')
+                    if not url or info.get('delete'): continue
+                    # Для компонентов с xdelta от установленной версии полный файл не нужен — патч скачает установка
+                    if (info.get('deltas') or {}).get(info.get('local_version') or ""): continue
+                    wanted.add(url)
+                    if self._cancelled or store.get(url, version): continue
+                    is_archive_data = component == 'data' and not info.get('is_xdelta')
+                    fname = _get_filename_from_url(session, url) if is_archive_data else os.path.basename(url.split("?", 1)[0])
+                    tmp_path = store.partial_path(url)
+                    try:
+                        _download_file(session, url, tmp_path, None, 0, [0],
+                                       mirrors=self._component_mirrors(mod.get_chapter_data(chapter_id), url))
+                        store.put(url, version, tmp_path, fname, mod.key); fetched += 1
+                    except Exception as e:
+                        logging.warning(f"Prefetch failed for {mod.key}/{component}: {e}")
+            if not self._cancelled: store.prune(wanted)
+        except Exception as e:
+            logging.warning(f"Update prefetch error: {e}")
+        self.finished.emit(fetched > 0)
+
 class FullInstallThread(QThread):
     progress = pyqtSignal(int)
     status   = pyqtSignal(str, str)
@@ -1184,15 +2477,7 @@ class FullInstallThread(QThread):
             return
         self.status.emit(tr("status.installing_game_files"), UI_COLORS["status_warning"])
         try:
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
-
-            session = requests.Session()
-            session.headers.update(BROWSER_HEADERS)
-            retry_strategy = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
-            adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=1, pool_maxsize=10)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
+            session = http_client.session
 
             resp = session.head(full_install_url, allow_redirects=True, timeout=15)
             total_size = int(resp.headers.get("content-length", 0))
@@ -1234,7 +2519,7 @@ class FetchChangelogThread(QThread):
             if self.source.startswith(("http://", "https://")):
                 params = {'ts': int(time.time())}
                 headers = {"Cache-Control": "no-cache", "Pragma": "no-cache", "User-Agent": "DELTAHUB/1.0"}
-                with requests.get(self.source, params=params, headers=headers, timeout=10) as resp:
+                with http_client.get(self.source, params=params, headers=headers, timeout=10) as resp:
                     resp.raise_for_status()
                     text = resp.text
             elif os.path.exists(self.source) or os.path.exists(self.source.replace(".md", ".txt")):
@@ -1248,10 +2533,104 @@ class FetchChangelogThread(QThread):
         finally:
             self.finished.emit(text)
 
+class DownloadCounterQueue:
+    """Фоновая очередь инкрементов счётчика скачиваний модов.
+
+    События сохраняются в download_counter_queue.json и отправляются отдельным потоком пачкой:
+    IP определяется один раз за сессию, rate_limit_data.json читается и пишется один раз на пачку.
+    Неотправленное переживает перезапуск и досылается при следующем flush_async().
+    """
+    FILE_NAME = "download_counter_queue.json"
+    RATE_LIMIT_FILE = "rate_limit_data.json"
+    RATE_LIMIT_SECONDS = 43200  # 12 часов на пару IP+мод
+    _instance = None
+
+    @classmethod
+    def instance(cls) -> 'DownloadCounterQueue':
+        if cls._instance is None: cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = os.path.join(get_app_support_path(), self.FILE_NAME)
+        self._pending: list[dict] = _read_json_file(self._path) or []
+        self._worker: Optional[threading.Thread] = None
+        self._ip: Optional[str] = None
+
+    def enqueue(self, mod_key: str, mod_dir: str = ""):
+        if not mod_key or mod_key.startswith("local_"): return
+        with self._lock:
+            self._pending.append({"mod_key": mod_key, "mod_dir": mod_dir, "queued": time.strftime('%Y-%m-%d %H:%M:%S')})
+            self._save_locked()
+        self.flush_async()
+
+    def flush_async(self, delay: float = 2.0):
+        # Небольшая задержка собирает события одной установки в одну пачку
+        with self._lock:
+            if not self._pending or (self._worker and self._worker.is_alive()): return
+            self._worker = threading.Thread(target=self._flush, args=(delay,), name="download-counter-queue", daemon=True)
+            self._worker.start()
+
+    def _save_locked(self):
+        try:
+            if self._pending: _write_json_atomic(self._path, self._pending)
+            elif os.path.exists(self._path): os.remove(self._path)
+        except Exception: pass
+
+    def _get_ip(self) -> str:
+        if self._ip is None:
+            try: self._ip = http_client.get('https://api.ipify.org', timeout=5).text.strip() or None
+            except Exception: pass
+        return self._ip or "127.0.0.1"
+
+    def _rate_allows(self, last_stamp: Optional[str]) -> bool:
+        if not last_stamp: return True
+        try: return time.time() - time.mktime(time.strptime(last_stamp, '%Y-%m-%d %H:%M:%S')) >= self.RATE_LIMIT_SECONDS
+        except Exception: return False
+
+    def _stamp_config(self, mod_key: str, mod_dir: str, stamp: str):
+        config_path = os.path.join(mod_dir, "config.json")
+        config_data = _read_json_file(config_path) if mod_dir else None
+        if not isinstance(config_data, dict) or config_data.get("mod_key") != mod_key: return
+        config_data["installed_date"] = stamp
+        config_data["last_download_increment"] = stamp
+        try: _write_json_atomic(config_path, config_data)
+        except Exception: pass
+
+    def _flush(self, delay: float):
+        time.sleep(delay)
+        while True:
+            with self._lock:
+                batch = list(self._pending)
+                # Поток снимает себя под тем же замком, под которым enqueue проверяет его: событие,
+                # добавленное после этой проверки, запустит новый поток, а не останется в очереди
+                if not batch: self._worker = None; return
+            ip = self._get_ip()
+            rate_path = os.path.join(get_app_support_path(), self.RATE_LIMIT_FILE)
+            rate_data = _read_json_file(rate_path) or {}
+            done, failed = [], False
+            for event in batch:
+                ip_mod_key = f"{ip}:{event['mod_key']}"
+                if self._rate_allows(rate_data.get(ip_mod_key)):
+                    try: ok = http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/incrementDownloads", json={"modId": event['mod_key']}, timeout=10).status_code == 200
+                    except Exception: ok = False
+                    if not ok: failed = True; continue
+                    stamp = time.strftime('%Y-%m-%d %H:%M:%S')
+                    rate_data[ip_mod_key] = stamp
+                    self._stamp_config(event['mod_key'], event.get('mod_dir', ""), stamp)
+                done.append(event)
+            try: _write_json_atomic(rate_path, rate_data)
+            except Exception: pass
+            with self._lock:
+                self._pending = [e for e in self._pending if e not in done]
+                self._save_locked()
+                # Сеть недоступна — остаток ждёт следующего enqueue или запуска
+                if failed: self._worker = None; return
+
 def increment_launch_counter():
     os_key = {"Windows": "windows", "Linux": "linux", "Darwin": "macos"}.get(platform.system(), "other")
     try:
-        requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/incrementLaunches", json={"os": os_key}, timeout=5)
+        http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/incrementLaunches", json={"os": os_key}, timeout=5)
     except requests.RequestException:
         pass
 
@@ -1261,6 +2640,31 @@ def get_app_support_path():
     os.makedirs(os.path.join(path, "cache"), exist_ok=True); return os.path.join(path, "cache")
 
 
+_LOG_FILE_READY = False
+
+def setup_log_file():
+    """Centralized logging to file in config dir; truncate on each launch. stdout/stderr go there too; repeated calls do nothing."""
+    global _LOG_FILE_READY
+    if _LOG_FILE_READY: return
+    _LOG_FILE_READY = True
+    try:
+        cfg_dir = get_app_support_path()
+        os.makedirs(cfg_dir, exist_ok=True)
+        log_path = os.path.join(cfg_dir, "deltahub.log.txt")
+        with open(log_path, 'w', encoding='utf-8') as _f:
+            _f.write("")
+        logging.basicConfig(
+            filename=log_path,
+            filemode='a',
+            encoding='utf-8',
+            level=logging.INFO,
+            format='%(asctime)s %(levelname)s: %(message)s'
+        )
+        sys.stdout = open(log_path, 'a', encoding='utf-8')
+        sys.stderr = sys.stdout
+    except Exception:
+        pass
+
 def get_legacy_ylauncher_path() -> str:
     """Returns the old YLauncher config folder path for the current OS."""
     system = platform.system()
@@ -1303,8 +2707,46 @@ def get_unique_mod_dir(mods_dir, mod_name):
         counter += 1
 
 
+_WATCHED_GAME_PROCS: list = []  # процессы игры, за которыми сейчас следит GameMonitorThread
+
 def is_game_running():
-    return any(proc.info['name'] in GAME_PROCESS_NAMES for proc in psutil.process_iter(['name']))
+    # Известный PID проверяется за O(1); полный проход по таблице процессов — только если его нет
+    if any(p.is_running() for p in list(_WATCHED_GAME_PROCS)): return True
+    return bool(find_game_processes())
+
+def find_game_processes(root: Optional[psutil.Process] = None) -> list:
+    """Процессы игры по имени: среди root и его потомков (Popen/Steam), иначе один проход по таблице процессов."""
+    found = []
+    try:
+        candidates = [root] + root.children(recursive=True) if root else psutil.process_iter(['name'])
+        for proc in candidates:
+            try:
+                if (proc.info['name'] if hasattr(proc, 'info') else proc.name()) in GAME_PROCESS_NAMES: found.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied): pass
+    except psutil.Error: pass
+    return found
+
+def wait_process_exit(proc: psutil.Process):
+    """Блокируется до выхода процесса без опроса: pidfd на Linux, kqueue на macOS, иначе psutil (на Windows — WaitForSingleObject)."""
+    import select
+    if hasattr(os, "pidfd_open"):
+        try: fd = os.pidfd_open(proc.pid)
+        except OSError: fd = None
+        if fd is not None:
+            try:
+                # PID мог уже достаться другому процессу — проверяем по времени создания после открытия fd
+                if proc.is_running(): select.select([fd], [], [])
+                return
+            finally: os.close(fd)
+    if hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            ev = select.kevent(proc.pid, filter=select.KQ_FILTER_PROC, flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT, fflags=select.KQ_NOTE_EXIT)
+            if proc.is_running(): kq.control([ev], 1, None)
+            return
+        except OSError: pass  # процесс уже завершился (ESRCH)
+        finally: kq.close()
+    psutil.wait_procs([proc])
 
 def get_default_save_path() -> str:
     system = platform.system()
@@ -1353,14 +2795,39 @@ def is_valid_game_path(path: str, skip_data_check: bool = False, game_type: str
         return (os.path.isfile(os.path.join(path, "DELTARUNE.exe")) or
                 os.path.isfile(os.path.join(path, "DELTARUNE")))
 
+_WRITABLE_DIRS: set = set()  # папки, в которые уже удалось писать в этой сессии
+
+def _probe_dir_writable(path: str) -> bool:
+    # os.access на Windows не видит ACL — честнее создать и удалить пустой файл
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=".deltahub-probe-", dir=path); os.close(fd); os.remove(tmp); return True
+    except OSError: return False
+
 def ensure_writable(path: str) -> bool:
+    """Можно ли создавать и заменять файлы в папке (или заменить файл). Папка проверяется одной пробой,
+    удачный результат кэшируется на сессию; права чинятся только у неё самой, а не у всего дерева.
+    Отдельные файлы перед заменой разблокирует make_replaceable."""
+    if os.path.isfile(path): return make_replaceable(path)
+    path = os.path.normpath(path)
+    if path in _WRITABLE_DIRS: return True
+    ok = _probe_dir_writable(path)
+    if not ok:
+        try: os.chmod(path, os.stat(path).st_mode | stat.S_IWUSR | stat.S_IWGRP | stat.S_IWRITE); ok = _probe_dir_writable(path)
+        except OSError: pass
+    if ok: _WRITABLE_DIRS.add(path)  # отказ не кэшируем: пользователь может выдать права и повторить
+    return ok
+
+def make_replaceable(path: str) -> bool:
+    """Снимает «только чтение» с конкретного файла, который сейчас будет перемещён или заменён, и проверяет его папку.
+
+    Симлинк не трогаем: chmod прошёл бы к файлу, на который он указывает (в оверлее — к файлу самой игры),
+    а заменяется и перемещается всё равно сама ссылка."""
     try:
-        mode = os.stat(path).st_mode; os.chmod(path, mode | stat.S_IWUSR | stat.S_IWGRP | stat.S_IWRITE)
-        if os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                for name in dirs + files: os.chmod(os.path.join(root, name), mode | stat.S_IWUSR | stat.S_IWGRP | stat.S_IWRITE)
-        return True
-    except (OSError, PermissionError): return False
+        mode = os.lstat(path).st_mode
+        if not stat.S_ISLNK(mode) and not mode & stat.S_IWUSR: os.chmod(path, mode | stat.S_IWUSR | stat.S_IWGRP | stat.S_IWRITE)
+    except FileNotFoundError: pass
+    except OSError: return False
+    return ensure_writable(os.path.dirname(path) or ".")
 
 def autodetect_path(game_name: str) -> str | None:
     system, paths = platform.system(), []
@@ -1399,7 +2866,7 @@ def cleanup_old_updater_files():
     except Exception: pass
 
 def check_internet_connection() -> bool:
-    try: requests.get("https://www.google.com", timeout=5); return True
+    try: http_client.get("https://www.google.com", timeout=5, retries=False); return True
     except requests.RequestException: return False
 
 import hashlib, secrets, string
@@ -7,6 +7,7 @@ from PyQt6.QtCore import Qt, QEvent, QEventLoop, QThread, QTimer, QUrl, pyqtSign
 from PyQt6.QtGui import QBrush, QColor, QDesktopServices, QFont, QFontDatabase, QIcon, QImage, QMovie, QPainter, QPalette, QPixmap, QPen, QPainterPath
 from PyQt6.QtWidgets import QApplication, QButtonGroup, QCheckBox, QComboBox, QDialog, QDialogButtonBox, QFileDialog, QFrame, QHeaderView, QLabel, QLineEdit, QMessageBox, QProgressBar, QPushButton, QTableWidget, QTableWidgetItem, QTabWidget, QTextBrowser, QVBoxLayout, QWidget, QHBoxLayout, QSizePolicy, QInputDialog, QColorDialog, QListWidget, QLayoutItem, QScrollArea, QSlider
 from localization import get_localization_manager, tr
+from game_launch import GameLaunchMixin, ShortcutLaunch
 import logging
 import threading
 
@@ -80,158 +81,96 @@ class OutlinedTextLabel(QLabel):
         painter.drawPath(path)
 
 
-# Centralized logging to file in config dir; truncate on each launch
-try:
-    cfg_dir = get_app_support_path()
-    os.makedirs(cfg_dir, exist_ok=True)
-    LOG_PATH = os.path.join(cfg_dir, "deltahub.log.txt")
-    with open(LOG_PATH, 'w', encoding='utf-8') as _f:
-        _f.write("")
-    logging.basicConfig(
-        filename=LOG_PATH,
-        filemode='a',
-        encoding='utf-8',
-        level=logging.INFO,
-        format='%(asctime)s %(levelname)s: %(message)s'
-    )
-    sys.stdout = open(LOG_PATH, 'a', encoding='utf-8')
-    sys.stderr = sys.stdout
-except Exception:
-    pass
+setup_log_file()
 
 # ============================================================================
 #                               UTILITY FUNCTIONS
 # ============================================================================
 
-# Global lightweight image cache and network concurrency guard
-try:
-    _IMG_CACHE: dict[str, QImage] = {}
-    _PIX_CACHE: dict[str, QPixmap] = {}
-    _IMG_CACHE_LOCK = threading.Lock()
-    _NET_SEM = threading.Semaphore(6)  # cap concurrent network fetches
-except Exception:
-    _IMG_CACHE, _PIX_CACHE, _IMG_CACHE_LOCK, _NET_SEM = {}, {}, None, None
+# Global lightweight image cache (сетевые загрузки ограничивает пул NetService, на диске — ImageDiskCache)
+# Бюджеты раздельные: пролистывание скриншотов не должно вытеснять иконки из списка модов
+_IMG_CACHE = ImageMemoryCache("screenshots", 96 * 1024 ** 2)  # QImage по URL
+_PIX_CACHE = ImageMemoryCache("icons", 24 * 1024 ** 2)        # готовые квадратные QPixmap по URL@размер
 
-def load_mod_icon_universal(icon_label, mod_data, size=80):
-    """Универсальная функция для загрузки иконки мода (без блокировки UI)."""
-    # Сначала всегда устанавливаем иконку по умолчанию
-    assets_icon_path = os.path.join(os.path.dirname(__file__), "assets", "icon.ico")
-    fallback_icon_path = os.path.join(os.path.dirname(__file__), "icon.ico")
-    default_pixmap = None
-
-    for default_icon_path in (assets_icon_path, fallback_icon_path):
+def fetch_image_cached(url: str, callback, timeout: float = 10, kind: str = "screenshot"):
+    """Отдаёт QImage из _IMG_CACHE или через NetService.fetch_thumbnail (диск, затем сеть); callback(qimg | None) — в GUI-потоке."""
+    cached = _IMG_CACHE.get(url)
+    if cached is not None:
+        callback(cached)
+        return
+    def _on_loaded(img, err):
+        if err is None and img is not None:
+            _IMG_CACHE.put(url, img)
+        callback(img if err is None else None)
+    net = NetService.instance()
+    net.call(net.fetch_thumbnail(url, kind, timeout=timeout), _on_loaded)
+
+_DEFAULT_ICON_PIXMAPS: dict[int, QPixmap] = {}
+
+def default_icon_pixmap(size: int) -> QPixmap:
+    """Общая для всех виджетов иконка по умолчанию size×size (читается и обрезается один раз на размер)."""
+    if (pm := _DEFAULT_ICON_PIXMAPS.get(size)) is not None:
+        return pm
+    pm = None
+    for default_icon_path in (os.path.join(os.path.dirname(__file__), "assets", "icon.ico"), os.path.join(os.path.dirname(__file__), "icon.ico")):
         if os.path.exists(default_icon_path):
             try:
-                default_pixmap = QPixmap(default_icon_path)
-                if not default_pixmap.isNull():
-                    icon_size = min(default_pixmap.width(), default_pixmap.height())
-                    if icon_size > 0:
-                        cropped = default_pixmap.copy((default_pixmap.width() - icon_size) // 2, (default_pixmap.height() - icon_size) // 2, icon_size, icon_size)
-                        default_pixmap = cropped.scaled(size, size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    else:
-                        default_pixmap = default_pixmap.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+                img = read_square_icon(default_icon_path, size)
+                if not img.isNull():
+                    pm = QPixmap.fromImage(img)
                     break
             except Exception:
-                default_pixmap = None
+                pass
+    if pm is None:
+        pm = QPixmap(size, size)
+        pm.fill(QColor("#333"))
+    _DEFAULT_ICON_PIXMAPS[size] = pm
+    return pm
 
-    if default_pixmap is None:
-        default_pixmap = QPixmap(size, size)
-        default_pixmap.fill(QColor("#333"))
+def load_mod_icon_universal(icon_label, mod_data, size=80):
+    """Универсальная функция для загрузки иконки мода (без блокировки UI).
 
-    icon_label.setPixmap(default_pixmap)
+    Декодирование, обрезка до квадрата и уменьшение идут в пуле NetService; GUI-поток только
+    превращает готовый QImage в QPixmap и вызывает setPixmap.
+    """
+    # Сначала всегда устанавливаем иконку по умолчанию
+    icon_label.setPixmap(default_icon_pixmap(size))
 
-    # Пытаемся загрузить иконку мода (локальный путь или URL) — сеть в QThread
+    # Пытаемся загрузить иконку мода (локальный путь или URL)
     try:
-        pixmap = None
-        if getattr(mod_data, 'icon_path', None) and os.path.exists(mod_data.icon_path):
-            pixmap = QPixmap(mod_data.icon_path)
-            if not pixmap.isNull():
-                icon_size = min(pixmap.width(), pixmap.height())
-                cropped = pixmap.copy((pixmap.width() - icon_size) // 2, (pixmap.height() - icon_size) // 2, icon_size, icon_size)
-                icon_label.setPixmap(cropped.scaled(size, size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation))
+        net = NetService.instance()
+        local_path = getattr(mod_data, 'icon_path', None)
+        icon_url = getattr(mod_data, 'icon_url', None)
+        if local_path and os.path.exists(local_path):
+            cache_key = f"{local_path}@{os.path.getmtime(local_path)}@{size}"
+            coro_factory = lambda: net.run_blocking(read_square_icon, local_path, size)
+        elif isinstance(icon_url, str) and icon_url.startswith(('http://', 'https://')):
+            cache_key = f"{icon_url}@{size}"
+            coro_factory = lambda: net.fetch_icon(icon_url, size, timeout=8)
+        else:
+            return
+
+        def _apply(pm: QPixmap):
+            try:
+                if pm and not pm.isNull() and not sip.isdeleted(icon_label):
+                    icon_label.setPixmap(pm)
+            except Exception as e:
+                print(f"Error applying mod icon: {e}")
+        # Cache hit
+        cached = _PIX_CACHE.get(cache_key)
+        if cached is not None:
+            _apply(cached)
+            return
+        def _on_loaded(img, err):
+            if err is not None or img is None or img.isNull():
+                # Логируем, но не тревожим UI
+                print(f"Icon load failed: {err}")
                 return
-        elif getattr(mod_data, 'icon_url', None):
-            icon_url = mod_data.icon_url
-            if isinstance(icon_url, str) and icon_url.startswith(('http://', 'https://')):
-                from PyQt6.QtCore import QThread, pyqtSignal
-                class _IconLoader(QThread):
-                    loaded = pyqtSignal(object)
-                    failed = pyqtSignal(str)
-                    def __init__(self, url):
-                        super().__init__(); self.url = url
-                    def run(self):
-                        try:
-                            # Cache hit
-                            global _PIX_CACHE, _IMG_CACHE_LOCK, _NET_SEM
-                            if _PIX_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                                with _IMG_CACHE_LOCK:
-                                    if self.url in _PIX_CACHE:
-                                        self.loaded.emit(_PIX_CACHE[self.url]); return
-                            import requests
-                            # Concurrency guard
-                            if _NET_SEM:
-                                _NET_SEM.acquire()
-                            try:
-                                resp = requests.get(self.url, timeout=8)
-                            finally:
-                                try:
-                                    if _NET_SEM:
-                                        _NET_SEM.release()
-                                except Exception:
-                                    pass
-                            resp.raise_for_status()
-                            img = QImage()
-                            if img.loadFromData(resp.content):
-                                pm = QPixmap.fromImage(img)
-                                if _PIX_CACHE is not None:
-                                    try:
-                                        if _IMG_CACHE_LOCK is not None:
-                                            _IMG_CACHE_LOCK.acquire()
-                                        _PIX_CACHE[self.url] = pm
-                                    except Exception:
-                                        pass
-                                    finally:
-                                        try:
-                                            if _IMG_CACHE_LOCK is not None:
-                                                _IMG_CACHE_LOCK.release()
-                                        except Exception:
-                                            pass
-                                self.loaded.emit(pm)
-                            else:
-                                self.failed.emit('decode')
-                        except Exception as e:
-                            self.failed.emit(str(e))
-
-                worker = _IconLoader(icon_url)
-                # Привязываем к label, чтобы не был собран GC
-                setattr(icon_label, '_icon_loader', worker)
-                # Безопасно останавливаем поток при уничтожении label
-                def safe_cleanup():
-                    try:
-                        if worker and not sip.isdeleted(worker):
-                            worker.requestInterruption()
-                            worker.quit()
-                            worker.wait(1000)
-                    except:
-                        pass
-                try:
-                    icon_label.destroyed.connect(safe_cleanup)
-                except Exception:
-                    pass
-                def _on_loaded(pm: QPixmap):
-                    try:
-                        if pm and not pm.isNull():
-                            icon_size = min(pm.width(), pm.height())
-                            cropped = pm.copy((pm.width() - icon_size) // 2, (pm.height() - icon_size) // 2, icon_size, icon_size)
-                            icon_label.setPixmap(cropped.scaled(size, size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation))
-                    except Exception as e:
-                        print(f"Error applying mod icon: {e}")
-                def _on_failed(err: str):
-                    # Логируем, но не тревожим UI
-                    print(f"Icon load failed: {err}")
-                worker.loaded.connect(_on_loaded)
-                worker.failed.connect(_on_failed)
-                worker.start()
+            # QPixmap создаём только в GUI-потоке; картинка уже квадратная и нужного размера
+            pm = QPixmap.fromImage(img)
+            _PIX_CACHE.put(cache_key, pm)
+            _apply(pm)
+        net.call(coro_factory(), _on_loaded)
     except Exception as e:
         print(f"Error loading mod icon: {e}")
 
@@ -399,34 +338,14 @@ class ScreenshotsCarousel(QWidget):
         self.urls = [u for u in urls if isinstance(u, str) and u.startswith(('http://','https://'))][:10]
         self.index = 0
         self._images = [None] * len(self.urls)
-        self._workers = {}
         # loading flags must match urls length to avoid IndexError
         self._loading = [False] * len(self.urls)
-        # Останавливаем фоновые потоки при уничтожении виджета
-        try:
-            self.destroyed.connect(self._stop_all_workers)
-        except Exception:
-            pass
         self._init_ui()
         if self.urls:
             self._show_current()
         else:
             self._update_nav_state()
 
-    def _stop_all_workers(self):
-        try:
-            # Останавливаем все QThread из коллекции
-            for k, w in list(getattr(self, '_workers', {}).items()):
-                try:
-                    if w.isRunning():
-                        w.requestInterruption(); w.quit(); w.wait(1000)
-                except Exception:
-                    pass
-            if hasattr(self, '_workers'):
-                self._workers.clear()
-        except Exception:
-            pass
-
     def _init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0,0,0,0)
@@ -536,164 +455,46 @@ class ScreenshotsCarousel(QWidget):
         url = self.urls[self.index]
         img = self._images[self.index]
         if img is None:
-            # lazy load via thread
-            if not hasattr(self, '_loading'):
-                self._loading = [False] * len(self.urls)
-                self._current_worker = None
+            # lazy load via NetService
             if not self._loading[self.index]:
-                self._loading[self.index] = True
-                from PyQt6.QtCore import QThread, pyqtSignal
-                class _ImgLoader(QThread):
-                    loaded = pyqtSignal(int, object)
-                    failed = pyqtSignal(int)
-                    def __init__(self, idx, url):
-                        super().__init__()
-                        self.idx, self.url = idx, url
-                    def run(self):
-                        try:
-                            global _IMG_CACHE, _IMG_CACHE_LOCK, _NET_SEM
-                            # Cache hit
-                            if _IMG_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                                with _IMG_CACHE_LOCK:
-                                    if self.url in _IMG_CACHE:
-                                        self.loaded.emit(self.idx, _IMG_CACHE[self.url]); return
-                            import requests
-                            if _NET_SEM:
-                                _NET_SEM.acquire()
-                            try:
-                                r = requests.get(self.url, timeout=10)
-                            finally:
-                                try:
-                                    if _NET_SEM:
-                                        _NET_SEM.release()
-                                except Exception:
-                                    pass
-                            if not r.ok:
-                                self.failed.emit(self.idx); return
-                            q = QImage()
-                            if not q.loadFromData(r.content):
-                                self.failed.emit(self.idx); return
-                            if _IMG_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                                try:
-                                    with _IMG_CACHE_LOCK:
-                                        _IMG_CACHE[self.url] = q
-                                except Exception:
-                                    pass
-                            self.loaded.emit(self.idx, q)
-                        except Exception:
-                            self.failed.emit(self.idx)
-                worker = _ImgLoader(self.index, url)
-                def on_loaded(i, qimg):
-                    if i < len(self._images):
-                        self._images[i] = qimg
-                        self._loading[i] = False
-                    # Guard: widget may be gone
-                    try:
-                        from PyQt6 import sip as _sip
-                        if not hasattr(self, 'image_label') or _sip.isdeleted(self.image_label):
-                            return
-                    except Exception:
-                        pass
-                    if i == self.index:
-                        self._set_pixmap(qimg)
-                def on_failed(i):
-                    if i < len(self._loading):
-                        self._loading[i] = False
-                    try:
-                        from PyQt6 import sip as _sip
-                        if not hasattr(self, 'image_label') or _sip.isdeleted(self.image_label):
-                            return
-                    except Exception:
-                        pass
-                    if i == self.index:
-                        try:
-                            from PyQt6 import sip as _sip
-                            if hasattr(self, 'image_label') and not _sip.isdeleted(self.image_label):
-                                self.image_label.setText(tr('errors.file_not_available'))
-                        except Exception:
-                            pass
-                worker.loaded.connect(on_loaded)
-                worker.failed.connect(on_failed)
-                # Keep reference so worker isn't GC'd
-                if not hasattr(self, '_workers'):
-                    self._workers = {}
-                self._workers[self.index] = worker
-                # do not clear current pixmap to avoid flicker
-                worker.start()
+                self._request_image(self.index)
             return
         self._set_pixmap(img)
         # Preload neighbors
         self._preload_neighbor(self.index - 1)
         self._preload_neighbor(self.index + 1)
 
+    def _is_alive(self) -> bool:
+        # Guard: widget may be gone (rapid open/close)
+        try:
+            from PyQt6 import sip as _sip
+            return hasattr(self, 'image_label') and not _sip.isdeleted(self) and not _sip.isdeleted(self.image_label)
+        except Exception:
+            return True
+
+    def _request_image(self, idx: int):
+        self._loading[idx] = True
+        def on_loaded(qimg):
+            if not self._is_alive() or idx >= len(self._images):
+                return
+            self._loading[idx] = False
+            if qimg is None:
+                if idx == self.index:
+                    self.image_label.setText(tr('errors.file_not_available'))
+                return
+            self._images[idx] = qimg
+            if idx == self.index:
+                self._show_current()
+        fetch_image_cached(self.urls[idx], on_loaded, timeout=10)
+
     def _preload_neighbor(self, idx: int):
         if not self.urls:
             return
         if idx < 0 or idx >= len(self.urls):
             return
-        if self._images[idx] is not None or (hasattr(self, '_loading') and idx < len(self._loading) and self._loading[idx]):
+        if self._images[idx] is not None or self._loading[idx]:
             return
-        if not hasattr(self, '_loading'):
-            self._loading = [False] * len(self.urls)
-        self._loading[idx] = True
-        if not hasattr(self, '_workers'):
-            self._workers = {}
-        from PyQt6.QtCore import QThread, pyqtSignal
-        class _Preloader(QThread):
-            loaded = pyqtSignal(int, object)
-            failed = pyqtSignal(int)
-            def __init__(self, i, url):
-                super().__init__()
-                self.i, self.url = i, url
-            def run(self):
-                try:
-                    global _IMG_CACHE, _IMG_CACHE_LOCK, _NET_SEM
-                    if _IMG_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                        with _IMG_CACHE_LOCK:
-                            if self.url in _IMG_CACHE:
-                                self.loaded.emit(self.i, _IMG_CACHE[self.url]); return
-                    import requests
-                    if _NET_SEM:
-                        _NET_SEM.acquire()
-                    try:
-                        r = requests.get(self.url, timeout=10)
-                    finally:
-                        try:
-                            if _NET_SEM:
-                                _NET_SEM.release()
-                        except Exception:
-                            pass
-                    if not r.ok:
-                        self.failed.emit(self.i); return
-                    q = QImage()
-                    if not q.loadFromData(r.content):
-                        self.failed.emit(self.i); return
-                    if _IMG_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                        try:
-                            with _IMG_CACHE_LOCK:
-                                _IMG_CACHE[self.url] = q
-                        except Exception:
-                            pass
-                    self.loaded.emit(self.i, q)
-                except Exception:
-                    self.failed.emit(self.i)
-        w = _Preloader(idx, self.urls[idx])
-        def on_loaded(i, qimg):
-            if i < len(self._images):
-                self._images[i] = qimg
-            if hasattr(self, '_loading') and i < len(self._loading):
-                self._loading[i] = False
-            if hasattr(self, '_workers'):
-                self._workers.pop(i, None)
-        def on_failed(i):
-            if hasattr(self, '_loading') and i < len(self._loading):
-                self._loading[i] = False
-            if hasattr(self, '_workers'):
-                self._workers.pop(i, None)
-        w.loaded.connect(on_loaded)
-        w.failed.connect(on_failed)
-        self._workers[idx] = w
-        w.start()
+        self._request_image(idx)
 
     # Note: fade-in animation removed intentionally for stability and to keep position while scrolling.
 
@@ -1326,21 +1127,13 @@ class XdeltaDialog(QDialog):
         if not original_file or not modified_file or not output_patch: self._show_message(tr("dialogs.error"), tr("ui.select_all_files"), QMessageBox.Icon.Warning); return
         if not os.path.exists(original_file): self._show_message(tr("dialogs.error"), tr("ui.original_file_not_found", path=original_file), QMessageBox.Icon.Warning); return
         if not os.path.exists(modified_file): self._show_message(tr("dialogs.error"), tr("ui.modified_file_not_found", path=modified_file), QMessageBox.Icon.Warning); return
-        temp_dir = None
         try:
-            temp_dir = tempfile.mkdtemp(prefix="xdelta_temp_")
-            temp_original, temp_modified, temp_output = os.path.join(temp_dir, "original_source.bin"), os.path.join(temp_dir, "modified_target.bin"), os.path.join(temp_dir, "output.xdelta")
-            shutil.copy2(original_file, temp_original); shutil.copy2(modified_file, temp_modified)
-            success = pyxdelta.run(infile=temp_original, outfile=temp_modified, patchfile=temp_output)
-            if success: shutil.move(temp_output, output_patch); self._show_message(tr("ui.success"), tr("ui.patch_success", path=output_patch))
+            # Входы читаются на месте, патч пишется рядом с output_patch и фиксируется rename
+            stats = run_xdelta("encode", original_file, modified_file, output_patch)
+            logging.debug(f"xdelta encode: {stats}")
+            if stats["ok"]: self._show_message(tr("ui.success"), tr("ui.patch_success", path=output_patch))
             else: self._show_message(tr("errors.patch_create_error"), tr("errors.patch_create_failed"), QMessageBox.Icon.Critical)
         except Exception as e: self._show_message(tr("errors.patch_create_error"), tr("errors.patch_create_exception", error=str(e)), QMessageBox.Icon.Critical)
-        finally:
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    logging.debug(f"Failed to remove temp dir {temp_dir}: {e}")  # Debug print
     def apply_patch(self):
         try: import pyxdelta
         except ImportError: self._show_message(tr("dialogs.error"), tr("errors.component_unavailable_apply"), QMessageBox.Icon.Critical); return
@@ -1348,20 +1141,13 @@ class XdeltaDialog(QDialog):
         if not original_file or not patch_file or not output_file: self._show_message(tr("dialogs.error"), tr("ui.select_all_files"), QMessageBox.Icon.Warning); return
         if not os.path.exists(original_file): self._show_message(tr("dialogs.error"), tr("ui.original_file_not_found", path=original_file), QMessageBox.Icon.Warning); return
         if not os.path.exists(patch_file): self._show_message(tr("dialogs.error"), tr("ui.patch_file_not_found", path=patch_file), QMessageBox.Icon.Warning); return
-        temp_dir = None
         try:
-            temp_dir = tempfile.mkdtemp(prefix="xdelta_temp_")
-            temp_original, temp_patch, temp_output = os.path.join(temp_dir, "original_source_for_patch.bin"), os.path.join(temp_dir, "input_patch.xdelta"), os.path.join(temp_dir, "patched_output.bin")
-            shutil.copy2(original_file, temp_original); shutil.copy2(patch_file, temp_patch)
-            success = pyxdelta.decode(infile=temp_original, patchfile=temp_patch, outfile=temp_output)
-            if success: shutil.move(temp_output, output_file); self._show_message(tr("ui.success"), tr("ui.patch_apply_success", path=output_file))
+            # Выход пишется рядом с output_file и фиксируется rename — можно патчить и «на месте»
+            stats = run_xdelta("decode", original_file, patch_file, output_file)
+            logging.debug(f"xdelta decode: {stats}")
+            if stats["ok"]: self._show_message(tr("ui.success"), tr("ui.patch_apply_success", path=output_file))
             else: self._show_message(tr("errors.patch_apply_error"), tr("errors.patch_apply_failed", original=os.path.basename(original_file), patch=os.path.basename(patch_file)), QMessageBox.Icon.Critical)
         except Exception as e: self._show_message(tr("errors.patch_apply_error"), tr("errors.patch_apply_exception", error=str(e)), QMessageBox.Icon.Critical)
-        finally:
-            if temp_dir and os.path.exists(temp_dir):
-                try: shutil.rmtree(temp_dir)
-                except Exception as e:
-                    logging.debug(f"Failed to remove temp dir {temp_dir}: {e}")  # Debug print
 
 # ============================================================================
 #                             MOD EDITOR DIALOG
@@ -1509,8 +1295,7 @@ class ModEditorDialog(QDialog):
             def run(self):
                 try:
                     from helpers import CLOUD_FUNCTIONS_BASE_URL
-                    import requests
-                    r = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getGlobalSettings", timeout=6)
+                    r = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getGlobalSettings", timeout=6)
                     if r.status_code == 200:
                         data = r.json() or {}
                         vers = data.get("supported_game_versions", ["1.04"]) or ["1.04"]
@@ -1603,57 +1388,41 @@ class ModEditorDialog(QDialog):
             MAX_MB = 2
             MAX_BYTES = MAX_MB * 1024 * 1024
 
-            from PyQt6.QtCore import QThread, pyqtSignal, QTimer as _QTimer
-
-            class ShotLoader(QThread):
-                loaded = pyqtSignal(int, object)
-                failed = pyqtSignal(int, str)
-                def __init__(self, idx, url):
-                    super().__init__()
-                    self.idx, self.url = idx, url
-                def run(self):
-                    try:
-                        global _IMG_CACHE, _IMG_CACHE_LOCK, _NET_SEM
-                        # Cache
-                        if _IMG_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                            with _IMG_CACHE_LOCK:
-                                if self.url in _IMG_CACHE:
-                                    self.loaded.emit(self.idx, _IMG_CACHE[self.url]); return
-                        import requests
-                        # HEAD for size
-                        try:
-                            if _NET_SEM: _NET_SEM.acquire()
-                            try:
-                                h = requests.head(self.url, allow_redirects=True, timeout=6)
-                            finally:
-                                if _NET_SEM: _NET_SEM.release()
-                            cl = h.headers.get('content-length')
-                            if cl and cl.isdigit() and int(cl) > MAX_BYTES:
-                                self.failed.emit(self.idx, 'too_large'); return
-                        except Exception:
-                            pass
-                        # GET content
-                        if _NET_SEM: _NET_SEM.acquire()
-                        try:
-                            resp = requests.get(self.url, timeout=8)
-                        finally:
-                            if _NET_SEM: _NET_SEM.release()
-                        if not resp.ok:
-                            self.failed.emit(self.idx, 'unavailable'); return
-                        if len(resp.content) > MAX_BYTES:
-                            self.failed.emit(self.idx, 'too_large'); return
-                        qimg = QImage()
-                        if not qimg.loadFromData(resp.content):
-                            self.failed.emit(self.idx, 'not_image'); return
-                        if _IMG_CACHE is not None and _IMG_CACHE_LOCK is not None:
-                            try:
-                                with _IMG_CACHE_LOCK:
-                                    _IMG_CACHE[self.url] = qimg
-                            except Exception:
-                                pass
-                        self.loaded.emit(self.idx, qimg)
-                    except Exception:
-                        self.failed.emit(self.idx, 'error')
+            from PyQt6.QtCore import QTimer as _QTimer
+
+            async def _load_shot(url):
+                # Возвращает QImage или строку-вид ошибки
+                net = NetService.instance()
+                if (cached := _IMG_CACHE.get(url)) is not None:
+                    return cached
+                # Уже проверенный и уменьшенный скриншот лежит на диске — сеть не нужна
+                disk = ImageDiskCache.instance()
+                if (entry := disk.lookup(url)) and not disk.is_stale(entry):
+                    if (qimg := await net.run_blocking(disk.load, url)) is not None:
+                        _IMG_CACHE.put(url, qimg)
+                        return qimg
+                # HEAD for size
+                try:
+                    h = await net.fetch("HEAD", url, allow_redirects=True, timeout=6)
+                    cl = h.headers.get('content-length')
+                    if cl and cl.isdigit() and int(cl) > MAX_BYTES:
+                        return 'too_large'
+                except Exception:
+                    pass
+                try:
+                    resp = await net.fetch("GET", url, timeout=8)
+                except Exception:
+                    return 'error'
+                if not resp.ok:
+                    return 'unavailable'
+                if len(resp.content) > MAX_BYTES:
+                    return 'too_large'
+                try:
+                    qimg = await net.run_blocking(disk.store, url, resp.content, resp.headers, "screenshot")
+                except ValueError:
+                    return 'not_image'
+                _IMG_CACHE.put(url, qimg)
+                return qimg
 
             def _apply_preview(index, qimg):
                 area_w, area_h = 640, 200
@@ -1695,19 +1464,16 @@ class ModEditorDialog(QDialog):
                 editors[index].setProperty('isValidShot', False)
                 if not url or not url.startswith(('http://','https://')):
                     return
-                # cancel previous worker
-                if index in workers:
-                    try:
-                        w = workers.pop(index)
-                        if w.isRunning():
-                            w.requestInterruption(); w.quit(); w.wait(100)
-                    except Exception:
-                        pass
-                w = ShotLoader(index, url)
-                workers[index] = w
-                w.loaded.connect(lambda i, img: _apply_preview(i, img))
-                w.failed.connect(lambda i, k: _apply_error(i, k))
-                w.start()
+                # Результат устаревшего запроса (URL уже изменили) отбрасываем
+                workers[index] = url
+                def _on_done(result, err, index=index, url=url):
+                    if workers.get(index) != url or sip.isdeleted(previews[index]):
+                        return
+                    if isinstance(result, QImage):
+                        _apply_preview(index, result)
+                    else:
+                        _apply_error(index, result if err is None else 'error')
+                NetService.instance().call(_load_shot(url), _on_done)
 
             for i in range(10):
                 le = QLineEdit()
@@ -2067,17 +1833,17 @@ class ModEditorDialog(QDialog):
                 # Для иконок используем GET (нужно проверить, что это изображение), для остальных HEAD
                 r = None
                 if file_type == "icon":
-                    r = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+                    r = http_client.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
                     r.raise_for_status()
                     headers = r.headers
                 else:
                     # Some hosts reject HEAD; fallback to GET if HEAD fails
                     try:
-                        rh = requests.head(url, headers={'User-Agent': 'Mozilla/5.0'}, allow_redirects=True, timeout=10)
+                        rh = http_client.head(url, headers={'User-Agent': 'Mozilla/5.0'}, allow_redirects=True, timeout=10)
                         rh.raise_for_status()
                         headers = rh.headers
                     except Exception:
-                        rg = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, stream=True, timeout=10)
+                        rg = http_client.get(url, headers={'User-Agent': 'Mozilla/5.0'}, stream=True, timeout=10)
                         rg.raise_for_status()
                         headers = rg.headers
 
@@ -2227,7 +1993,9 @@ class ModEditorDialog(QDialog):
 
             signals.update_label.emit(line_edit, title_label, final_text, is_valid)
 
-        threading.Thread(target=check_url, daemon=True).start()
+        # Проверка выполняется в общем сетевом пуле, а не в отдельном потоке
+        net = NetService.instance()
+        net.call(net.run_blocking(check_url))
 
 
     def on_validation_complete(self, line_edit: QLineEdit, label: QLabel, text: str, is_valid: bool):
@@ -2344,21 +2112,12 @@ class ModEditorDialog(QDialog):
         if not url.strip(): self._load_default_icon(); return
         try:
             self.icon_preview.setText(tr("status.loading"))
-            from PyQt6.QtCore import QThread, pyqtSignal
-            class IconLoader(QThread):
-                loaded, failed = pyqtSignal(QPixmap, str), pyqtSignal(str)
-                def __init__(self, url): super().__init__(); self.url = url
-                def run(self):
-                    try:
-                        import requests; response = requests.get(self.url, timeout=10); response.raise_for_status(); pixmap = QPixmap()
-                        if pixmap.loadFromData(response.content): self.loaded.emit(pixmap, self.url)
-                        else: self.failed.emit(self.url)
-                    except Exception: self.failed.emit(self.url)
-            current_url = url
-            self.icon_loader = IconLoader(url)
-            self.icon_loader.loaded.connect(lambda pm, u: self._on_icon_loaded(pm) if u == self.current_icon_url else None)
-            self.icon_loader.failed.connect(lambda u: (self._on_icon_load_failed(u) if u == self.current_icon_url else None))
-            self.icon_loader.start()
+            def _on_done(img, err, u=url):
+                if u != self.current_icon_url or sip.isdeleted(self.icon_preview): return
+                if err is None and img is not None: self._on_icon_loaded(QPixmap.fromImage(img))
+                else: self._on_icon_load_failed(u)
+            net = NetService.instance()
+            net.call(net.fetch_icon(url, 64, timeout=10), _on_done)
         except Exception: self._load_default_icon()
 
     def _on_icon_loaded(self, pixmap):
@@ -2388,8 +2147,8 @@ class ModEditorDialog(QDialog):
     def _load_default_icon(self):
         try:
             logo_path = resource_path("assets/icon.ico")
-            if os.path.exists(logo_path) and not (pixmap := QPixmap(logo_path)).isNull():
-                self.icon_preview.setPixmap(pixmap.scaled(64, 64, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+            if os.path.exists(logo_path) and not (pixmap := default_icon_pixmap(64)).isNull():
+                self.icon_preview.setPixmap(pixmap)
                 self.icon_preview.setProperty('isDefaultIcon', True)
                 return
         except Exception as e:
@@ -2434,11 +2193,10 @@ class ModEditorDialog(QDialog):
         new_state = not current_hidden
 
         try:
-            import requests
             from helpers import CLOUD_FUNCTIONS_BASE_URL
             # Submit a change request to toggle visibility; moderators will apply it
             change = {"hide_mod": new_state}
-            resp = requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/submitModChange", json={"modData": change, "hashedKey": self.mod_key}, timeout=10)
+            resp = http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/submitModChange", json={"modData": change, "hashedKey": self.mod_key}, timeout=10)
             resp.raise_for_status()
             QMessageBox.information(self, tr("dialogs.request_sent_title"), tr("errors.request_sent_message"))
         except Exception as e:
@@ -2485,7 +2243,6 @@ class ModEditorDialog(QDialog):
         """Повторно валидирует поля при нажатии Сохранить/Завершить, не полагаясь на UI-флаги."""
         try:
             import re
-            import requests
             from urllib.parse import unquote
             # 1) Публичные: новая логика валидации иконки
             if self.is_public and hasattr(self, 'icon_edit') and hasattr(self, 'icon_preview'):
@@ -2501,7 +2258,7 @@ class ModEditorDialog(QDialog):
                 if desc_url and not re.match(r'^https?://.+\.(md|txt)(\?.*)?$', desc_url, re.IGNORECASE):
                     # Разрешаем, если по заголовкам это текст
                     try:
-                        h = requests.head(desc_url, headers={'User-Agent': 'Mozilla/5.0'}, allow_redirects=True, timeout=6)
+                        h = http_client.head(desc_url, headers={'User-Agent': 'Mozilla/5.0'}, allow_redirects=True, timeout=6)
                         ct = (h.headers.get('Content-Type') or '').lower()
                         if not (ct.startswith('text/') or 'markdown' in ct):
                             raise ValueError('not text')
@@ -2562,7 +2319,7 @@ class ModEditorDialog(QDialog):
                         first_bytes = b''
                         ok = False
                         try:
-                            h = requests.head(url, headers=headers, allow_redirects=True, timeout=8)
+                            h = http_client.head(url, headers=headers, allow_redirects=True, timeout=8)
                             if h.status_code in (200, 206, 301, 302, 303, 307, 308):
                                 ok = True
                                 ct = h.headers.get('Content-Type') or h.headers.get('content-type') or ''
@@ -2576,7 +2333,7 @@ class ModEditorDialog(QDialog):
                             ok, content_disp = False, ''
                         if not ok:
                             try:
-                                g = requests.get(url, headers=headers, allow_redirects=True, stream=True, timeout=12)
+                                g = http_client.get(url, headers=headers, allow_redirects=True, stream=True, timeout=12)
                                 g.raise_for_status()
                                 ct = g.headers.get('Content-Type') or g.headers.get('content-type') or ''
                                 content_type = ct.lower()
@@ -2690,7 +2447,7 @@ class ModEditorDialog(QDialog):
                             headers = {'User-Agent': 'Mozilla/5.0'}
                             # 1) HEAD с редиректами
                             try:
-                                h = requests.head(url_text, headers=headers, allow_redirects=True, timeout=7)
+                                h = http_client.head(url_text, headers=headers, allow_redirects=True, timeout=7)
                                 if h.status_code in (200, 206):
                                     ok = True
                                 elif h.status_code in (301, 302, 303, 307, 308):
@@ -2700,7 +2457,7 @@ class ModEditorDialog(QDialog):
                             # 2) Если HEAD не дал ОК — пробуем GET (stream) и читаем чуть-чуть
                             if not ok:
                                 try:
-                                    g = requests.get(url_text, headers=headers, allow_redirects=True, stream=True, timeout=10)
+                                    g = http_client.get(url_text, headers=headers, allow_redirects=True, stream=True, timeout=10)
                                     if g.status_code in (200, 206):
                                         # читаем первый chunk чтобы убедиться в доступности
                                         next(g.iter_content(chunk_size=1), None)
@@ -3074,11 +2831,9 @@ class ModEditorDialog(QDialog):
             })
 
             from helpers import DATA_FIREBASE_URL
-            import requests
-
             from helpers import CLOUD_FUNCTIONS_BASE_URL
             functions_url = f"{CLOUD_FUNCTIONS_BASE_URL}/submitNewMod"
-            response = requests.post(functions_url, json={"modData": mod_data, "hashedKey": hashed_key}, timeout=10)
+            response = http_client.post(functions_url, json={"modData": mod_data, "hashedKey": hashed_key}, timeout=10)
             response.raise_for_status()
 
             # Мод успешно отправлен, теперь сохраняем ключ
@@ -3288,8 +3043,6 @@ class ModEditorDialog(QDialog):
 
         try:
             from helpers import DATA_FIREBASE_URL
-            import requests
-
             hashed_key = self.mod_key
             if not hashed_key:
                 QMessageBox.critical(self, tr("errors.error"), tr("errors.mod_key_not_determined"))
@@ -3298,7 +3051,7 @@ class ModEditorDialog(QDialog):
             # Проверяем актуальный статус верификации с сервера
             try:
                 from helpers import CLOUD_FUNCTIONS_BASE_URL
-                chk = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getModData?modId={hashed_key}", timeout=8)
+                chk = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getModData?modId={hashed_key}", timeout=8)
                 if chk.status_code == 200 and isinstance(chk.json(), dict):
                     server_data = chk.json()
                     is_verified = bool(server_data.get("is_verified", self.original_mod_data.get("is_verified", False)))
@@ -3319,7 +3072,7 @@ class ModEditorDialog(QDialog):
             from helpers import CLOUD_FUNCTIONS_BASE_URL
             updated_data["change_type"] = "update"
             updated_data["original_mod_key"] = hashed_key
-            response = requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/submitModChange", json={"modData": updated_data, "hashedKey": hashed_key}, timeout=10)
+            response = http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/submitModChange", json={"modData": updated_data, "hashedKey": hashed_key}, timeout=10)
             response.raise_for_status()
             QMessageBox.information(self, tr("dialogs.request_sent_title"), tr("errors.request_sent_message"))
 
@@ -3477,9 +3230,8 @@ class ModEditorDialog(QDialog):
         if self.mod_key and hashed_key != self.mod_key: QMessageBox.warning(self, tr("dialogs.invalid_key"), tr("dialogs.invalid_key_message")); return
         try:
             from helpers import DATA_FIREBASE_URL
-            import requests
             from helpers import CLOUD_FUNCTIONS_BASE_URL
-            resp = requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/deletePublicMod", json={"hashedKey": hashed_key}, timeout=10)
+            resp = http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/deletePublicMod", json={"hashedKey": hashed_key}, timeout=10)
             resp.raise_for_status()
             QMessageBox.information(self, tr("errors.mod_deleted_title"), tr("errors.mod_deleted_message"))
             self.accept()
@@ -3752,7 +3504,7 @@ class ModEditorDialog(QDialog):
 #                              MAIN APPLICATION
 # ============================================================================
 
-class DeltaHubApp(QWidget):
+class DeltaHubApp(QWidget, GameLaunchMixin):
 
     update_status_signal = pyqtSignal(str, str)
     set_progress_signal = pyqtSignal(int)
@@ -3819,6 +3571,13 @@ class DeltaHubApp(QWidget):
 
         # Автовосстановление после сбоя прошлой сессии (если было вмешательство в файлы игры)
         self._recover_previous_session()
+        # Доводим до конца или откатываем прерванную установку модов
+        self._recover_install_journal()
+        # Досылаем счётчики скачиваний, не отправленные в прошлых сессиях
+        DownloadCounterQueue.instance().flush_async()
+        # Бюджет дискового кэша иконок и скриншотов (МБ)
+        try: ImageDiskCache.instance().budget = int(self.local_config.get("image_cache_mb") or 200) * 1024 ** 2
+        except Exception: pass
 
         # Инициализируем локализацию
         self._init_localization()
@@ -3899,137 +3658,21 @@ class DeltaHubApp(QWidget):
 
     def _init_session(self):
         try:
-            import requests
             from helpers import CLOUD_FUNCTIONS_BASE_URL
-            requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/presenceHeartbeat", json={"sessionId": self.session_id}, timeout=5)
-        except Exception:
-            pass
-
-    # ---------------- Session manifest (crash-safe restore) ----------------
-    def _session_manifest_path(self):
-        return os.path.join(self.config_dir, "session.lock")
-
-    def _load_session_manifest(self) -> dict:
-        try:
-            with open(self._session_manifest_path(), 'r', encoding='utf-8') as f:
-                return json.load(f) or {}
-        except Exception:
-            return {}
-
-    def _write_session_manifest(self, data: dict):
-        try:
-            with open(self._session_manifest_path(), 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False)
+            http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/presenceHeartbeat", json={"sessionId": self.session_id}, timeout=5)
         except Exception:
             pass
 
-    def _ensure_session_manifest(self) -> dict:
-        data = self._load_session_manifest()
-        if not data:
-            data = {"backup_files": {}, "mod_files_to_cleanup": [], "mod_dirs_to_cleanup": [], "backup_temp_dir": None, "direct_launch": None}
-            self._write_session_manifest(data)
-        return data
-
-    def _update_session_manifest(self, backup_files: Optional[dict] = None, mod_files: Optional[list] = None, backup_temp_dir: Optional[str] = None, direct_launch: Optional[dict] = None, mod_dirs: Optional[list] = None):
-        data = self._ensure_session_manifest()
-        if backup_files:
-            data.setdefault("backup_files", {}).update(backup_files)
-        if mod_files:
-            existing = set(data.get("mod_files_to_cleanup", []))
-            for p in mod_files:
-                if p not in existing:
-                    data.setdefault("mod_files_to_cleanup", []).append(p)
-        if mod_dirs:
-            existing_dirs = set(data.get("mod_dirs_to_cleanup", []))
-            for d in mod_dirs:
-                if d not in existing_dirs:
-                    data.setdefault("mod_dirs_to_cleanup", []).append(d)
-        if backup_temp_dir is not None:
-            data["backup_temp_dir"] = backup_temp_dir
-        if direct_launch is not None:
-            data["direct_launch"] = direct_launch
-        self._write_session_manifest(data)
-
-
-
-    def _clear_session_manifest(self):
+    def _recover_install_journal(self):
         try:
-            os.remove(self._session_manifest_path())
-        except Exception:
-            pass
-
-    def _recover_previous_session(self):
-        try:
-            data = self._load_session_manifest()
-            if not data:
-                return
-            # Восстанавливаем внутренние структуры и запускаем очистку
-            self._backup_files = data.get("backup_files", {})
-            self._mod_files_to_cleanup = data.get("mod_files_to_cleanup", [])
-            self._backup_temp_dir = data.get("backup_temp_dir")
-            self._direct_launch_cleanup_info = data.get("direct_launch")
-            self.update_status_signal.emit(tr("status.recovering_previous_session"), UI_COLORS["status_warning"])
-            self._cleanup_direct_launch_files()
-            self._clear_session_manifest()
-        except Exception:
-            # Если что-то пошло не так — не блокируем запуск
-            pass
+            for folder, outcome in InstallJournal().recover():
+                logging.info(f"Install journal recovery: {folder} -> {outcome}")
+        except Exception as e:
+            logging.warning(f"Install journal recovery failed: {e}")
 
     def _shortcut_launch(self, args):
         """Запускает игру через ярлык без показа GUI"""
-        try:
-            settings_json = base64.b64decode(args.shortcut_launch).decode('utf-8')
-            settings = json.loads(settings_json)
-        except Exception as e:
-            print(tr("startup.shortcut_settings_read_error", error=str(e)))
-            sys.exit(1)
-
-        # Загружаем необходимые данные
-        self._load_local_data()
-        self._load_local_mods_from_folders()
-
-        try:
-            # Восстанавливаем настройки из ярлыка
-            if settings.get("is_undertale_mode", False):
-                self.game_mode = UndertaleGameMode()
-            else:
-                self.game_mode = DemoGameMode() if settings.get("is_demo_mode", False) else FullGameMode()
-            self.game_path = settings.get("game_path", "")
-            self.demo_game_path = settings.get("demo_game_path", "")
-
-            # Настройки запуска
-            launch_via_steam = settings.get('launch_via_steam', False)
-            use_custom_executable = settings.get('use_custom_executable', False)
-            custom_exec_path = settings.get("custom_executable_path", "")
-            demo_custom_exec_path = settings.get("demo_custom_executable_path", "")
-            direct_launch_slot_id = settings.get('direct_launch_slot_id', -1)
-
-            # Проверяем наличие файлов игры
-            current_game_path = self._get_current_game_path()
-            if not current_game_path or not os.path.exists(current_game_path):
-                print(tr("errors.game_files_launch_not_found"))
-                sys.exit(1)
-
-            # Проверяем и применяем моды
-            mods_settings = settings.get('mods', {})
-            if not mods_settings:
-                # Поддержка старого формата для совместимости
-                mods_settings = settings.get('selections', {})
-
-            self._apply_shortcut_mods(mods_settings)
-
-            # Запускаем игру с настройками
-            self._launch_game_from_shortcut(
-                launch_via_steam=launch_via_steam,
-                use_custom_executable=use_custom_executable,
-                custom_exec_path=custom_exec_path,
-                demo_custom_exec_path=demo_custom_exec_path,
-                direct_launch_slot_id=direct_launch_slot_id
-            )
-
-        except Exception as e:
-            print(tr("startup.launch_error", error=str(e)))
-            sys.exit(1)
+        sys.exit(ShortcutLaunch(args.shortcut_launch).run())
 
     def _create_shortcut_flow(self):
         """Создает ярлык с текущими настройками лаунчера"""
@@ -4362,9 +4005,6 @@ class DeltaHubApp(QWidget):
         detailed_message = tr("dialogs.access_denied_detailed", path=path)
         QMessageBox.critical(self, tr("errors.access_denied"), detailed_message)
 
-    def _get_current_game_path(self) -> str:
-        return self.game_mode.get_game_path(self.local_config) or ""
-
     def _current_tab_names(self):
         return self.game_mode.tab_names
 
@@ -4560,6 +4200,19 @@ class DeltaHubApp(QWidget):
         self.launch_via_steam_checkbox.stateChanged.connect(self._on_toggle_steam_launch)
         settings_center_container.addWidget(self.launch_via_steam_checkbox, alignment=Qt.AlignmentFlag.AlignHCenter)
 
+        # Чекбокс "Не откатывать моды между запусками"
+        self.keep_mods_applied_checkbox = QCheckBox(tr("ui.keep_mods_applied"))
+        self.keep_mods_applied_checkbox.setToolTip("<html><body style='white-space: normal;'>" + tr("tooltips.keep_mods_applied") + "</body></html>")
+        self.keep_mods_applied_checkbox.stateChanged.connect(self._on_toggle_keep_mods_applied)
+        settings_center_container.addWidget(self.keep_mods_applied_checkbox, alignment=Qt.AlignmentFlag.AlignHCenter)
+
+        # Чекбокс "Изолированный запуск" (только Linux: моды в оверлее из симлинков, папка игры не меняется)
+        self.isolated_launch_checkbox = QCheckBox(tr("ui.isolated_launch"))
+        self.isolated_launch_checkbox.setToolTip("<html><body style='white-space: normal;'>" + tr("tooltips.isolated_launch") + "</body></html>")
+        self.isolated_launch_checkbox.stateChanged.connect(self._on_toggle_isolated_launch)
+        self.isolated_launch_checkbox.setVisible(platform.system() == "Linux")
+        settings_center_container.addWidget(self.isolated_launch_checkbox, alignment=Qt.AlignmentFlag.AlignHCenter)
+
         # Чекбокс "Отдельный файл запуска"
         self.use_custom_executable_checkbox = QCheckBox(tr("ui.custom_executable"))
         self.use_custom_executable_checkbox.setToolTip("<html><body style='white-space: normal;'>" + tr("tooltips.custom_exe") + "</body></html>")
@@ -4586,6 +4239,12 @@ class DeltaHubApp(QWidget):
         self.change_path_button.clicked.connect(self._prompt_for_game_path)
         settings_center_container.addWidget(self.change_path_button, alignment=Qt.AlignmentFlag.AlignHCenter)
 
+        # Кнопка возврата оригинальных файлов игры (для модов, оставленных между запусками)
+        self.restore_vanilla_button = QPushButton(tr("ui.restore_vanilla"))
+        self.restore_vanilla_button.setFixedWidth(400)
+        self.restore_vanilla_button.clicked.connect(self._restore_vanilla_files)
+        settings_center_container.addWidget(self.restore_vanilla_button, alignment=Qt.AlignmentFlag.AlignHCenter)
+
         # Кнопка смены расположения папки модов
         self.change_mods_dir_button = QPushButton(tr("ui.change_mods_dir"))
         self.change_mods_dir_button.setFixedWidth(400)
@@ -4619,6 +4278,9 @@ class DeltaHubApp(QWidget):
         self.disable_splash_checkbox = QCheckBox(tr("checkboxes.disable_splash"))
         self.disable_splash_checkbox.stateChanged.connect(self._on_toggle_disable_splash)
 
+        self.prefetch_updates_checkbox = QCheckBox(tr("checkboxes.prefetch_updates"))
+        self.prefetch_updates_checkbox.stateChanged.connect(self._on_toggle_prefetch_updates)
+
         self.change_background_button = QPushButton(tr("buttons.change_background"))
         self.change_background_button.clicked.connect(self._on_background_button_click)
 
@@ -4665,6 +4327,7 @@ class DeltaHubApp(QWidget):
         checkboxes_layout.setSpacing(20)
         checkboxes_layout.addWidget(self.disable_background_checkbox)
         checkboxes_layout.addWidget(self.disable_splash_checkbox)
+        checkboxes_layout.addWidget(self.prefetch_updates_checkbox)
         settings_customization_layout.addLayout(checkboxes_layout)
         settings_customization_layout.addSpacing(8)
 
@@ -6746,12 +6409,10 @@ class DeltaHubApp(QWidget):
     def _load_description_from_url(self, text_widget, description_url):
         """Загружает описание мода из URL и отображает его с поддержкой markdown"""
         try:
-            import requests
-
             # Показываем загрузку
             text_widget.setPlainText(tr("status.loading_description"))
 
-            response = requests.get(description_url, timeout=10)
+            response = http_client.get(description_url, timeout=10)
             if response.ok:
                 content = response.text
 
@@ -7251,7 +6912,8 @@ class DeltaHubApp(QWidget):
             # Создаем задачи для всех доступных глав
             install_tasks = [(mod, chapter_id) for chapter_id in available_chapters]
 
-            # Устанавливаем состояние установки
+            # Устанавливаем состояние установки; фоновая предзагрузка уступает сеть установке
+            self._stop_update_prefetch()
             self.is_installing = True
             self._set_install_buttons_enabled(False)
             self.action_button.setText(tr("ui.cancel_button"))
@@ -8499,6 +8161,39 @@ class DeltaHubApp(QWidget):
         self.local_config["disable_splash"] = is_disabled
         self._write_local_config()
 
+    def _on_toggle_keep_mods_applied(self, state):
+        self.local_config["keep_mods_applied"] = bool(state)
+        self._write_local_config()
+        # Выключили — возвращаем игру к оригиналу сразу, как это делал бы обычный запуск после выхода
+        if not state and not is_game_running():
+            self._restore_vanilla_files()
+
+    def _on_toggle_isolated_launch(self, state):
+        self.local_config["isolated_launch"] = bool(state)
+        self._write_local_config()
+
+    def _update_restore_vanilla_button(self):
+        try: self.restore_vanilla_button.setEnabled(bool(AppliedStateStore.instance().entries))
+        except Exception: pass
+
+    def _restore_vanilla_files(self):
+        if is_game_running():
+            self.update_status_signal.emit(tr("status.deltarune_already_running"), UI_COLORS["status_error"]); return
+        store = AppliedStateStore.instance()
+        if store.entries:
+            for target_dir in list(store.entries):
+                self._restore_applied_chapter(target_dir)
+            self.update_status_signal.emit(tr("status.files_restored"), UI_COLORS["status_success"])
+        self._update_restore_vanilla_button()
+
+    def _on_toggle_prefetch_updates(self, state):
+        self.local_config["prefetch_updates"] = bool(state)
+        self._write_local_config()
+        if state:
+            self._schedule_update_prefetch()
+        else:
+            self._stop_update_prefetch()
+
     def _is_valid_hex_color(self, s: str) -> bool:
         return bool(re.fullmatch(r"#[0-9a-fA-F]{6}", s or ""))
 
@@ -8933,7 +8628,7 @@ class DeltaHubApp(QWidget):
         # Сначала загружаем глобальные настройки, они могут понадобиться для UI
         try:
             from helpers import CLOUD_FUNCTIONS_BASE_URL
-            response = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getGlobalSettings", timeout=5)
+            response = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getGlobalSettings", timeout=5)
             if response.status_code == 200:
                 self.global_settings = response.json() or {}
         except requests.RequestException:
@@ -8989,6 +8684,9 @@ class DeltaHubApp(QWidget):
 
         self.disable_background_checkbox.setChecked(self.local_config.get("background_disabled", False))
         self.disable_splash_checkbox.setChecked(self.local_config.get("disable_splash", False))
+        self.prefetch_updates_checkbox.blockSignals(True)
+        self.prefetch_updates_checkbox.setChecked(self.local_config.get("prefetch_updates", False))
+        self.prefetch_updates_checkbox.blockSignals(False)
 
         # Режимы уже применены при создании вкладок, не нужно их вызывать снова
 
@@ -8997,6 +8695,13 @@ class DeltaHubApp(QWidget):
         self._migrate_config_if_needed()
         self.use_custom_executable_checkbox.setChecked(self.local_config.get("use_custom_executable", False))
         self.launch_via_steam_checkbox.setChecked(self.local_config.get("launch_via_steam", False))
+        self.keep_mods_applied_checkbox.blockSignals(True)
+        self.keep_mods_applied_checkbox.setChecked(self.local_config.get("keep_mods_applied", False))
+        self.keep_mods_applied_checkbox.blockSignals(False)
+        self.isolated_launch_checkbox.blockSignals(True)
+        self.isolated_launch_checkbox.setChecked(self.local_config.get("isolated_launch", False))
+        self.isolated_launch_checkbox.blockSignals(False)
+        self._update_restore_vanilla_button()
 
         # Инициализируем взаимные блокировки между Steam и прямым запуском
         self._initialize_mutual_exclusions()
@@ -9216,17 +8921,16 @@ class DeltaHubApp(QWidget):
                 archive_path = os.path.join(tmp_dir, "update" + os.path.splitext(update_info['url'].split('?')[0])[1])
                 self.update_status_signal.emit(tr("status.downloading_version", version=update_info['version']), UI_COLORS["status_warning"])
 
-                response = requests.get(update_info['url'], stream=True, timeout=60)
+                response = http_client.get(update_info['url'], stream=True, timeout=60)
                 response.raise_for_status()
                 total_size = int(response.headers.get('content-length', 0))
 
+                progress = TransferProgress(self.set_progress_signal, total_size)
                 with open(archive_path, "wb") as f:
-                    downloaded_size = 0
-                    for data in response.iter_content(chunk_size=8192):
+                    for data in response.iter_content(chunk_size=262144):
                         f.write(data)
-                        downloaded_size += len(data)
-                        if total_size > 0:
-                            self.set_progress_signal.emit(int((downloaded_size / total_size) * 100))
+                        progress.add(len(data))
+                progress.flush()
 
                 self.update_status_signal.emit(tr("status.unpacking_and_installing"), UI_COLORS["status_warning"])
                 system = platform.system()
@@ -9378,6 +9082,38 @@ class DeltaHubApp(QWidget):
             thr.requestInterruption(); thr.quit()
             if not thr.wait(timeout): thr.terminate(); thr.wait()
 
+    def _schedule_update_prefetch(self, delay_ms: int = 15_000):
+        # Предзагрузка обновлений только по согласию пользователя и когда лаунчер простаивает
+        if self.local_config.get("prefetch_updates", False):
+            QTimer.singleShot(delay_ms, self._start_update_prefetch)
+
+    def _start_update_prefetch(self):
+        if not self.local_config.get("prefetch_updates", False) or self.is_installing or is_game_running():
+            return
+        thr = getattr(self, "prefetch_thread", None)
+        if isinstance(thr, QThread) and thr.isRunning():
+            return
+        tasks = []
+        for mod in self.all_mods or []:
+            if mod.key.startswith("local_") or not self._is_mod_installed(mod.key):
+                continue
+            if mod.modtype == 'deltarunedemo':
+                chapter_ids = [-1]
+            elif mod.modtype == 'undertale':
+                chapter_ids = [0]
+            else:
+                chapter_ids = range(0, 5)
+            tasks += [(mod, ch) for ch in chapter_ids if self._get_mod_status_for_chapter(mod, ch) == "update"]
+        if not tasks:
+            return
+        self.prefetch_thread = UpdatePrefetchThread(self, tasks)
+        self.prefetch_thread.start(QThread.Priority.LowestPriority)
+
+    def _stop_update_prefetch(self):
+        thr = getattr(self, "prefetch_thread", None)
+        if isinstance(thr, UpdatePrefetchThread) and thr.isRunning():
+            thr.cancel()
+
     def _stop_presence_thread(self):
         self._safe_stop_thread(getattr(self, "presence_thread", None))
         self.presence_thread = None
@@ -9413,6 +9149,7 @@ class DeltaHubApp(QWidget):
 
             if success:
                 self.update_status_signal.emit(tr("status.mod_list_updated"), UI_COLORS["status_success"])
+                self._schedule_update_prefetch()
             else:
                 fallback_msg = tr("ui.network_fallback_message") if self.all_mods else tr("ui.network_update_failed")
                 self.update_status_signal.emit(fallback_msg, UI_COLORS["status_error"])
@@ -9443,7 +9180,7 @@ class DeltaHubApp(QWidget):
         self._refresh_all_slot_status_displays()
 
     def _has_internet_connection(self) -> bool:
-        try: requests.head("https://clients3.google.com/generate_204", timeout=3); return True
+        try: http_client.head("https://clients3.google.com/generate_204", timeout=3, retries=False); return True
         except requests.RequestException: return False
 
         self._update_action_button_state()
@@ -9614,642 +9351,12 @@ class DeltaHubApp(QWidget):
 
         return list(set(available_chapters))  # Убираем дубликаты
 
-    def _prepare_game_files(self, selections: Dict[int, str]) -> bool:
-        """Копирует файлы модов (публичных или локальных) в игровые директории."""
-        try:
-            applied_chapters = set()
-
-            for ui_index, mod_key in selections.items():
-                if mod_key == "no_change":
-                    continue
-
-                chapter_id = self.game_mode.get_chapter_id(ui_index)
-
-                # Ищем мод в общем списке
-                mod = next((m for m in self.all_mods if m.key == mod_key), None)
-                if not mod:
-                    continue
-
-                # Определяем, локальный ли это мод
-                is_local = mod_key.startswith("local_")
-
-                # Определяем источник файлов
-                mod_config = self._get_mod_config_by_key(mod.key)
-                folder_name = sanitize_filename(mod.name)
-                source_dir = os.path.join(self.mods_dir, folder_name)
-
-                if not os.path.isdir(source_dir):
-                    self.update_status_signal.emit(tr("errors.mod_folder_not_found", mod_name=mod.name, path=source_dir), UI_COLORS["status_warning"])
-                    continue
-
-                mod_type_str = tr("ui.mod_type_local") if is_local else tr("ui.mod_type_public")
-                self.update_status_signal.emit(tr("status.applying_mod", mod_name=mod.name, mod_type=mod_type_str), UI_COLORS["status_warning"]) 
-                print(f"[XDELTA-DEBUG] UI index={ui_index}, chapter_id={chapter_id}, mod_key={mod_key}, mod_name={mod.name}")
-                print(f"[XDELTA-DEBUG] source_dir={source_dir}")
-
-
-                # --- ИСПРАВЛЕНИЕ: Унифицированная логика для ВСЕХ модов ---
-                # Теперь и xdelta, и обычные моды обрабатываются одинаково,
-                # применяясь только к той главе, для которой они были выбраны в интерфейсе.
-
-                if chapter_id in applied_chapters:
-    
-                    continue
-
-                # Проверяем, является ли это xdelta модом (нужно для след. шага)
-                is_xdelta_mod = self._is_xdelta_mod(mod, source_dir, chapter_id)
-                print(f"[XDELTA-DEBUG] is_xdelta_mod={is_xdelta_mod}")
-
-                # Пропускаем главы без файлов (для обычных модов)
-                # Для xdelta модов эта проверка не нужна, т.к. наличие патча проверяется позже
-                if not is_xdelta_mod and not mod.get_chapter_data(chapter_id) and not is_local:
-
-                    continue
-                
-                target_dir = self._get_target_dir(chapter_id)
-                if not target_dir:
-                    print(f"[XDELTA-DEBUG] target_dir not found for chapter_id={chapter_id}")
-                    continue
-
-                print(f"[XDELTA-DEBUG] target_dir={target_dir}")
-                if not ensure_writable(target_dir):
-                    raise PermissionError(tr("errors.no_write_permission_for", path=target_dir))
-
-                # Вызываем _create_backup_and_copy_mod_files для ОДНОЙ конкретной главы
-                if not self._create_backup_and_copy_mod_files(source_dir, target_dir, chapter_id, mod):
-                    return False
-                
-                applied_chapters.add(chapter_id)
-                # --- КОНЕЦ ИСПРАВЛЕНИЯ ---
-
-            return True
-        except PermissionError as e:
-            path = e.filename or (e.args[0] if e.args else tr("errors.unknown_path"))
-            if not self.is_shortcut_launch: self._handle_permission_error(path)
-            return False
-        except Exception as e:
-            self.error_signal.emit(tr("errors.file_prep_error", error=str(e)))
-            return False
-
-    def _is_xdelta_mod(self, mod_info, source_dir: str, chapter_id: Optional[int] = None) -> bool:
-        """Определяет, является ли мод xdelta-модом (для локальных и публичных модов)."""
-        # Для публичных модов проверяем флаг is_piracy_protected
-        if mod_info and getattr(mod_info, 'is_xdelta', getattr(mod_info, 'is_piracy_protected', False)):
-            return True
-
-        # Для локальных модов ищем .xdelta файлы в папке конкретной главы
-        # ВАЖНО: не используем корневую папку как fallback для глав > 0, иначе патч меню попадет в главы
-        if chapter_id is not None:
-            search_dir = None
-            if chapter_id == -1:  # Демо
-                demo_dir = os.path.join(source_dir, "demo")
-                if os.path.isdir(demo_dir):
-                    search_dir = demo_dir
-                else:
-                    # Для демо допускаем патч из корня мода
-                    search_dir = source_dir
-            elif chapter_id == 0:  # Меню
-                chapter0_dir = os.path.join(source_dir, "chapter_0")
-                menu_dir_alt = os.path.join(source_dir, "menu")
-                if os.path.isdir(chapter0_dir):
-                    search_dir = chapter0_dir
-                elif os.path.isdir(menu_dir_alt):
-                    search_dir = menu_dir_alt
-                else:
-                    # Для меню разрешаем искать патч в корне мода
-                    search_dir = source_dir
-            else:  # Главы 1-4
-                chapter_dir = os.path.join(source_dir, f"chapter_{chapter_id}")
-                if os.path.isdir(chapter_dir):
-                    search_dir = chapter_dir
-            # Если специальной папки нет (и это не меню) — считаем, что для этой главы xdelta нет
-            if not search_dir:
-                return False
-        else:
-            search_dir = source_dir
-
-        # Ищем .xdelta файлы в выбранной папке
-        print(f"[XDELTA-DEBUG] _is_xdelta_mod: chapter_id={chapter_id}, search_dir={search_dir}")
-        if os.path.exists(search_dir):
-            for root, _, files in os.walk(search_dir):
-                for file in files:
-                    if file.lower().endswith('.xdelta'):
-                        return True  # Наличие .xdelta файла означает xdelta мод только для этой главы
-
-        return False
-
-    def _create_backup_and_copy_mod_files(self, source_dir: str, target_dir: str, chapter_id: Optional[int] = None, mod_info=None):
-        """Создает резервную копию оригинальных файлов и копирует файлы мода с поддержкой xdelta патчинга."""
-
-        if not os.path.isdir(source_dir):
-            self.update_status_signal.emit(tr("errors.mod_folder_not_found_simple", path=source_dir), UI_COLORS["status_error"])
-            return False
-
-        # Инициализируем список файлов для очистки, если его еще нет
-        if not hasattr(self, '_mod_files_to_cleanup'):
-            self._mod_files_to_cleanup = []
-        if not hasattr(self, '_backup_files'):
-            self._backup_files = {}
-        # Готовим манифест сессии
-        self._ensure_session_manifest()
-
-        # Определяем, является ли мод xdelta-модом
-        is_xdelta_mod = self._is_xdelta_mod(mod_info, source_dir, chapter_id)
-
-        # В рамках одной главы применяем не более ОДНОГО xdelta патча
-        applied_xdelta_for_this_chapter = False
-
-        files_copied = 0
-
-        # Определяем, откуда брать файлы для данной главы
-        if chapter_id is not None:
-            # Определяем точную папку для главы
-            chapter_folder_name = { -1: "demo", 0: "chapter_0" }.get(chapter_id, f"chapter_{chapter_id}")
-            mod_source_dir = os.path.join(source_dir, chapter_folder_name)
-
-            if not os.path.isdir(mod_source_dir):
-                if chapter_id == 0:
-                    # Совместимость со старыми установками, где использовалась папка 'menu'
-                    alt_menu_dir = os.path.join(source_dir, "menu")
-                    if os.path.isdir(alt_menu_dir):
-                        mod_source_dir = alt_menu_dir
-                    else:
-                        mod_source_dir = source_dir  # разрешаем корень как fallback для меню
-                elif chapter_id == -1:
-                    mod_source_dir = source_dir
-                else:
-                    # ВАЖНО: не используем корень как fallback для глав > 0, чтобы не тянуть корневой патч в главы
-                    mod_source_dir = None
-        else:
-            mod_source_dir = source_dir
-
-        if not mod_source_dir or not os.path.isdir(mod_source_dir):
-            self.update_status_signal.emit(tr("status.no_files_to_copy"), UI_COLORS["status_warning"])
-            return True
-
-        # Создаем временную папку для резервных копий
-        if not hasattr(self, '_backup_temp_dir') or not self._backup_temp_dir:
-            self._backup_temp_dir = tempfile.mkdtemp(prefix="deltahub_backup_")
-            self._update_session_manifest(backup_temp_dir=self._backup_temp_dir)
-
-        print(f"[XDELTA-DEBUG] _create_backup_and_copy_mod_files: chapter_id={chapter_id}, mod_source_dir={mod_source_dir}, target_dir={target_dir}, is_xdelta_mod={is_xdelta_mod}")
-        for root, _, files in os.walk(mod_source_dir):
-            for file in files:
-                # Пропускаем служебные файлы и иконки
-                if file.lower() == 'config.json' or file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico')):
-                    continue
-
-                cache_file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(cache_file_path, mod_source_dir)
-                file_lower = file.lower()
-
-                # Переименование файлов в зависимости от платформы
-                target_rel_path = rel_path
-
-                # Определяем, является ли это ядровым DATA файлом (включая .xdelta файлы)
-                is_core_data_file = (
-                    file_lower in ('data.win', 'data.ios', 'game.ios') or
-                    file_lower.endswith('.win') and 'data' in file_lower or
-                    file_lower.endswith('.ios') and 'game' in file_lower or
-                    (is_xdelta_mod and file_lower.endswith('.xdelta'))  # Для xdelta модов любой .xdelta файл - это core data
-                )
-
-
-
-                if platform.system() == "Darwin":
-                    # На macOS
-                    if is_core_data_file:
-                        # Ядровые файлы переименовываем полностью в game.ios
-                        target_rel_path = os.path.join(os.path.dirname(rel_path), "game.ios")
-                    elif file_lower.endswith('.win'):
-                        # Для остальных файлов только меняем расширение .win → .ios
-                        name_without_ext = os.path.splitext(file)[0]
-                        target_rel_path = os.path.join(os.path.dirname(rel_path), name_without_ext + ".ios")
-                else:
-                    # На других платформах
-                    if is_core_data_file:
-                        # Ядровые файлы переименовываем полностью в data.win
-                        target_rel_path = os.path.join(os.path.dirname(rel_path), "data.win")
-                    elif file_lower.endswith('.ios'):
-                        # Для остальных файлов только меняем расширение .ios → .win
-                        name_without_ext = os.path.splitext(file)[0]
-                        target_rel_path = os.path.join(os.path.dirname(rel_path), name_without_ext + ".win")
-
-                game_file_path = os.path.join(target_dir, target_rel_path)
-
-                try:
-                    target_dirname = os.path.dirname(game_file_path)
-                    os.makedirs(target_dirname, exist_ok=True)
-                    try:
-                        # Запоминаем созданные папки для последующей очистки (если останутся пустыми)
-                        if not hasattr(self, '_mod_dirs_to_cleanup'):
-                            self._mod_dirs_to_cleanup = []
-                        if target_dirname not in self._mod_dirs_to_cleanup:
-                            self._mod_dirs_to_cleanup.append(target_dirname)
-                            self._update_session_manifest(mod_dirs=[target_dirname])
-                    except Exception:
-                        pass
-
-                    # Для xdelta модов обрабатываем .xdelta файлы отдельно
-                    if is_xdelta_mod and file_lower.endswith('.xdelta') and is_core_data_file:
-                        # Применяем только один патч на главу и только к целевому data файлу
-                        if applied_xdelta_for_this_chapter:
-                            continue
-
-                        print(f"[XDELTA-DEBUG] Chapter {chapter_id}: applying xdelta '{cache_file_path}' -> original in '{target_dir}' (computed game_file_path={game_file_path})")
-                        if not self._apply_xdelta_patch(cache_file_path, game_file_path, target_dir):
-                            self.update_status_signal.emit(tr("errors.xdelta_apply_error", file=file), UI_COLORS["status_error"])
-                            return False
-                        files_copied += 1
-                        applied_xdelta_for_this_chapter = True
-                        continue
-
-                    # Пропускаем .xdelta файлы для обычных модов
-                    if file_lower.endswith('.xdelta'):
-                        continue
-
-                    # Резервное копирование оригинального файла, если он существует
-                    if os.path.exists(game_file_path) and game_file_path not in self._backup_files:
-                        # --- ИСПРАВЛЕНИЕ: Создаем уникальное имя для бэкапа, чтобы избежать коллизий ---
-                        unique_hash = hashlib.md5(game_file_path.encode('utf-8')).hexdigest()
-                        backup_filename = f"{unique_hash}_{os.path.basename(game_file_path)}"
-                        backup_file_path = os.path.join(self._backup_temp_dir, backup_filename)
-                        # --- КОНЕЦ ИСПРАВЛЕНИЯ ---
-                        os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
-
-                        # Перемещаем оригинал в резервную папку
-                        shutil.move(game_file_path, backup_file_path)
-                        self._backup_files[game_file_path] = backup_file_path
-                        self._update_session_manifest(backup_files={game_file_path: backup_file_path})
-
-                    # Проверяем, является ли файл архивом
-                    if file_lower.endswith(('.zip', '.rar', '.7z')) and not is_core_data_file:
-                        # Для архивов - распаковываем содержимое и добавляем все извлеченные файлы в список очистки
-                        extracted_files = self._extract_archive_to_target(cache_file_path, target_dir)
-                        if extracted_files:
-                            self._mod_files_to_cleanup.extend(extracted_files)
-                            self._update_session_manifest(mod_files=extracted_files)
-                        files_copied += 1
-                    else:
-                        # Для обычных файлов - копируем
-                        shutil.copy2(cache_file_path, game_file_path)
-                        files_copied += 1
-                        # Добавляем файл в список для последующей очистки
-                        self._mod_files_to_cleanup.append(game_file_path)
-                        self._update_session_manifest(mod_files=[game_file_path])
-
-                except Exception as e:
-                    self.update_status_signal.emit(tr("errors.file_copy_error", file=file, error=str(e)), UI_COLORS["status_error"])
-
-        if files_copied > 0:
-            self.update_status_signal.emit(tr("status.files_copied_count", count=files_copied), UI_COLORS["status_info"])
-        else:
-            self.update_status_signal.emit(tr("status.no_files_to_copy"), UI_COLORS["status_warning"])
-
-        return True
-
-    def _apply_xdelta_patch(self, xdelta_file_path: str, target_game_file_path: str, target_dir: str) -> bool:
-        """Применяет xdelta патч к оригинальному data файлу с поддержкой альтернативных форматов."""
-
-        try:
-            import pyxdelta
-        except ImportError:
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, tr("errors.xdelta_error"), tr("errors.xdelta_unavailable"))
-            return False
-
-        # Определяем возможные имена data файлов
-        data_win = os.path.join(target_dir, "data.win")
-        game_ios = os.path.join(target_dir, "game.ios")
-
-        # Определяем приоритетный файл на основе ОС
-        if platform.system() == "Darwin":
-            primary_file = game_ios
-            secondary_file = data_win
+    def _show_critical(self, title: str, text: str):
+        # Главы применяются в пуле потоков — окно можно показать только из GUI-потока
+        if threading.current_thread() is threading.main_thread():
+            QMessageBox.critical(self, title, text)
         else:
-            primary_file = data_win
-            secondary_file = game_ios
-
-        # Ищем существующий data файл
-        print(f"[XDELTA-DEBUG] _apply_xdelta_patch: xdelta_file={xdelta_file_path}, target_dir={target_dir}")
-        original_data_file = None
-        if os.path.exists(primary_file):
-            original_data_file = primary_file
-        elif os.path.exists(secondary_file):
-            original_data_file = secondary_file
-
-        print(f"[XDELTA-DEBUG] original_data_file={original_data_file}")
-        if not original_data_file:
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, tr("errors.xdelta_error"), tr("errors.original_data_file_not_found", target_dir=target_dir))
-            return False
-
-        temp_dir = None
-        try:
-            # Создаем временную директорию для патчинга
-            temp_dir = tempfile.mkdtemp(prefix="xdelta_patch_")
-            temp_original = os.path.join(temp_dir, "original_data.bin")
-            temp_patch = os.path.join(temp_dir, "patch.xdelta")
-            temp_output = os.path.join(temp_dir, "patched_data.bin")
-
-            # Копируем оригинальный файл и патч во временную папку
-            shutil.copy2(original_data_file, temp_original)
-            shutil.copy2(xdelta_file_path, temp_patch)
-
-            # Используем общую временную папку для резервных копий
-            if not hasattr(self, '_backup_temp_dir') or not self._backup_temp_dir:
-                self._backup_temp_dir = tempfile.mkdtemp(prefix="deltahub_backup_")
-                self._update_session_manifest(backup_temp_dir=self._backup_temp_dir)
-
-            unique_hash = hashlib.md5(original_data_file.encode('utf-8')).hexdigest()
-            backup_filename = f"xdelta_{unique_hash}_{os.path.basename(original_data_file)}"
-            backup_file_path = os.path.join(self._backup_temp_dir, backup_filename)
-
-            # FIX: Only back up the file if it hasn't been backed up already in this session
-            if not hasattr(self, '_backup_files'):
-                self._backup_files = {}
-            
-            if original_data_file not in self._backup_files:
-                shutil.move(original_data_file, backup_file_path)
-                self._backup_files[original_data_file] = backup_file_path
-                self._update_session_manifest(backup_files={original_data_file: backup_file_path})
-
-            def try_patch_with_format(original_file, output_file, format_name):
-                """Попытка применить патч с определенным форматом файла."""
-                try:
-                    success = pyxdelta.decode(infile=original_file, patchfile=temp_patch, outfile=output_file)
-                    return success and os.path.exists(output_file)
-                except Exception as e:
-                    return False
-
-            # Пытаемся применить патч с оригинальным форматом
-            print(f"[XDELTA-DEBUG] Attempt 1: decode with format={os.path.basename(original_data_file)}")
-            if try_patch_with_format(temp_original, temp_output, os.path.basename(original_data_file)):
-                # Успешно - копируем результат
-                shutil.copy2(temp_output, original_data_file)
-                self._mod_files_to_cleanup.append(original_data_file)
-                self.update_status_signal.emit(tr("status.xdelta_patch_applied", patch_name=os.path.basename(xdelta_file_path)), UI_COLORS["status_success"])
-                return True
-
-            # Если первая попытка не удалась, пробуем с альтернативным форматом
-            # Переименовываем файл для альтернативной попытки
-            if original_data_file.endswith('data.win'):
-                temp_alt_original = os.path.join(temp_dir, "original_data_alt.ios")
-                alt_format_name = "game.ios"
-                final_extension = ".win"
-            else:  # game.ios
-                temp_alt_original = os.path.join(temp_dir, "original_data_alt.win")
-                alt_format_name = "data.win"
-                final_extension = ".ios"
-
-            # Копируем файл с новым именем
-            shutil.copy2(temp_original, temp_alt_original)
-            temp_alt_output = os.path.join(temp_dir, "patched_data_alt.bin")
-
-            print(f"[XDELTA-DEBUG] Attempt 2: decode with alt_format={alt_format_name}")
-            if try_patch_with_format(temp_alt_original, temp_alt_output, alt_format_name):
-                # Успешно - копируем результат с правильным расширением
-                shutil.copy2(temp_alt_output, original_data_file)
-                self._mod_files_to_cleanup.append(original_data_file)
-                self.update_status_signal.emit(tr("status.xdelta_patch_applied_alt", patch_name=os.path.basename(xdelta_file_path)), UI_COLORS["status_success"])
-                return True
-
-            # Обе попытки не удались
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, tr("errors.xdelta_patch_failed"),
-            tr("errors.patch_incompatible", patch_name=os.path.basename(xdelta_file_path)))
-
-            # Восстанавливаем оригинальный файл в случае ошибки
-            if backup_file_path in self._backup_files.values():
-                shutil.move(backup_file_path, original_data_file)
-                del self._backup_files[original_data_file]
-            return False
-
-        except Exception as e:
-            from PyQt6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, tr("errors.xdelta_critical_error"), tr("errors.xdelta_patch_critical_error", error=str(e)))
-            return False
-        finally:
-            # Очищаем временную директорию
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(tr("errors.temp_dir_delete_failed", temp_dir=temp_dir, error=e))  
-
-    def _extract_archive_to_target(self, archive_path: str, target_dir: str):
-        """Извлекает архив в целевую директорию и возвращает список извлеченных файлов."""
-        import tempfile, zipfile, rarfile
-
-        file_lower = archive_path.lower()
-        extracted_files = []
-
-        try:
-            with tempfile.TemporaryDirectory(prefix="deltahub-extract-") as temp_dir:
-                if file_lower.endswith('.zip'):
-                    with zipfile.ZipFile(archive_path, 'r') as zf:
-                        zf.extractall(temp_dir)
-                elif file_lower.endswith('.rar'):
-                    with rarfile.RarFile(archive_path, 'r') as rf:
-                        rf.extractall(temp_dir)
-                elif file_lower.endswith('.7z'):
-                    try:
-                        import py7zr
-                        with py7zr.SevenZipFile(archive_path, mode='r') as zf:
-                            zf.extractall(path=temp_dir)
-                    except Exception as e:
-                        # Fallback: raise to outer handler for message
-                        raise
-                else:
-                    with zipfile.ZipFile(archive_path, 'r') as zf:
-                        zf.extractall(temp_dir)
-
-                from helpers import _cleanup_extracted_archive
-                _cleanup_extracted_archive(temp_dir)
-
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        source_file = os.path.join(root, file)
-                        rel_path = os.path.relpath(source_file, temp_dir)
-                        target_file = os.path.join(target_dir, rel_path)
-                        file_lower = file.lower()
-                        if platform.system() == "Darwin":
-                            if file_lower.endswith('.win'):
-                                name_without_ext = os.path.splitext(file)[0]
-                                target_file = os.path.join(os.path.dirname(target_file), name_without_ext + ".ios")
-                        else:
-                            if file_lower.endswith('.ios'):
-                                name_without_ext = os.path.splitext(file)[0]
-                                target_file = os.path.join(os.path.dirname(target_file), name_without_ext + ".win")
-
-                        target_dirname = os.path.dirname(target_file)
-                        os.makedirs(target_dirname, exist_ok=True)
-                        try:
-                            if not hasattr(self, '_mod_dirs_to_cleanup'):
-                                self._mod_dirs_to_cleanup = []
-                            if target_dirname not in self._mod_dirs_to_cleanup:
-                                self._mod_dirs_to_cleanup.append(target_dirname)
-                                self._update_session_manifest(mod_dirs=[target_dirname])
-                        except Exception:
-                            pass
-
-                        # Создаем резервную копию, если файл уже существует
-                        if os.path.exists(target_file):
-                            backup_rel_path = os.path.relpath(target_file, target_dir)
-                            if hasattr(self, '_backup_temp_dir') and self._backup_temp_dir:
-                                backup_file_path = os.path.join(self._backup_temp_dir, backup_rel_path)
-                                os.makedirs(os.path.dirname(backup_file_path), exist_ok=True)
-                                shutil.move(target_file, backup_file_path)
-                                if not hasattr(self, '_backup_files'):
-                                    self._backup_files = {}
-                                self._backup_files[target_file] = backup_file_path
-                                self._update_session_manifest(backup_files={target_file: backup_file_path})
-
-                        shutil.copy2(source_file, target_file)
-                        extracted_files.append(target_file)
-
-        except Exception as e:
-            self.update_status_signal.emit(tr("errors.archive_unpack_error", archive_name=os.path.basename(archive_path), error=str(e)), UI_COLORS["status_error"])
-
-        return extracted_files
-
-    def _determine_launch_config(self, selections: Dict[int, str]) -> Optional[Dict[str, Any]]:
-        use_steam = self.local_config.get('launch_via_steam', False)
-        direct_launch_slot_id = self.local_config.get('direct_launch_slot_id', -1)
-
-        # Прямой запуск работает если выбран слот > 0
-        direct_launch = (direct_launch_slot_id > 0 and
-                        self.game_mode.direct_launch_allowed and
-                        platform.system() != "Darwin")
-
-        if use_steam:
-            return {'target': f"steam://rungameid/{self.game_mode.steam_id}", 'cwd': None, 'type': 'webbrowser'}
-
-        if direct_launch:
-            # Запускаем прямой запуск для выбранного слота
-            return self._handle_direct_launch(direct_launch_slot_id)
-
-        # Обычный запуск (не Steam, не прямой запуск)
-        launch_target = self._get_executable_path()
-        if not launch_target:
-            self.update_status_signal.emit(tr("errors.executable_not_found"), UI_COLORS["status_error"])
-            return None
-        return {'target': launch_target, 'cwd': self._get_current_game_path(), 'type': 'subprocess'}
-
-    def _handle_direct_launch(self, selected_tab_index: int) -> Optional[Dict[str, Any]]:
-        chapter_folder = self._get_target_dir(self.game_mode.get_chapter_id(selected_tab_index))
-        source_exe = self._get_source_executable_path()
-        use_custom_exe = self.local_config.get("use_custom_executable", False)
-
-        if not chapter_folder or not source_exe:
-            self.update_status_signal.emit(tr("errors.direct_launch_error"), UI_COLORS["status_error"])
-            return None
-
-        try:
-            if not ensure_writable(chapter_folder):
-                raise PermissionError(tr("errors.no_write_permission_for", path=chapter_folder))
-
-            if use_custom_exe:
-                target_exe = os.path.join(chapter_folder, os.path.basename(source_exe))
-            else:
-                # Use appropriate executable name based on game mode
-                exe_name = "UNDERTALE.exe" if isinstance(self.game_mode, UndertaleGameMode) else "DELTARUNE.exe"
-                target_exe = os.path.join(chapter_folder, exe_name)
-
-            shutil.copy2(source_exe, target_exe)
-            self._direct_launch_cleanup_info = {
-                'target_exe': target_exe,
-                'source_exe': source_exe,
-                'chapter_folder': chapter_folder,
-                'use_custom_exe': use_custom_exe
-            }
-            # Записываем в манифест для восстановления после сбоев
-            self._update_session_manifest(direct_launch=self._direct_launch_cleanup_info)
-
-            return {'target': target_exe, 'cwd': chapter_folder, 'type': 'subprocess'}
-
-        except PermissionError as e:
-            if not self.is_shortcut_launch:
-                self._handle_permission_error(e.filename or chapter_folder)
-            return None
-
-    def _cleanup_direct_launch_files(self):
-        """Очищает файлы модов и восстанавливает оригинальные файлы."""
-        try:
-            # Запомним список целей, для которых мы делали бэкапы (инлайновая замена)
-            backed_up_targets = set(self._backup_files.keys()) if hasattr(self, '_backup_files') and self._backup_files else set()
-
-            # Сначала восстанавливаем оригинальные файлы из резервной копии
-            if hasattr(self, '_backup_files') and self._backup_files:
-                for original_path, backup_path in self._backup_files.items():
-                    try:
-                        if os.path.exists(backup_path):
-                            # Удаляем модифицированный файл если он есть
-                            if os.path.exists(original_path):
-                                os.remove(original_path)
-
-                            # Восстанавливаем оригинальный файл
-                            os.makedirs(os.path.dirname(original_path), exist_ok=True)
-                            shutil.move(backup_path, original_path)
-                    except Exception as e:
-                        continue  # Продолжаем с другими файлами
-                self._backup_files = {}
-
-            # Удаляем остальные файлы модов (которые не были резервными)
-            if hasattr(self, '_mod_files_to_cleanup') and self._mod_files_to_cleanup:
-                remaining_files = []
-                for file_path in self._mod_files_to_cleanup:
-                    # Не удаляем файлы, для которых мы только что восстановили оригиналы
-                    if file_path in backed_up_targets:
-                        continue
-                    try:
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                        else:
-                            remaining_files.append(file_path)
-                    except Exception as e:
-                        continue
-                self._mod_files_to_cleanup = []
-
-            # Удаляем временную папку резервных копий
-            if hasattr(self, '_backup_temp_dir') and self._backup_temp_dir and os.path.exists(self._backup_temp_dir):
-                try:
-                    shutil.rmtree(self._backup_temp_dir)
-                    self._backup_temp_dir = None
-                except Exception as e:
-                    pass
-
-            # Пытаемся удалить созданные пустые директории (в обратном порядке вложенности)
-            try:
-                dirs = []
-                if hasattr(self, '_mod_dirs_to_cleanup') and self._mod_dirs_to_cleanup:
-                    dirs = sorted(set(self._mod_dirs_to_cleanup), key=lambda p: len(p.split(os.sep)), reverse=True)
-                else:
-                    data = self._load_session_manifest() or {}
-                    dirs = sorted(set(data.get('mod_dirs_to_cleanup', [])), key=lambda p: len(p.split(os.sep)), reverse=True)
-                for d in dirs:
-                    try:
-                        if os.path.isdir(d) and not os.listdir(d):
-                            os.rmdir(d)
-                    except Exception:
-                        pass
-                self._mod_dirs_to_cleanup = []
-            except Exception:
-                pass
-
-            # Существующая логика для прямого запуска
-            cleanup_info = getattr(self, '_direct_launch_cleanup_info', None)
-            if cleanup_info:
-                if 'target_exe' in cleanup_info and os.path.exists(cleanup_info['target_exe']):
-                    os.remove(cleanup_info['target_exe'])
-                self._direct_launch_cleanup_info = None
-
-            self.update_status_signal.emit(tr("status.files_restored"), UI_COLORS["status_success"])
-            # Удаляем файл-манифест после успешного восстановления
-            self._clear_session_manifest()
-
-        except Exception as e:
-            self.update_status_signal.emit(tr("errors.files_restore_error", error=str(e)), UI_COLORS["status_error"])
+            self.error_signal.emit(f"{title}\n\n{text}")
 
 
 
@@ -10309,14 +9416,24 @@ class DeltaHubApp(QWidget):
         return selections
 
     def _launch_game_with_selections(self, selections: Dict[int, str]):
+        self._stop_update_prefetch()
         self.hide_window_signal.emit()
+        trace = self._launch_trace = LaunchTrace(mode=self.current_mode, overlay=self._use_overlay_launch(),
+                                                 chapters=sum(1 for k in selections.values() if k != "no_change"))
         def restore_and_return():
+            trace.finish("aborted")
             self.restore_window_signal.emit()
             self._update_action_button_state()
 
-        if not self._find_and_validate_game_path(selections): restore_and_return(); return
-        if not self._prepare_game_files(selections): restore_and_return(); return
-        if not (launch_config := self._determine_launch_config(selections)): restore_and_return(); return
+        with trace.phase("validate"): ok = self._find_and_validate_game_path(selections)
+        if not ok: restore_and_return(); return
+        if self._use_overlay_launch():
+            with trace.phase("overlay"): ok = self._build_launch_overlay()
+            if not ok: restore_and_return(); return
+        with trace.phase("prepare"): ok = self._prepare_game_files(selections)
+        if not ok: restore_and_return(); return
+        with trace.phase("launch_config"): launch_config = self._determine_launch_config(selections)
+        if not launch_config: restore_and_return(); return
 
         self.update_status_signal.emit(tr("status.launching_game"), UI_COLORS["status_success"])
         self._execute_game(launch_config)
@@ -10336,7 +9453,8 @@ class DeltaHubApp(QWidget):
                 self.monitor_thread = GameMonitorThread(None, vanilla_mode, self)
                 self.monitor_thread.finished.connect(self._on_game_process_finished)
                 self.monitor_thread.start()
-                webbrowser.open(target_path)
+                with self._trace().phase("spawn"): webbrowser.open(target_path)
+                self._trace().finish()
                 self.update_status_signal.emit(tr("status.launching_via_steam"), UI_COLORS["status_steam"])
                 return
 
@@ -10363,12 +9481,14 @@ class DeltaHubApp(QWidget):
                         QTimer.singleShot(2000, self.restore_window_signal.emit)
                     return
                 # Обычный запуск игры через .app — ждём закрытия, чтобы восстановить файлы корректно.
-                if target_path.endswith(".app"):
-                    process = subprocess.Popen(['open', '-W', target_path])
-                else:
-                    process = subprocess.Popen([target_path], cwd=working_directory)
+                with self._trace().phase("spawn"):
+                    if target_path.endswith(".app"):
+                        process = subprocess.Popen(['open', '-W', target_path])
+                    else:
+                        process = subprocess.Popen([target_path], cwd=working_directory)
             else:
-                process = subprocess.Popen([target_path], cwd=working_directory)
+                with self._trace().phase("spawn"): process = subprocess.Popen([target_path], cwd=working_directory)
+            self._trace().finish()
 
             self.update_status_signal.emit(tr("status.game_launched_waiting_for_exit"), UI_COLORS["status_steam"])
 
@@ -10381,12 +9501,6 @@ class DeltaHubApp(QWidget):
             self.error_signal.emit(tr("errors.game_launch_failed", error=str(e)))
             self.restore_window_signal.emit()
 
-    def _get_source_executable_path(self):
-        if self.local_config.get("use_custom_executable", False):
-            cfg_key = self.game_mode.get_custom_exec_config_key()
-            return self.local_config.get(cfg_key, "")
-        return self._get_executable_path()
-
     def _on_game_process_finished(self, vanilla_mode: bool):
         if self.is_shortcut_launch:
             sys.exit(0)
@@ -10395,7 +9509,10 @@ class DeltaHubApp(QWidget):
 
     def _check_game_running(self, vanilla_mode):
         if is_game_running():
-            QTimer.singleShot(2000, lambda: self._check_game_running(vanilla_mode))
+            # Игра ещё жива (поздний старт через Steam, перезапуск) — ждём её выхода в фоне на PID, а не опросом
+            self.monitor_thread = GameMonitorThread(None, vanilla_mode, self, count_launch=False)
+            self.monitor_thread.finished.connect(self._on_game_process_finished)
+            self.monitor_thread.start()
         else:
             self.update_status_signal.emit(tr("status.game_closed_restoring_files"), UI_COLORS["status_info"])
             self._cleanup_direct_launch_files()
@@ -10415,6 +9532,7 @@ class DeltaHubApp(QWidget):
         self.raise_()
         self.progress_bar.setVisible(False)
         self._update_action_button_state()
+        self._update_restore_vanilla_button()
         # При восстановлении окна пробуем запустить музыку заново (если задана)
         self._maybe_start_background_music()
 
@@ -10819,10 +9937,10 @@ class DeltaHubApp(QWidget):
             found_hash = None
             from helpers import CLOUD_FUNCTIONS_BASE_URL
             for h in candidate_hashes:
-                resp = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getModData?modId={h}", timeout=10)
+                resp = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getModData?modId={h}", timeout=10)
                 if resp.status_code == 200 and resp.json():
                     mod_data = resp.json(); found_hash = h; break
-                resp = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getPendingModData?modId={h}", timeout=10)
+                resp = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getPendingModData?modId={h}", timeout=10)
                 if resp.status_code == 200 and resp.json():
                     mod_data = resp.json(); found_hash = h; found_in_pending = True; break
             if found_hash and isinstance(mod_data, dict):
@@ -10858,7 +9976,7 @@ class DeltaHubApp(QWidget):
             if msg_box.clickedButton() == withdraw_btn:
                 try:
                     from helpers import CLOUD_FUNCTIONS_BASE_URL
-                    requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/withdrawPendingMod", json={"hashedKey": hashed_key}, timeout=10)
+                    http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/withdrawPendingMod", json={"hashedKey": hashed_key}, timeout=10)
                     QMessageBox.information(self, tr("dialogs.request_withdrawn"), tr("dialogs.withdrawal_success"))
                 except Exception as e:
                     QMessageBox.critical(self, tr("errors.error"), tr("errors.request_revoke_failed", error=str(e)))
@@ -10867,7 +9985,7 @@ class DeltaHubApp(QWidget):
         # Проверяем, есть ли заявка на изменения для этого мода
         try:
             from helpers import CLOUD_FUNCTIONS_BASE_URL
-            pending_changes_response = requests.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getPendingChangeData?modId={hashed_key}", timeout=10)
+            pending_changes_response = http_client.get(f"{CLOUD_FUNCTIONS_BASE_URL}/getPendingChangeData?modId={hashed_key}", timeout=10)
             if pending_changes_response.status_code == 200 and pending_changes_response.json():
                 # Есть заявка на изменения, показываем диалог с опциями
                 msg_box = QMessageBox(self)
@@ -10883,7 +10001,7 @@ class DeltaHubApp(QWidget):
                     # Пользователь хочет отозвать заявку
                     try:
                         from helpers import CLOUD_FUNCTIONS_BASE_URL
-                        delete_response = requests.post(f"{CLOUD_FUNCTIONS_BASE_URL}/withdrawPendingChange", json={"hashedKey": hashed_key}, timeout=10)
+                        delete_response = http_client.post(f"{CLOUD_FUNCTIONS_BASE_URL}/withdrawPendingChange", json={"hashedKey": hashed_key}, timeout=10)
                         delete_response.raise_for_status()
                         QMessageBox.information(self, tr("dialogs.request_withdrawn"), tr("dialogs.withdrawal_success"))
                     except requests.RequestException as e:
@@ -11077,7 +10195,17 @@ class DeltaHubApp(QWidget):
         self._stop_presence_thread()
         # Не блокируем закрытие сетевыми вызовами; сессия будет удалена сборщиком по TTL
         self._stop_fetch_thread()
-        for attr in ('install_thread', 'full_install_thread', '_bg_loader', 'monitor_thread'):
+        self._stop_update_prefetch()
+        try:
+            m = http_client.metrics()
+            logging.info(f"HTTP: {m['requests']} requests, {m['connections']} connections, {m['reused']} reused")
+            for cache in (_PIX_CACHE, _IMG_CACHE):
+                c = cache.stats()
+                logging.info(f"Image cache {cache.name}: {c['hits']} hits, {c['misses']} misses, {c['evictions']} evictions, "
+                             f"{c['bytes'] / (1024 * 1024):.1f}/{c['budget'] / (1024 * 1024):.0f} MB")
+        except Exception:
+            pass
+        for attr in ('install_thread', 'full_install_thread', '_bg_loader', 'monitor_thread', 'prefetch_thread'):
             self._safe_stop_thread(getattr(self, attr, None))
         super().closeEvent(event)
 
@@ -11122,7 +10250,8 @@ class DeltaHubApp(QWidget):
             "custom_background_path": "", "custom_executable_path": "", "background_disabled": False,
             "custom_color_background": "", "custom_color_button": "", "custom_color_border": "",
             "custom_color_button_hover": "", "custom_color_text": "", "mods_dir_path": "",
-            "custom_color_version_text": "",
+            "custom_color_version_text": "", "prefetch_updates": False, "keep_mods_applied": False,
+            "isolated_launch": False, "backup_dir": "", "image_cache_mb": 200,
         }
         for key, value in defaults.items():
             self.local_config.setdefault(key, value)
@@ -11132,62 +10261,6 @@ class DeltaHubApp(QWidget):
     def _write_local_config(self):
         self._write_json(self.config_path, self.local_config)
 
-    def _write_json(self, path: str, data):
-        try:
-            dir_path = os.path.dirname(path)
-            os.makedirs(dir_path, exist_ok=True)
-            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            os.replace(tmp, path)
-        except (PermissionError, OSError) as e:
-            self._handle_permission_error(os.path.dirname(path))
-        except Exception as e:
-            self.update_status_signal.emit(tr("errors.file_write_error", error=str(e)), UI_COLORS["status_error"])
-
-    def _read_json(self, path: str):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-            # Migration logic for chapters -> files
-            if isinstance(data, dict) and path.endswith("config.json"):
-                needs_migration = False
-                
-                # Migrate chapters to files
-                if "chapters" in data and "files" not in data:
-                    data["files"] = data["chapters"]
-                    del data["chapters"]
-                    needs_migration = True
-                
-                # Migrate is_demo_mod to modtype
-                if "is_demo_mod" in data and "modtype" not in data:
-                    if data.get("is_demo_mod", False):
-                        data["modtype"] = "deltarunedemo"
-                    else:
-                        data["modtype"] = "deltarune"  # Default
-                    del data["is_demo_mod"]
-                    needs_migration = True
-                
-                # Save migrated config back to file
-                if needs_migration:
-                    self._write_json(path, data)
-                    
-            return data
-        except FileNotFoundError:
-            return {}
-        except json.JSONDecodeError:
-            backup_path = f"{path}.invalid.bak"
-            try:
-                os.replace(path, backup_path)
-            except OSError:
-                 pass
-            self.update_status_signal.emit(
-                tr("dialogs.corrupted_files_found"),
-                UI_COLORS["status_warning"]
-            )
-            return {}
-
     def _init_localization(self):
         """Инициализирует локализацию при запуске"""
         manager = get_localization_manager()
@@ -11243,58 +10316,6 @@ class DeltaHubApp(QWidget):
             app.installTranslator(self._qt_translator)
 
 
-    def _get_executable_path(self):
-        use_custom_exe = self.local_config.get("use_custom_executable", False)
-        if use_custom_exe:
-            custom_path = self.local_config.get(self.game_mode.get_custom_exec_config_key(), "")
-            if custom_path and os.path.isfile(custom_path):
-                return custom_path
-
-        current_game_path = self._get_current_game_path()
-        if not current_game_path or not os.path.isdir(current_game_path):
-            return None
-
-        system = platform.system()
-        
-        # Determine base executable name based on game mode
-        is_undertale = isinstance(self.game_mode, UndertaleGameMode)
-        base_exe_name = "UNDERTALE" if is_undertale else "DELTARUNE"
-        exe_extension = ".exe" if system in ["Windows", "Linux"] else ""
-
-        if system == "Windows":
-            exe_path = os.path.join(current_game_path, f"{base_exe_name}.exe")
-            if os.path.isfile(exe_path):
-                return exe_path
-        elif system == "Linux":
-            exe_path = os.path.join(current_game_path, f"{base_exe_name}.exe")
-            if os.path.isfile(exe_path):
-                return exe_path
-
-            native_path = os.path.join(current_game_path, base_exe_name)
-            if os.path.isfile(native_path):
-                return native_path
-        elif system == "Darwin":
-            if current_game_path.endswith(".app") and os.path.isdir(current_game_path):
-                app_path = current_game_path
-            else:
-                app_path = None
-                if is_undertale:
-                    app_names = ["UNDERTALE.app"]
-                else:
-                    app_names = ["DELTARUNE.app", "DELTARUNEdemo.app"]
-                    
-                for name in app_names:
-                    candidate = os.path.join(current_game_path, name)
-                    if os.path.isdir(candidate):
-                        app_path = candidate
-                        break
-            if app_path:
-                return app_path
-
-        if not self.is_shortcut_launch:
-            self.update_status_signal.emit(tr("errors.executable_not_found_deltarune"), UI_COLORS["status_error"])
-        return None
-
     def _gather_shortcut_settings(self) -> Optional[Dict[str, Any]]:
         """Собирает текущие настройки лаунчера для сохранения в ярлык"""
         current_path = self._get_current_game_path()
@@ -11362,121 +10383,13 @@ class DeltaHubApp(QWidget):
                 universal_mod_key = None
             settings["mods"]["universal"] = universal_mod_key
 
-
+        # Папки выбранных модов — запуск из ярлыка читает только их, не обходя все установленные моды
+        keys = {k for k in settings["mods"].values() if k}
+        settings["mods_dir"] = self.mods_dir
+        settings["mod_folders"] = {m.key: sanitize_filename(m.name) for m in self.all_mods if m.key in keys}
         return settings
 
 
-    def _apply_shortcut_mods(self, mods_settings: Dict[str, str]):
-        """Применяет моды из настроек ярлыка"""
-        try:
-            if not mods_settings:
-                return
-
-            is_demo_mode = isinstance(self.game_mode, DemoGameMode)
-            is_undertale_mode = isinstance(self.game_mode, UndertaleGameMode)
-
-            if is_demo_mode:
-                # Демо режим - один мод
-                mod_key = mods_settings.get("demo")
-                if mod_key and mod_key != "no_change":
-                    self._apply_demo_mod(mod_key)
-            elif is_undertale_mode:
-                # UNDERTALE режим - один мод
-                mod_key = mods_settings.get("undertale")
-                if mod_key and mod_key != "no_change":
-                    self._apply_mod_by_key(mod_key)
-            else:
-                # Для полной игры просто проверяем все указанные моды
-                for key, mod_key in mods_settings.items():
-                    if mod_key and mod_key != "no_change":
-                        # Проверяем является ли ключ числом (глава/вкладка)
-                        if key.isdigit():
-                            self._apply_mod_by_key(mod_key)
-                        elif key == "demo":
-                            continue  # Пропускаем демо моды в полной игре
-                        else:
-                            self._apply_mod_by_key(mod_key)
-
-        except Exception as e:
-            raise Exception(tr("errors.mod_apply_error", error=str(e)))
-
-    def _apply_demo_mod(self, mod_key: str):
-        """Применяет мод в демо режиме"""
-        # В демо режиме просто проверяем что мод существует
-        mod_config = self._get_mod_config_by_key(mod_key)
-        if not mod_config:
-            raise Exception(tr("errors.mod_not_found_by_key", mod_key=mod_key))
-
-    def _apply_mod_by_key(self, mod_key: str):
-        """Проверяет существование мода по ключу"""
-        mod_config = self._get_mod_config_by_key(mod_key)
-        if not mod_config:
-            raise Exception(tr("errors.mod_not_found_by_key", mod_key=mod_key))
-
-        # Проверяем существование мода в папке
-        mod_folder = os.path.join(self.mods_dir, mod_key)
-        if not os.path.exists(mod_folder):
-            mod_folder = os.path.join(self.mods_dir, mod_config.get('name', ''))
-            if not os.path.exists(mod_folder):
-                raise Exception(tr("errors.mod_files_not_found_by_key", mod_key=mod_key))
-
-    def _launch_game_from_shortcut(self, launch_via_steam=False, use_custom_executable=False,
-                                  custom_exec_path="", demo_custom_exec_path="", direct_launch_slot_id=-1):
-        """Запускает игру из ярлыка с указанными настройками"""
-        try:
-            # Применяем настройки запуска
-            is_demo_mode = isinstance(self.game_mode, DemoGameMode)
-            current_game_path = self._get_current_game_path()
-
-            if not current_game_path or not os.path.exists(current_game_path):
-                raise Exception(tr("errors.game_files_not_found"))
-
-            executable_path = None
-
-            if use_custom_executable:
-                # Используем кастомный исполняемый файл
-                exec_path = demo_custom_exec_path if is_demo_mode else custom_exec_path
-                if exec_path and os.path.exists(exec_path):
-                    executable_path = exec_path
-                else:
-                    raise Exception(tr("errors.specified_executable_not_found"))
-            else:
-                # Ищем стандартный исполняемый файл
-                if isinstance(self.game_mode, UndertaleGameMode):
-                    possible_names = ["UNDERTALE.exe", "undertale.exe"]
-                else:
-                    possible_names = ["DELTARUNE.exe", "deltarune.exe", "SURVEY_PROGRAM.exe", "survey_program.exe"]
-                for name in possible_names:
-                    test_path = os.path.join(current_game_path, name)
-                    if os.path.exists(test_path):
-                        executable_path = test_path
-                        break
-
-                if not executable_path:
-                    raise Exception(tr("errors.executable_not_found_simple"))
-
-            # Запускаем игру
-            if launch_via_steam:
-                # Запуск через Steam
-                # Use dynamic Steam app ID based on current game mode
-                steam_app_id = self.game_mode.steam_id
-                subprocess.Popen(['cmd', '/c', 'start', f'steam://run/{steam_app_id}'], shell=True)
-            else:
-                # Прямой запуск
-                args = []
-                if direct_launch_slot_id >= 0:
-                    # Добавляем аргументы для прямого запуска главы
-                    if direct_launch_slot_id == 1:
-                        args.extend(['-chapter', '1'])
-                    elif direct_launch_slot_id == 2:
-                        args.extend(['-chapter', '2'])
-                    # и т.д. для других глав
-
-                subprocess.Popen([executable_path] + args, cwd=current_game_path)
-
-        except Exception as e:
-            raise Exception(tr("errors.launch_error_details", error=str(e)))
-
     def _save_shortcut(self, settings: Dict[str, Any]):
         system = platform.system()
         if system == "Windows":
@@ -11539,33 +10452,6 @@ class DeltaHubApp(QWidget):
             self.update_status_signal.emit(tr("status.shortcut_creation_error", error=str(e)), UI_COLORS["status_error"])
             QMessageBox.critical(self, tr("errors.error"), tr("errors.shortcut_creation_failed", error=str(e)))
 
-    def _get_target_dir(self, chapter_id):
-        target_base = self._get_current_game_path()
-        if not target_base: return None
-        if platform.system() == "Darwin":
-            if not target_base.endswith(".app"):
-                for app_name in ("DELTARUNE.app", "DELTARUNEdemo.app"):
-                    candidate = os.path.join(target_base, app_name)
-                    if os.path.isdir(candidate):
-                        target_base = candidate
-                        break
-            target_base = os.path.join(target_base, "Contents", "Resources")
-            if not os.path.isdir(target_base):
-                return None
-        if chapter_id == -1:
-            return target_base
-        if chapter_id == 0:
-            return target_base
-        chapter_prefix = f"chapter{chapter_id}_"
-        try:
-            for entry in os.listdir(target_base):
-                if os.path.isdir(os.path.join(target_base, entry)) and entry.startswith(chapter_prefix):
-                    return os.path.join(target_base, entry)
-            return None
-        except Exception as e:
-            self.update_status_signal.emit(tr("errors.chapter_folder_search_error", error=str(e)), UI_COLORS["status_error"])
-            return None
-
     def _has_mods_with_data_files(self, selections: Dict[int, str]) -> bool:
 
         for ui_index, mod_key in selections.items():
@@ -11840,8 +10726,7 @@ class FetchHelpContentThread(QThread):
 
     def run(self):
         try:
-            import requests
-            response = requests.get(self.url, timeout=10)
+            response = http_client.get(self.url, timeout=10)
             if response.ok:
                 content = response.text
                 self.finished.emit(content)
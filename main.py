@@ -11,8 +11,7 @@ from PyQt6.QtCore import QLibraryInfo, Qt, QTranslator, QTimer, QUrl
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QApplication, QMessageBox, QSplashScreen
 from localization import get_localization_manager
-from launcher import DeltaHubApp
-from helpers import resource_path, cleanup_old_updater_files
+from helpers import resource_path, cleanup_old_updater_files, setup_log_file
 from localization import tr
 _translator = QTranslator()
 _lock_file = None
@@ -267,6 +266,7 @@ def setup_app():
     if qt_translation_file:
         if _translator.load(qt_translation_file, QLibraryInfo.path(QLibraryInfo.LibraryPath.TranslationsPath)):
             app.installTranslator(_translator)
+    from launcher import DeltaHubApp
     app.setApplicationName("DELTAHUB")
     app.setApplicationVersion(DeltaHubApp.get_launcher_version())
     app.setOrganizationName("deltahub")
@@ -333,6 +333,7 @@ def check_splash_settings():
     return True  # По умолчанию заставка включена
 
 def run_app():
+    setup_log_file()
     parser = argparse.ArgumentParser(description="DELTAHUB")
     parser.add_argument('--shortcut-launch', type=str)
     parser.add_argument('--shortcut-path', type=str)
@@ -349,10 +350,15 @@ def run_app():
     if platform.system() == "Linux" and not args.shortcut_launch:
         os.environ.setdefault("NO_AT_BRIDGE", "1")
 
-    app = setup_app()
     if args.shortcut_launch:
-        DeltaHubApp(args=args)
-        return
+        # Ярлык: без QApplication, окон и каталога — только моды из ярлыка, запуск игры и откат после выхода
+        manager = get_localization_manager()
+        manager.load_language(manager.detect_system_language())
+        from game_launch import ShortcutLaunch  # без launcher.py и его виджетов
+        sys.exit(ShortcutLaunch(args.shortcut_launch).run())
+
+    from launcher import DeltaHubApp
+    app = setup_app()
 
     # Проверяем настройки заставки
     splash_enabled = check_splash_settings()
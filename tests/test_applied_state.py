@@ -0,0 +1,38 @@
+import os, shutil
+
+import pytest
+
+import helpers
+helpers._LOG_FILE_READY = True  # вывод остаётся у pytest, а не уходит в лог лаунчера
+from game_launch import GameLaunchMixin
+from helpers import AppliedStateStore
+
+
+@pytest.fixture
+def applied(tmp_path, monkeypatch):
+    """Глава с оставленным между запусками модом: оригинал в бэкапе, в игре — файл мода."""
+    monkeypatch.setattr(helpers, "get_app_support_path", lambda: str(tmp_path / "config"))
+    monkeypatch.setattr(AppliedStateStore, "_instance", None)
+    os.makedirs(tmp_path / "config")
+    chapter, backups = tmp_path / "game" / "chapter1_windows", tmp_path / "backups"
+    chapter.mkdir(parents=True); backups.mkdir()
+    data, backup = chapter / "data.win", backups / "data.win"
+    data.write_bytes(b"OLD_ORIG")
+    shutil.move(str(data), str(backup)); data.write_bytes(b"MOD")
+    AppliedStateStore.instance().put(str(chapter), "mod", "sig", {str(data): str(backup)}, [str(data)], [])
+    return GameLaunchMixin(), str(chapter), data, backup
+
+
+def test_unchanged_mod_file_is_replaced_by_the_original(applied):
+    host, chapter, data, backup = applied
+    host._restore_applied_chapter(chapter)
+    assert data.read_bytes() == b"OLD_ORIG" and not backup.exists()
+    assert AppliedStateStore.instance().get(chapter) is None
+
+
+def test_file_updated_after_apply_is_kept_and_the_stale_backup_dropped(applied):
+    host, chapter, data, backup = applied
+    data.write_bytes(b"NEW_ORIGINAL")  # обновление игры или проверка файлов в Steam
+    host._restore_applied_chapter(chapter)
+    assert data.read_bytes() == b"NEW_ORIGINAL" and not backup.exists()
+    assert AppliedStateStore.instance().get(chapter) is None
@@ -0,0 +1,68 @@
+import os, time
+
+import pytest
+
+import helpers
+helpers._LOG_FILE_READY = True  # вывод остаётся у pytest, а не уходит в лог лаунчера
+from game_launch import GameLaunchMixin
+from helpers import LaunchTrace
+
+FILES_PER_CHAPTER = 200
+
+
+class _Signal:
+    def __init__(self): self.messages = []
+    def emit(self, message, *_): self.messages.append(message)
+
+
+class _Host(GameLaunchMixin):
+    is_shortcut_launch = True
+
+    def __init__(self, tmp_path, fail_chapter=None):
+        self.config_dir, self.local_config = str(tmp_path / "config"), {}
+        os.makedirs(self.config_dir)
+        self.game = tmp_path / "game"
+        self.update_status_signal = self.error_signal = _Signal()
+        self._launch_trace, self._overlay_root, self._backup_temp_dir = LaunchTrace(), None, None
+        self.fail_chapter = fail_chapter
+
+    def _get_current_game_path(self): return str(self.game)
+
+    def _create_backup_and_copy_mod_files(self, source_dir, target_dir, chapter_id=None, mod_info=None):
+        # Каждый файл — отдельной записью, как при настоящем применении, чтобы потоки пересекались
+        for i in range(FILES_PER_CHAPTER):
+            path = os.path.join(target_dir, f"file{i}.bin")
+            backup = os.path.join(self._backup_temp_dir, f"{chapter_id}_{i}.bin")
+            self._move_to_backup(path, backup)
+            with open(path, "w") as f: f.write("mod")
+            self._record_session_changes(backup_files={path: backup}, mod_files=[path], mod_dirs=[target_dir])
+            time.sleep(0)
+        if chapter_id == self.fail_chapter: raise OSError("disk full")
+        return True
+
+
+def _jobs(host):
+    jobs = []
+    for chapter in range(1, 5):
+        target = host.game / f"chapter{chapter}_windows"; target.mkdir(parents=True)
+        for i in range(FILES_PER_CHAPTER): (target / f"file{i}.bin").write_text("original")
+        jobs.append((chapter, None, "", str(target)))
+    return jobs
+
+
+def test_parallel_chapters_record_every_change(tmp_path):
+    host = _Host(tmp_path)
+    assert host._apply_chapter_jobs(_jobs(host))
+    assert len(host._backup_files) == len(host._mod_files_to_cleanup) == 4 * FILES_PER_CHAPTER
+    assert len(host._mod_dirs_to_cleanup) == 4
+
+
+def test_failed_chapter_rolls_back_every_chapter_without_finishing_the_launch(tmp_path):
+    host = _Host(tmp_path, fail_chapter=3)
+    jobs = _jobs(host)
+    with pytest.raises(OSError):
+        host._apply_chapter_jobs(jobs)
+    for _, _, _, target in jobs:
+        assert {open(os.path.join(target, name)).read() for name in os.listdir(target)} == {"original"}
+    assert host._backup_files == {} and host._mod_files_to_cleanup == []
+    assert host._launch_trace is not None and host.update_status_signal.messages == []
@@ -0,0 +1,44 @@
+import threading, time
+
+import helpers
+from helpers import DownloadCounterQueue
+
+
+class _Response:
+    status_code = 200
+
+
+class _ExitRaceLock:
+    """Замок очереди, который воспроизводит гонку: когда поток отправки в последний раз видит пустую очередь
+    и отпускает замок, но ещё не вышел, другой поток добавляет событие."""
+    def __init__(self, on_worker_exit):
+        self._lock, self._on_worker_exit, self._empty_releases = threading.Lock(), on_worker_exit, 0
+        self.queue = None
+    def __enter__(self): self._lock.acquire(); return self
+    def __exit__(self, *exc):
+        empty = not self.queue._pending
+        self._lock.release()
+        if threading.current_thread().name == "download-counter-queue" and empty:
+            self._empty_releases += 1
+            # Первое пустое отпускание — после снятия отправленных, второе — последняя проверка перед выходом
+            if self._empty_releases == 2: self._on_worker_exit()
+
+
+def test_event_enqueued_while_the_worker_exits_is_still_sent(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers, "get_app_support_path", lambda: str(tmp_path))
+    sent = []
+    monkeypatch.setattr(helpers.http_client, "post", lambda url, json=None, timeout=None: (sent.append(json["modId"]), _Response())[1])
+    flush_async = DownloadCounterQueue.flush_async
+    monkeypatch.setattr(DownloadCounterQueue, "flush_async", lambda self, delay=0.0: flush_async(self, delay))
+    queue = DownloadCounterQueue()
+
+    def enqueue_from_another_thread():
+        t = threading.Thread(target=queue.enqueue, args=("second",)); t.start(); t.join()
+    queue._ip, queue._lock = "10.0.0.1", _ExitRaceLock(enqueue_from_another_thread)
+    queue._lock.queue = queue
+
+    queue.enqueue("first")
+    deadline = time.monotonic() + 10
+    while (queue._pending or len(sent) < 2) and time.monotonic() < deadline: time.sleep(0.01)
+    assert sent == ["first", "second"]
+    assert queue._pending == []
@@ -0,0 +1,32 @@
+from PyQt6.QtGui import QColor, QImage
+
+import helpers
+from helpers import ImageDiskCache
+
+
+def _png(color: str = "red") -> bytes:
+    from PyQt6.QtCore import QBuffer, QIODevice
+    img = QImage(8, 8, QImage.Format.Format_ARGB32); img.fill(QColor(color))
+    buf = QBuffer(); buf.open(QIODevice.OpenModeFlag.WriteOnly); img.save(buf, "PNG")
+    return bytes(buf.data())
+
+
+def test_hits_update_last_used_in_memory_and_write_the_index_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers, "get_app_support_path", lambda: str(tmp_path))
+    writes = []
+    real_write = helpers._write_json_atomic
+    monkeypatch.setattr(helpers, "_write_json_atomic", lambda path, data: (writes.append(path), real_write(path, data)))
+    cache = ImageDiskCache()
+    cache.SAVE_DELAY = 60
+    cache.store("http://x/icon.png", _png(), {}, kind="icon")
+    assert len(writes) == 1  # store пишет сразу
+
+    before = cache.lookup("http://x/icon.png")["last_used"]
+    for _ in range(100):
+        assert cache.load("http://x/icon.png") is not None
+    assert len(writes) == 1  # попадания не трогают диск
+    assert cache.lookup("http://x/icon.png")["last_used"] >= before
+
+    cache.flush(); cache.flush()
+    assert len(writes) == 2  # один отложенный сброс, повторный flush без изменений ничего не пишет
+    assert ImageDiskCache().lookup("http://x/icon.png")["last_used"] == cache.lookup("http://x/icon.png")["last_used"]
@@ -0,0 +1,102 @@
+import threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import helpers
+from helpers import MirrorHealth, _download_file
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 МБ
+OTHER_PAYLOAD = bytes(reversed(range(256))) * 4096
+
+
+class _Mirror:
+    """Локальное зеркало: mode = ok | slow | drop; запоминает заголовки Range каждого GET."""
+    def __init__(self, payload: bytes = PAYLOAD, mode: str = "ok", etag: str = '"v1"'):
+        self.payload, self.mode, self.etag, self.ranges = payload, mode, etag, []
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+
+            def _headers(self, start: int):
+                self.send_response(206 if start else 200)
+                self.send_header("Content-Length", str(len(mirror.payload) - start))
+                self.send_header("ETag", mirror.etag)
+                if start: self.send_header("Content-Range", f"bytes {start}-{len(mirror.payload) - 1}/{len(mirror.payload)}")
+                self.end_headers()
+
+            def do_HEAD(self):
+                self._headers(0)
+
+            def do_GET(self):
+                rng = self.headers.get("Range")
+                mirror.ranges.append(rng)
+                start = int(rng.split("=")[1].split("-")[0]) if rng else 0
+                self._headers(start)
+                body = mirror.payload[start:]
+                try:
+                    if mirror.mode == "drop":
+                        self.wfile.write(body[:len(body) // 2]); self.wfile.flush()
+                        self.close_connection = True
+                    elif mirror.mode == "slow":
+                        for i in range(0, len(body), 8192):
+                            self.wfile.write(body[i:i + 8192]); self.wfile.flush(); time.sleep(0.01)
+                    else:
+                        self.wfile.write(body)
+                except OSError:
+                    pass  # клиент ушёл на другое зеркало
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/mod.zip"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown(); self.server.server_close()
+
+
+@pytest.fixture
+def mirrors(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers, "get_app_support_path", lambda: str(tmp_path))
+    monkeypatch.setattr(MirrorHealth, "_instance", None)
+    monkeypatch.setattr(MirrorHealth, "SLOW_GRACE", 0.3)
+    monkeypatch.setattr(MirrorHealth, "SLOW_BPS", 4 * 1024 * 1024)  # медленное зеркало отдаёт ~800 КБ/с
+    monkeypatch.setattr(MirrorHealth, "STALL_TIMEOUT", 2)
+    # Порядок источников задаёт тест, а не задержка проб на localhost
+    monkeypatch.setattr(MirrorHealth, "rank", lambda self, urls, timeout=5.0: list(urls))
+    started = []
+    def make(**kwargs):
+        started.append(_Mirror(**kwargs)); return started[-1]
+    yield make
+    for mirror in started: mirror.close()
+
+
+def _download(tmp_path, primary: _Mirror, *others: _Mirror) -> bytes:
+    target = tmp_path / "mod.zip"
+    with requests.Session() as session:
+        _download_file(session, primary.url, str(target), None, len(PAYLOAD), [0], max_retries=2, mirrors=[m.url for m in others])
+    return target.read_bytes()
+
+
+def test_slow_mirror_is_abandoned_for_a_fast_one(tmp_path, mirrors):
+    slow, fast = mirrors(mode="slow"), mirrors()
+    started = time.monotonic()
+    assert _download(tmp_path, slow, fast) == PAYLOAD
+    assert time.monotonic() - started < 5
+    assert fast.ranges[0] and fast.ranges[0].startswith("bytes=")  # докачка, а не заново
+    assert MirrorHealth.instance().hosts[MirrorHealth.host_of(slow.url)]["failures"] >= 1
+
+
+def test_mirror_dropping_mid_stream_resumes_on_the_next_with_range(tmp_path, mirrors):
+    dropping, good = mirrors(mode="drop"), mirrors()
+    assert _download(tmp_path, dropping, good) == PAYLOAD
+    assert good.ranges == [f"bytes={len(PAYLOAD) // 2}-"]
+
+
+def test_range_resume_is_refused_when_the_next_mirror_serves_other_bytes(tmp_path, mirrors):
+    dropping, other = mirrors(mode="drop"), mirrors(payload=OTHER_PAYLOAD, etag='"v2"')
+    # Половина от одного файла + хвост другого дала бы битый архив — второй источник качается с нуля
+    assert _download(tmp_path, dropping, other) == OTHER_PAYLOAD
+    assert other.ranges == [None]
@@ -0,0 +1,62 @@
+import importlib.machinery, os, sys, types
+
+import pytest
+
+import helpers
+helpers._LOG_FILE_READY = True  # вывод остаётся у pytest, а не уходит в лог лаунчера
+import game_launch
+from game_launch import GameLaunchMixin
+from helpers import FullGameMode, LaunchTrace, PatchedOutputCache
+
+
+class _Signal:
+    def __init__(self): self.messages = []
+    def emit(self, message, *_): self.messages.append(message)
+
+
+class _Host(GameLaunchMixin):
+    is_shortcut_launch = True
+
+    def __init__(self, tmp_path):
+        self.config_dir, self.local_config, self.game_mode = str(tmp_path / "config"), {"isolated_launch": True}, FullGameMode()
+        os.makedirs(self.config_dir)
+        self.game = tmp_path / "games" / "DELTARUNE"
+        self.update_status_signal = self.error_signal = _Signal()
+        self.critical = []
+        self._launch_trace, self._overlay_root, self._backup_temp_dir = LaunchTrace(), None, None
+        self._backup_files, self._mod_files_to_cleanup, self._mod_dirs_to_cleanup = {}, [], []
+
+    def _get_current_game_path(self): return str(self.game)
+    def _show_critical(self, title, text): self.critical.append(text)
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setattr(PatchedOutputCache, "_instance", None)
+    fake = types.ModuleType("pyxdelta"); fake.__spec__ = importlib.machinery.ModuleSpec("pyxdelta", None)
+    monkeypatch.setitem(sys.modules, "pyxdelta", fake)
+
+    def decode(mode, infile, patch, outfile):
+        with open(infile, "rb") as src, open(patch, "rb") as p, open(outfile, "wb") as out: out.write(src.read() + p.read())
+        return {"ok": True, "seconds": 0.0, "bytes_written": os.path.getsize(outfile), "copied_bytes": 0}
+    monkeypatch.setattr(game_launch, "run_xdelta", decode)
+
+    host = _Host(tmp_path)
+    chapter = host.game / "chapter1_windows"; chapter.mkdir(parents=True)
+    (chapter / "data.win").write_bytes(b"original")
+    (host.game / "DELTARUNE").write_bytes(b"exe")
+    return host
+
+
+def test_xdelta_mod_applies_inside_the_launch_overlay(host, tmp_path):
+    patch = tmp_path / "mod.xdelta"; patch.write_bytes(b"+patch")
+    assert host._build_launch_overlay()
+    chapter = host._get_target_dir(1)
+    assert chapter.startswith(host._overlay_root)
+
+    assert host._apply_xdelta_patch(str(patch), os.path.join(chapter, "data.win"), chapter), host.critical
+    with open(os.path.join(chapter, "data.win"), "rb") as f: assert f.read() == b"original+patch"
+    # Настоящая папка игры не тронута
+    assert (host.game / "chapter1_windows" / "data.win").read_bytes() == b"original"
+    host._cleanup_direct_launch_files()
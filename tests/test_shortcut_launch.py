@@ -0,0 +1,23 @@
+import base64, json
+
+import helpers
+helpers._LOG_FILE_READY = True  # вывод остаётся у pytest, а не уходит в лог лаунчера
+import game_launch
+from game_launch import ShortcutLaunch
+
+
+def test_installed_undertale_mod_is_found_for_its_chapter(tmp_path, monkeypatch):
+    monkeypatch.setattr(game_launch, "get_app_support_path", lambda: str(tmp_path / "config"))
+    (tmp_path / "config").mkdir()
+    mod_dir = tmp_path / "mods" / "UT Mod"; mod_dir.mkdir(parents=True)
+    # Так config.json пишет установщик публичного мода UNDERTALE
+    (mod_dir / "config.json").write_text(json.dumps({"mod_key": "ut", "name": "UT Mod", "modtype": "undertale",
+                                                     "files": {"0": {"data_file_url": "https://x/data.win"}}}))
+    settings = {"is_undertale_mode": True, "game_path": str(tmp_path / "UNDERTALE"), "mods": {"undertale": "ut"},
+                "mods_dir": str(tmp_path / "mods"), "mod_folders": {"ut": "UT Mod"}}
+    launch = ShortcutLaunch(base64.b64encode(json.dumps(settings).encode()).decode())
+    launch._load_shortcut_mods({"ut"})
+
+    (mod,) = launch.all_mods
+    assert mod.get_chapter_data(launch.game_mode.get_chapter_id(-1)) is not None
+    assert launch._selections() == {-1: "ut"}
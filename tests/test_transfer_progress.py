@@ -0,0 +1,49 @@
+import helpers
+from helpers import TransferProgress
+
+MB = 1024 * 1024
+CHUNK = 64 * 1024
+
+
+class _Signal:
+    def __init__(self): self.values = []
+    def emit(self, value): self.values.append(value)
+
+
+class _Clock:
+    def __init__(self): self.now = 1000.0
+    def __call__(self): return self.now
+
+
+def _feed(monkeypatch, total: int, seconds_per_chunk: float) -> _Signal:
+    clock, signal = _Clock(), _Signal()
+    monkeypatch.setattr(helpers.time, "monotonic", clock)
+    reporter = TransferProgress(signal, total)
+    for _ in range(total // CHUNK):
+        clock.now += seconds_per_chunk
+        reporter.add(CHUNK, "data.win")
+    reporter.flush()
+    assert reporter.emitted == len(signal.values)
+    return signal
+
+
+def test_burst_emits_first_and_final_only(monkeypatch):
+    # 100 МБ за ~16 мс: меньше min_interval — только первый процент и финальные 100%
+    signal = _feed(monkeypatch, 100 * MB, 0.00001)
+    assert len(signal.values) <= 2
+    assert signal.values[-1] == 100
+
+
+def test_slow_link_emits_one_signal_per_percent(monkeypatch):
+    # 100 МБ на ~1 МБ/с: каждый процент приходит, но ровно один раз
+    signal = _feed(monkeypatch, 100 * MB, CHUNK / MB)
+    assert signal.values == sorted(set(signal.values))
+    assert 90 <= len(signal.values) <= 101
+    assert signal.values[-1] == 100
+
+
+def test_min_interval_caps_signals_within_a_second(monkeypatch):
+    # Все 100 МБ за одну секунду: не чаще min_interval (0.1 с) плюс финальные 100%
+    signal = _feed(monkeypatch, 100 * MB, 1.0 / (100 * MB // CHUNK))
+    assert len(signal.values) <= 12
+    assert signal.values[-1] == 100